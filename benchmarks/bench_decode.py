@@ -0,0 +1,60 @@
+"""
+测量库返回的结果解码为模型（__decode__）的吞吐量
+
+python benchmarks/bench_decode.py [-n 次数]
+"""
+import argparse
+import timeit
+
+from mahjong_utils.hora import Hora
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.shanten import ShantenResult
+
+hands = ("34568m235p68s", "3344z6699p11345s", "112233p44556s12z", "1112345678999p", "114514p1919810s",
+         "119m19p19266s135z", "34568m235p68s3p", "1112345678999p5p", "11223344556677z")
+
+horas = (
+    ("11123456778899p", "4p", True, None),
+    ("1345556m111z2m", "2m", True, "East"),
+    ("11122233344455z", "5z", True, None),
+    ("19m19p19s1234567z1m", "1m", False, None),
+)
+
+
+def bench(name: str, decode, data: list, number: int):
+    t = timeit.timeit(lambda: [decode(x) for x in data], number=number) / number / len(data)
+    print(f"{name:<14}{t * 1e6:>12.1f} us{1 / t:>12.0f} /s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+
+    shanten_data = [libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in parse_tiles(h)],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    }) for h in hands]
+
+    hora_data = [libmahjongutils.call("hora", {
+        "tiles": [str(t) for t in parse_tiles(tiles)],
+        "furo": [],
+        "agari": agari,
+        "tsumo": tsumo,
+        "dora": 0,
+        "selfWind": wind,
+        "roundWind": wind,
+        "extraYaku": [],
+    }) for (tiles, agari, tsumo, wind) in horas]
+
+    print(f"{'':<14}{'per result':>15}{'throughput':>14}")
+    bench("ShantenResult", ShantenResult.__decode__, shanten_data, args.number)
+    bench("Hora", Hora.decode, hora_data, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+对比在hash_consing的上下文内外解码向听分析结果的耗时与保留全部结果时的内存占用
+
+python benchmarks/bench_hashcons.py [-n 次数] [-r 每手牌的结果数]
+"""
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from mahjong_utils.hashcons import hash_consing
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.shanten import ShantenResult
+
+hands = ("34568m235p68s3p", "1112345678999p5p", "112233p44556s127z", "3344z6699p11345s2s", "119m19p19266s135z")
+
+
+def decode_all(data: list) -> list:
+    return [ShantenResult.__decode__(x) for x in data]
+
+
+def decode_all_interned(data: list) -> list:
+    with hash_consing():
+        return [ShantenResult.__decode__(x) for x in data]
+
+
+def memory(decode, data: list) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        results = decode(data)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return size
+
+
+def bench(name: str, decode, data: list, number: int):
+    t = timeit.timeit(lambda: decode(data), number=number) / number / len(data)
+    m = memory(decode, data) / len(data)
+    print(f"{name:<16}{t * 1e6:>12.1f} us{m / 1024:>12.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10)
+    parser.add_argument("-r", "--repeat", type=int, default=4)
+    args = parser.parse_args()
+
+    # 同一手牌的结果重复出现（如对局记录中同一巡目的多次分析），各结果的数据是独立的dict
+    data = [libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in parse_tiles(h)],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    }) for h in hands for _ in range(args.repeat)]
+
+    print(f"{len(data)} results")
+    print(f"{'':<16}{'per result':>15}{'memory':>16}")
+    bench("plain", decode_all, data, args.number)
+    bench("hash_consing", decode_all_interned, data, args.number)
+
+
+if __name__ == "__main__":
+    main()
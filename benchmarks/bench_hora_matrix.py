@@ -0,0 +1,47 @@
+"""
+对比build_hora_matrix与逐个场况调用build_hora的耗时
+
+python benchmarks/bench_hora_matrix.py [-n 次数]
+"""
+import argparse
+import timeit
+
+from mahjong_utils.hora import build_hora, build_hora_matrix, hora_contexts
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.yaku.extra import richi, ippatsu
+
+hands = [(parse_tiles(h), Tile.by_text(a)) for (h, a) in (
+    ("11123456778899p", "4p"), ("12233466m111z789p", "1z"), ("112233p445566s77z", "7z"), ("34566m234567p678s", "6m"))]
+
+# 自摸/荣和 × 立直/一发 × 四个自风 × 宝牌0~3
+contexts = hora_contexts(dora=range(4), self_wind=tuple(Wind), round_wind=(Wind.east,),
+                         extra_yaku=((), {richi}, {richi, ippatsu}))
+
+
+def each_build_hora():
+    for (tiles, agari) in hands:
+        for ctx in contexts:
+            build_hora(tiles, None, agari, ctx.tsumo, dora=ctx.dora, self_wind=ctx.self_wind,
+                       round_wind=ctx.round_wind, extra_yaku=set(ctx.extra_yaku))
+
+
+def matrix():
+    for (tiles, agari) in hands:
+        build_hora_matrix(tiles, None, agari, contexts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{len(hands)} hands x {len(contexts)} contexts")
+    print(f"{'':<20}{'per hand':>15}")
+    for (name, fn) in (("build_hora", each_build_hora), ("build_hora_matrix", matrix)):
+        t = timeit.timeit(fn, number=args.number) / args.number / len(hands)
+        print(f"{name:<20}{t * 1e3:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+测量分析库调用的尾延迟，并与垃圾回收的迹象对照
+
+分析库的垃圾回收不能从外部观察，以每次调用前后进程常驻内存的变化作为其迹象（回收后堆收缩）；
+同时记录调用期间是否发生了Python的垃圾回收。以不同的垃圾回收参数编译的库可以通过环境变量MAHJONG_UTILS_LIB加载后对比。
+
+python benchmarks/bench_latency.py [-n 调用次数] [--slow 慢调用的比例]
+"""
+import argparse
+import gc
+import statistics
+import time
+
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.tile import parse_tiles
+
+hands = ("34568m235p68s", "3344z6699p11345s", "112233p44556s12z", "1112345678999p", "114514p1919810s",
+         "119m19p19266s135z", "34568m235p68s3p", "1112345678999p5p", "11223344556677z")
+
+
+def _params(h: str) -> dict:
+    return {
+        "tiles": [str(t) for t in parse_tiles(h)],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    }
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    parser.add_argument("--slow", type=float, default=0.01, help="视为尾延迟的最慢调用的比例")
+    args = parser.parse_args()
+
+    params = [_params(h) for h in hands]
+    libmahjongutils.call("shanten", params[0])
+    libmahjongutils.reset_stats()
+
+    py_gc = [0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            py_gc[0] += 1
+
+    gc.callbacks.append(on_gc)
+
+    latency = []
+    rss_delta = []
+    during_py_gc = []
+    try:
+        for i in range(args.number):
+            before_gc = py_gc[0]
+            before_rss = libmahjongutils.stats().rss
+            start = time.perf_counter()
+            libmahjongutils.call("shanten", params[i % len(params)])
+            latency.append(time.perf_counter() - start)
+            rss_delta.append(libmahjongutils.stats().rss - before_rss)
+            during_py_gc.append(py_gc[0] != before_gc)
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    ordered = sorted(latency)
+    print(f"calls         {len(latency)}")
+    for (name, q) in (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999)):
+        print(f"{name:<14}{_percentile(ordered, q) * 1e3:>10.3f} ms")
+    print(f"{'max':<14}{ordered[-1] * 1e3:>10.3f} ms")
+
+    threshold = _percentile(ordered, 1 - args.slow)
+    slow = [i for i in range(len(latency)) if latency[i] >= threshold]
+    shrink = [d < 0 for d in rss_delta]
+
+    def rate(flags, indices):
+        return sum(1 for i in indices if flags[i]) / max(len(indices), 1)
+
+    everything = range(len(latency))
+    print(f"rss shrink    {rate(shrink, slow):>10.1%} of slow calls, {rate(shrink, everything):.1%} of all calls")
+    print(f"python gc     {rate(during_py_gc, slow):>10.1%} of slow calls, "
+          f"{rate(during_py_gc, everything):.1%} of all calls")
+    if len(set(rss_delta)) > 1:
+        print(f"corr(latency, |rss delta|) {statistics.correlation(latency, [abs(d) for d in rss_delta]):.3f}")
+
+    stats = libmahjongutils.stats()
+    print(f"rss           {stats.rss / 2 ** 20:>10.1f} MiB")
+    print(f"slow calls    {stats.slow_calls:>10} (> {libmahjongutils.slow_call_seconds * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+比较结果模型的pickle（reduce_model）与pydantic默认pickle的大小与速度
+
+python benchmarks/bench_pickle.py [-n 次数]
+"""
+import argparse
+import copyreg
+import io
+import pickle
+import timeit
+
+from pydantic import BaseModel
+
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten
+
+hands = ("34568m235p68s", "3344z6699p11345s", "112233p44556s12z", "1112345678999p", "114514p1919810s",
+         "119m19p19266s135z", "34568m235p68s3p", "1112345678999p5p", "11223344556677z")
+
+
+class DefaultPickler(pickle.Pickler):
+    """
+    按pydantic与NamedTuple的默认方式pickle（忽略模型的__reduce__）
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, BaseModel):
+            return copyreg.__newobj__, (type(obj),), obj.__getstate__()
+        elif isinstance(obj, Tile):
+            return Tile, tuple(obj)
+        return NotImplemented
+
+
+def default_dumps(obj) -> bytes:
+    with io.BytesIO() as f:
+        DefaultPickler(f, pickle.HIGHEST_PROTOCOL).dump(obj)
+        return f.getvalue()
+
+
+def compact_dumps(obj) -> bytes:
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def bench(name: str, objects: list, number: int):
+    for (label, dumps) in (("default", default_dumps), ("compact", compact_dumps)):
+        data = [dumps(x) for x in objects]
+        size = sum(len(x) for x in data)
+        t_dumps = timeit.timeit(lambda: [dumps(x) for x in objects], number=number) / number / len(objects)
+        t_loads = timeit.timeit(lambda: [pickle.loads(x) for x in data], number=number) / number / len(objects)
+        print(f"{name:<14}{label:<9}{size / len(objects):>10.0f} B{t_dumps * 1e6:>12.1f} us{t_loads * 1e6:>12.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+
+    shanten_results = [shanten(parse_tiles(h)) for h in hands]
+    hora_results = [
+        build_hora(parse_tiles("11123456778899p"), None, Tile.by_text("4p"), True, dora=4),
+        build_hora(parse_tiles("1345556m111z2m"), None, Tile.by_text("2m"), True),
+        build_hora(parse_tiles("11122233344455z"), None, Tile.by_text("5z"), True),
+    ]
+
+    for objects in (shanten_results, hora_results):
+        for x in objects:
+            assert pickle.loads(compact_dumps(x)) == x
+
+    print(f"{'':<14}{'':<9}{'size':>12}{'dumps':>15}{'loads':>15}")
+    bench("ShantenResult", shanten_results, args.number)
+    bench("Hora", hora_results, args.number)
+
+
+if __name__ == "__main__":
+    main()
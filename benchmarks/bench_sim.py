@@ -0,0 +1,32 @@
+"""
+测量自对局模拟的吞吐量（场/小时）
+
+python benchmarks/bench_sim.py [-n 场数] [-w 工作进程数] [--calls]
+"""
+import argparse
+import time
+
+from mahjong_utils.sim import run_tables, Policy, CallingPolicy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=8)
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--calls", action="store_true", help="使用会副露的策略")
+    args = parser.parse_args()
+
+    policy_factory = CallingPolicy if args.calls else Policy
+
+    start = time.perf_counter()
+    results = run_tables(args.number, policy_factory, workers=args.workers, rounds=args.rounds)
+    elapsed = time.perf_counter() - start
+
+    hands = sum(len(r.hands) for r in results)
+    print(f"{args.number} tables, {hands} hands in {elapsed:.1f}s")
+    print(f"{args.number / elapsed * 3600:.0f} tables/hour, {hands / elapsed * 3600:.0f} hands/hour")
+
+
+if __name__ == "__main__":
+    main()
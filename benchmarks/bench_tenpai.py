@@ -0,0 +1,44 @@
+"""
+对比tenpai模块与shanten()判断和了与听牌（待牌）的耗时
+
+python benchmarks/bench_tenpai.py [-n 次数]
+"""
+import argparse
+import timeit
+
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.shanten import shanten, PatternsOption
+from mahjong_utils.tenpai import is_agari_batch, tenpai_waits_batch
+
+agari_hands = [parse_tiles(h) for h in (
+    "11123456778899p", "11223344556677z", "19m19p19s1234567z1m", "112233p44556s127z", "34568m235p68s3p",
+    "1112345678999p5p", "114514p1919810s")]
+
+tenpai_hands = [parse_tiles(h) for h in (
+    "1112345678999p", "34568m235p68s", "1122334455667s", "19m19p19s1234567z", "2223334445556m",
+    "34068m23p6678s11z", "114514p1919810s")]
+
+
+def bench(name: str, fn, hands: list, number: int):
+    t = timeit.timeit(lambda: fn(hands), number=number) / number / len(hands)
+    print(f"{name:<22}{t * 1e6:>12.1f} us{1 / t:>12.0f} /s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'':<22}{'per hand':>15}{'throughput':>14}")
+    bench("is_agari", is_agari_batch, agari_hands, args.number)
+    bench("shanten == -1", lambda hands: [shanten(h, calc_advance_num=False, best_shanten_only=True,
+                                                  patterns=PatternsOption.none).shanten == -1 for h in hands],
+          agari_hands, args.number)
+    bench("tenpai_waits", tenpai_waits_batch, tenpai_hands, args.number)
+    bench("shanten().advance", lambda hands: [r.advance if r.shanten == 0 else frozenset() for r in (
+        shanten(h, calc_advance_num=False, patterns=PatternsOption.none) for h in hands)],
+          tenpai_hands, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+测量多线程（或子解释器）并发解码与调用分析库的吞吐量随线程数的变化
+
+在自由线程（无GIL）的解释器（如python3.13t）上运行时，吞吐量应随线程数增长；在有GIL的解释器上用作对照。
+
+python benchmarks/bench_threads.py [-n 每个线程的次数] [-t 1,2,4,8] [--call] [--interpreters]
+"""
+import argparse
+import concurrent.futures
+import time
+
+from mahjong_utils.lib import libmahjongutils, gil_disabled
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.shanten import ShantenResult
+
+hands = ("34568m235p68s", "3344z6699p11345s", "112233p44556s12z", "1112345678999p", "114514p1919810s",
+         "119m19p19266s135z", "34568m235p68s3p", "1112345678999p5p", "11223344556677z")
+
+
+def _params(h: str) -> dict:
+    return {
+        "tiles": [str(t) for t in parse_tiles(h)],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    }
+
+
+def decode_work(data: list, number: int) -> int:
+    for _ in range(number):
+        for x in data:
+            ShantenResult.__decode__(x)
+    return number * len(data)
+
+
+def call_work(number: int) -> int:
+    params = [_params(h) for h in hands]
+    for _ in range(number):
+        for p in params:
+            ShantenResult.__decode__(libmahjongutils.call("shanten", p))
+    return number * len(params)
+
+
+def bench(name: str, executor_factory, threads: int, fn, *args) -> float:
+    with executor_factory(threads) as executor:
+        start = time.perf_counter()
+        total = sum(f.result() for f in [executor.submit(fn, *args) for _ in range(threads)])
+        elapsed = time.perf_counter() - start
+    throughput = total / elapsed
+    print(f"{name:<10}{threads:>8}{throughput:>14.0f} /s")
+    return throughput
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=50)
+    parser.add_argument("-t", "--threads", default="1,2,4,8")
+    parser.add_argument("--call", action="store_true", help="同时调用分析库（否则只解码预先获取的结果）")
+    parser.add_argument("--interpreters", action="store_true", help="使用子解释器（需要Python 3.14）代替线程")
+    args = parser.parse_args()
+
+    if args.interpreters:
+        executor_factory = concurrent.futures.InterpreterPoolExecutor
+    else:
+        executor_factory = concurrent.futures.ThreadPoolExecutor
+
+    data = [libmahjongutils.call("shanten", _params(h)) for h in hands]
+
+    print(f"gil disabled: {gil_disabled()}")
+    print(f"{'':<10}{'threads':>8}{'throughput':>16}")
+    base = None
+    for threads in map(int, args.threads.split(",")):
+        if args.call:
+            throughput = bench("call", executor_factory, threads, call_work, args.number)
+        else:
+            throughput = bench("decode", executor_factory, threads, decode_work, data, args.number)
+        if base is None:
+            base = throughput
+        print(f"{'':<10}{'':>8}{throughput / base:>14.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+__version__ = "0.2.2.post2"
+
 from . import hora
 from . import models
 from . import point_by_han_hu
@@ -0,0 +1,314 @@
+from typing import Iterable, Optional, Sequence, Tuple, Union, Mapping, Any, Dict, List
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+from mahjong_utils.hora import _hora_params, _hora_columns
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.names import wind_names, yaku_names
+from mahjong_utils.models.tile import Tile, tile_by_text, tiles_text
+from mahjong_utils.models.wind import Wind
+
+# 牌以Tile.code表示，进张以位掩码表示（第code位为1表示该牌为进张）
+_advance_struct = pa.struct([
+    ("tile", pa.uint8()),
+    ("shanten", pa.int8()),
+    ("advance", pa.uint64()),
+    ("advance_num", pa.int32()),
+    ("good_shape_advance", pa.uint64()),
+    ("good_shape_advance_num", pa.int32()),
+])
+
+shanten_schema = pa.schema([
+    ("tiles", pa.string()),
+    ("furo", pa.list_(pa.string())),
+    ("with_got", pa.bool_()),
+    ("shanten", pa.int8()),
+    ("advance", pa.uint64()),
+    ("advance_num", pa.int32()),
+    ("good_shape_advance", pa.uint64()),
+    ("good_shape_advance_num", pa.int32()),
+    ("discard_to_advance", pa.list_(_advance_struct)),
+    ("ankan_to_advance", pa.list_(_advance_struct)),
+])
+
+hora_schema = pa.schema([
+    ("tiles", pa.string()),
+    ("furo", pa.list_(pa.string())),
+    ("agari", pa.uint8()),
+    ("tsumo", pa.bool_()),
+    ("self_wind", pa.string()),
+    ("round_wind", pa.string()),
+    ("yaku", pa.list_(pa.string())),
+    ("extra_yaku", pa.list_(pa.string())),
+    ("has_yakuman", pa.bool_()),
+    ("han", pa.int16()),
+    ("hu", pa.int16()),
+    ("dora", pa.int16()),
+    ("parent_ron", pa.int32()),
+    ("parent_tsumo", pa.int32()),
+    ("child_ron", pa.int32()),
+    ("child_tsumo_parent", pa.int32()),
+    ("child_tsumo_child", pa.int32()),
+])
+
+
+class ResultWriter:
+    """
+    将分析结果逐行写入Arrow IPC或Parquet文件，每累积batch_size行写出一个RecordBatch
+    """
+
+    def __init__(self, sink: Union[str, Any], schema: pa.Schema,
+                 format: str = "ipc", batch_size: int = 4096) -> None:
+        """
+        :param sink: 文件路径或可写的文件对象
+        :param schema: 表结构
+        :param format: 文件格式，"ipc"或"parquet"
+        :param batch_size: 每个RecordBatch的行数
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+
+        self.schema = schema
+        self.batch_size = batch_size
+        self.rows = 0
+
+        if format == "ipc":
+            self._writer = pa.ipc.new_file(sink, schema)
+        elif format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(sink, schema)
+        else:
+            raise ValueError("invalid format: " + format)
+
+        self._format = format
+        self._columns: Dict[str, List[Any]] = dict((name, []) for name in schema.names)
+        self._pending = 0
+
+    def write(self, row: Mapping[str, Any]):
+        for name, column in self._columns.items():
+            column.append(row[name])
+        self._pending += 1
+        self.rows += 1
+
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._pending == 0:
+            return
+
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        if self._format == "ipc":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch]))
+
+        for column in self._columns.values():
+            column.clear()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _tiles_mask(tiles: Optional[Sequence[str]]) -> Optional[int]:
+    if tiles is None:
+        return None
+
+    mask = 0
+    for t in tiles:
+        mask |= 1 << tile_by_text[t].code
+    return mask
+
+
+def _advance_rows(data: Dict[str, dict]) -> List[dict]:
+    return [dict(
+        tile=tile_by_text[k].code,
+        shanten=v["shantenNum"],
+        advance=_tiles_mask(v["advance"]),
+        advance_num=v["advanceNum"],
+        good_shape_advance=_tiles_mask(v["goodShapeAdvance"]),
+        good_shape_advance_num=v["goodShapeAdvanceNum"],
+    ) for (k, v) in data.items()]
+
+
+def _is_corpus_records(hands: Any) -> bool:
+    dtype = getattr(hands, "dtype", None)
+    if dtype is None:
+        return False
+
+    from mahjong_utils.corpus import record_dtype
+    return dtype == record_dtype
+
+
+def _shanten_row(tiles: str, furo: List[str], shanten_info: dict) -> dict:
+    with_got = shanten_info["type"] == "ShantenWithGot"
+    return dict(
+        tiles=tiles,
+        furo=furo,
+        with_got=with_got,
+        shanten=shanten_info["shantenNum"],
+        advance=_tiles_mask(shanten_info.get("advance")),
+        advance_num=shanten_info.get("advanceNum"),
+        good_shape_advance=_tiles_mask(shanten_info.get("goodShapeAdvance")),
+        good_shape_advance_num=shanten_info.get("goodShapeAdvanceNum"),
+        discard_to_advance=_advance_rows(shanten_info["discardToAdvance"]) if with_got else None,
+        ankan_to_advance=_advance_rows(shanten_info["ankanToAdvance"]) if with_got else None,
+    )
+
+
+def _wind_text(name: Optional[str]) -> Optional[str]:
+    wind = wind_names.decode(name)
+    return wind.name if wind is not None else None
+
+
+def _hora_row(tiles: str, furo: List[str], data: dict) -> dict:
+    pattern = data["pattern"]
+    han, hu, yaku, has_yakuman, parent_point, child_point = _hora_columns(data)
+    parent_ron, parent_tsumo = parent_point
+    child_ron, child_tsumo_parent, child_tsumo_child = child_point
+    return dict(
+        tiles=tiles,
+        furo=furo,
+        agari=tile_by_text[pattern["agari"]].code,
+        tsumo=pattern["tsumo"],
+        self_wind=_wind_text(pattern["selfWind"]),
+        round_wind=_wind_text(pattern["roundWind"]),
+        yaku=sorted(yk.name for yk in yaku),
+        extra_yaku=sorted(yaku_names.decode(yk).name for yk in data["extraYaku"]),
+        has_yakuman=has_yakuman,
+        han=han,
+        hu=hu,
+        dora=data["dora"],
+        parent_ron=parent_ron,
+        parent_tsumo=parent_tsumo,
+        child_ron=child_ron,
+        child_tsumo_parent=child_tsumo_parent,
+        child_tsumo_child=child_tsumo_child,
+    )
+
+
+def _iter_hora_hands(hands: Any) -> Iterable[Tuple[dict, str, List[str]]]:
+    """
+    产出(分析库的参数, 手牌文本, 副露文本)
+    """
+    if _is_corpus_records(hands):
+        from mahjong_utils.corpus import NONE, FLAG_TSUMO, record_tile_texts, record_furo_dicts, \
+            record_agari_text, record_tiles_text, record_furo_texts
+        for record in hands:
+            yield {
+                "tiles": record_tile_texts(record),
+                "furo": record_furo_dicts(record),
+                "agari": record_agari_text(record),
+                "tsumo": bool(record["flags"] & FLAG_TSUMO),
+                "dora": int(record["dora"]),
+                "selfWind": wind_names.encode(Wind(int(record["self_wind"])))
+                if record["self_wind"] != NONE else None,
+                "roundWind": wind_names.encode(Wind(int(record["round_wind"])))
+                if record["round_wind"] != NONE else None,
+                "extraYaku": [],
+            }, record_tiles_text(record), record_furo_texts(record)
+        return
+
+    for hand in hands:
+        hand = dict(hand)
+        hand.setdefault("furo", None)
+        furo = hand["furo"] if hand["furo"] is not None else []
+        yield _hora_params(**hand), tiles_text(hand["tiles"]), [repr(fr) for fr in furo]
+
+
+def _iter_shanten_hands(hands: Any) -> Iterable[Tuple[List[str], List[dict], str, List[str]]]:
+    """
+    产出(牌的文本, 编码后的副露, 手牌文本, 副露文本)
+    """
+    if _is_corpus_records(hands):
+        from mahjong_utils.corpus import record_tile_texts, record_furo_dicts, record_tiles_text, record_furo_texts
+        for record in hands:
+            yield record_tile_texts(record), record_furo_dicts(record), \
+                record_tiles_text(record), record_furo_texts(record)
+        return
+
+    for hand in hands:
+        if isinstance(hand, tuple) and len(hand) == 2 and not isinstance(hand[0], Tile):
+            tiles, furo = hand
+        else:
+            tiles, furo = hand, None
+        if furo is None:
+            furo = []
+
+        yield [str(t) for t in tiles], [fr.__encode__() for fr in furo], \
+            tiles_text(tiles), [repr(fr) for fr in furo]
+
+
+def export_shanten(
+        hands: Union[Iterable[Union[Sequence[Tile], Tuple[Sequence[Tile], Optional[Sequence[Furo]]]]], "np.ndarray"],
+        sink: Union[str, Any],
+        *, format: str = "ipc",
+        batch_size: int = 4096,
+        calc_advance_num: bool = True,
+        best_shanten_only: bool = False,
+        allow_ankan: bool = True,
+) -> int:
+    """
+    对每手牌进行向听分析，并将结果按shanten_schema写入Arrow IPC或Parquet文件
+
+    结果直接由分析库返回的数据转换为行，不构造ShantenResult对象；内存占用只取决于batch_size
+
+    :param hands: 手牌（门前的牌，或(门前的牌, 副露)），或语料的记录（Corpus.records或其切片，此时不构造Tile对象）
+    :param sink: 文件路径或可写的文件对象
+    :param format: 文件格式，"ipc"或"parquet"
+    :param batch_size: 每个RecordBatch的行数
+    :param calc_advance_num: 是否计算进张数
+    :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param allow_ankan: 是否允许暗杠
+    :return: 写入的行数
+    """
+    with ResultWriter(sink, shanten_schema, format, batch_size) as writer:
+        for (tiles, furo, text, furo_text) in _iter_shanten_hands(hands):
+            result = libmahjongutils.call("shanten", {
+                "tiles": tiles,
+                "furo": furo,
+                "calcAdvanceNum": calc_advance_num,
+                "bestShantenOnly": best_shanten_only,
+                "allowAnkan": allow_ankan,
+            })
+            writer.write(_shanten_row(text, furo_text, result["shantenInfo"]))
+
+        return writer.rows
+
+
+def export_hora(
+        hands: Union[Iterable[Mapping[str, Any]], "np.ndarray"],
+        sink: Union[str, Any],
+        *, format: str = "ipc",
+        batch_size: int = 4096,
+) -> int:
+    """
+    对每手牌进行和牌分析，并将结果按hora_schema写入Arrow IPC或Parquet文件
+
+    结果直接由分析库返回的数据转换为行，不构造Hora对象；不是和牌形的手牌抛出ValueError
+
+    :param hands: 和牌分析的参数（build_hora的关键字参数：tiles、furo、agari、tsumo、dora、self_wind、round_wind、extra_yaku），
+        或语料的记录（Corpus.records或其切片，每条记录须含和牌）
+    :param sink: 文件路径或可写的文件对象
+    :param format: 文件格式，"ipc"或"parquet"
+    :param batch_size: 每个RecordBatch的行数
+    :return: 写入的行数
+    """
+    with ResultWriter(sink, hora_schema, format, batch_size) as writer:
+        for (params, text, furo_text) in _iter_hora_hands(hands):
+            writer.write(_hora_row(text, furo_text, libmahjongutils.call("hora", params)))
+
+        return writer.rows
+
+
+__all__ = ("shanten_schema", "hora_schema", "ResultWriter", "export_shanten", "export_hora",)
@@ -0,0 +1,234 @@
+from typing import NamedTuple, Tuple, Sequence, Optional, List, Dict
+
+from mahjong_utils.models.furo import Furo, Chi, Kan
+from mahjong_utils.models.hand import Hand
+from mahjong_utils.models.hand_pattern import HandPattern, RegularHandPattern, ChitoiHandPattern, KokushiHandPattern
+from mahjong_utils.models.mentsu import Mentsu
+from mahjong_utils.models.tatsu import Tatsu
+from mahjong_utils.models.tile import Tile
+from mahjong_utils.models.tile_type import TileType, tile_type_index_mapping
+from mahjong_utils.shanten import ShantenResult, Shanten, ShantenWithoutGot, ShantenWithGot, ShantenWithFuroChance
+
+_suits = (TileType.M, TileType.P, TileType.S)
+_honor_classes = ((1, 2, 3, 4), (5, 6, 7))
+
+
+class CanonicalHand(NamedTuple):
+    """
+    规范化后的手牌（可直接作为缓存的键）
+    """
+
+    tiles: Tuple[Tile, ...]
+    furo: Tuple[Furo, ...]
+
+
+class HandTransform(NamedTuple):
+    """
+    从原手牌到规范化手牌的变换
+
+    数牌的花色可以互换、每种花色内可以镜像（n→10-n），风牌之间、三元牌之间可以互换，赤宝牌视为普通的5。
+    这些变换不改变向听数、进张数等向听分析结果。
+
+    suit[i]为原手牌第i种花色（万、筒、索）变换后的花色，mirror[i]为原手牌第i种花色是否镜像，
+    honor[i]为原手牌中数字为i+1的字牌变换后的数字。
+    """
+
+    suit: Tuple[int, int, int]
+    mirror: Tuple[bool, bool, bool]
+    honor: Tuple[int, ...]
+
+    def apply(self, t: Tile) -> Tile:
+        """
+        将原手牌中的牌变换为规范化手牌中的牌
+        """
+        if t.tile_type == TileType.Z:
+            return Tile.by_type_and_num(TileType.Z, self.honor[t.num - 1])
+
+        i = tile_type_index_mapping[t.tile_type]
+        num = t.real_num
+        if self.mirror[i]:
+            num = 10 - num
+        return Tile.by_type_and_num(_suits[self.suit[i]], num)
+
+    def restore(self, t: Tile) -> Tile:
+        """
+        将规范化手牌中的牌还原为原手牌中的牌（赤宝牌还原为普通的5）
+        """
+        if t.tile_type == TileType.Z:
+            return Tile.by_type_and_num(TileType.Z, self.honor.index(t.num) + 1)
+
+        i = self.suit.index(tile_type_index_mapping[t.tile_type])
+        num = t.real_num
+        if self.mirror[i]:
+            num = 10 - num
+        return Tile.by_type_and_num(_suits[i], num)
+
+    def apply_furo(self, fr: Furo) -> Furo:
+        return Furo.parse([self.apply(t) for t in fr.tiles], isinstance(fr, Kan) and fr.ankan)
+
+    def restore_furo(self, fr: Furo) -> Furo:
+        return Furo.parse([self.restore(t) for t in fr.tiles], isinstance(fr, Kan) and fr.ankan)
+
+    def restore_pattern(self, pattern: HandPattern) -> HandPattern:
+        if isinstance(pattern, RegularHandPattern):
+            return RegularHandPattern(
+                k=pattern.k,
+                jyantou=self.restore(pattern.jyantou) if pattern.jyantou is not None else None,
+                menzen_mentsu=tuple(Mentsu.parse([self.restore(t) for t in mt.tiles]) for mt in pattern.menzen_mentsu),
+                furo=tuple(self.restore_furo(fr) for fr in pattern.furo),
+                tatsu=tuple(Tatsu.parse([self.restore(tt.first), self.restore(tt.second)]) for tt in pattern.tatsu),
+                remaining=tuple(self.restore(t) for t in pattern.remaining),
+            )
+        elif isinstance(pattern, ChitoiHandPattern):
+            return ChitoiHandPattern(
+                pairs=frozenset(self.restore(t) for t in pattern.pairs),
+                remaining=tuple(self.restore(t) for t in pattern.remaining),
+            )
+        elif isinstance(pattern, KokushiHandPattern):
+            return KokushiHandPattern(
+                yaochu=frozenset(self.restore(t) for t in pattern.yaochu),
+                repeated=self.restore(pattern.repeated) if pattern.repeated is not None else None,
+                remaining=tuple(self.restore(t) for t in pattern.remaining),
+            )
+        else:
+            raise TypeError(pattern)
+
+    def _restore_discard(self, t: Tile, tiles: Sequence[Tile]) -> Tile:
+        # 原手牌中只有赤宝牌而没有普通的5时，打出的是赤宝牌
+        t = self.restore(t)
+        if t.num == 5 and t.tile_type != TileType.Z and t not in tiles:
+            red = Tile.by_type_and_num(t.tile_type, 0)
+            if red in tiles:
+                return red
+        return t
+
+    def _restore_without_got(self, info: ShantenWithoutGot) -> ShantenWithoutGot:
+        return ShantenWithoutGot(
+            shanten=info.shanten,
+            advance=set(self.restore(t) for t in info.advance),
+            advance_num=info.advance_num,
+            good_shape_advance=set(self.restore(t) for t in info.good_shape_advance)
+            if info.good_shape_advance is not None else None,
+            good_shape_advance_num=info.good_shape_advance_num,
+        )
+
+    def _restore_with_got(self, info: ShantenWithGot, tiles: Sequence[Tile]) -> ShantenWithGot:
+        return ShantenWithGot(
+            shanten=info.shanten,
+            discard_to_advance=dict((self._restore_discard(k, tiles), self._restore_without_got(v))
+                                    for (k, v) in info.discard_to_advance.items()),
+            ankan_to_advance=dict((self._restore_discard(k, tiles), self._restore_without_got(v))
+                                  for (k, v) in info.ankan_to_advance.items()),
+        )
+
+    def _restore_shanten_info(self, info: Shanten, tiles: Sequence[Tile]) -> Shanten:
+        if isinstance(info, ShantenWithoutGot):
+            return self._restore_without_got(info)
+        elif isinstance(info, ShantenWithGot):
+            return self._restore_with_got(info, tiles)
+        elif isinstance(info, ShantenWithFuroChance):
+            return ShantenWithFuroChance(
+                shanten=info.shanten,
+                pass_=self._restore_without_got(info.pass_) if info.pass_ is not None else None,
+                chi=dict((Tatsu.parse([self.restore(k.first), self.restore(k.second)]),
+                          self._restore_with_got(v, tiles)) for (k, v) in info.chi.items()),
+                pon=self._restore_with_got(info.pon, tiles) if info.pon is not None else None,
+                minkan=self._restore_shanten_info(info.minkan, tiles) if info.minkan is not None else None,
+            )
+        else:
+            raise TypeError(info)
+
+    def restore_shanten_result(self, result: ShantenResult,
+                               tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None) -> ShantenResult:
+        """
+        将规范化手牌的向听分析结果还原为原手牌的向听分析结果
+
+        :param result: 规范化手牌的向听分析结果
+        :param tiles: 原手牌门前的牌
+        :param furo: 原手牌的副露
+        :return: 原手牌的向听分析结果
+        """
+        return ShantenResult(
+            type=result.type,
+            hand=Hand(
+                tiles=list(tiles),
+                furo=list(furo) if furo is not None else [],
+                patterns=[self.restore_pattern(p) for p in result.hand.patterns],
+            ),
+            shanten_info=self._restore_shanten_info(result.shanten_info, tiles),
+            regular=self.restore_shanten_result(result.regular, tiles, furo) if result.regular is not None else None,
+            chitoi=self.restore_shanten_result(result.chitoi, tiles, furo) if result.chitoi is not None else None,
+            kokushi=self.restore_shanten_result(result.kokushi, tiles, furo) if result.kokushi is not None else None,
+        )
+
+
+def _furo_signature(fr: Furo, mirror: bool) -> Tuple[int, int, bool]:
+    if isinstance(fr, Chi):
+        num = 8 - fr.tile.real_num if mirror else fr.tile.real_num
+        return 0, num, False
+    else:
+        num = 10 - fr.tile.real_num if mirror else fr.tile.real_num
+        return 1 if isinstance(fr, Kan) else 2, num, isinstance(fr, Kan) and fr.ankan
+
+
+def canonicalize_hand(tiles: Sequence[Tile],
+                      furo: Optional[Sequence[Furo]] = None) -> Tuple[CanonicalHand, HandTransform]:
+    """
+    将手牌规范化：在所有不改变向听分析结果的变换中，选取使手牌表示最小的一个
+
+    等价的手牌（如“123m456p”与“789s456m”）规范化后得到相同的CanonicalHand，可以共享缓存的向听分析结果，
+    再通过HandTransform.restore_shanten_result还原为原手牌的结果。
+
+    :param tiles: 门前的牌
+    :param furo: 副露
+    :return: (规范化后的手牌, 变换)
+    """
+    if furo is None:
+        furo = ()
+
+    counts: List[List[int]] = [[0] * 10 for _ in range(4)]
+    for t in tiles:
+        counts[tile_type_index_mapping[t.tile_type]][t.real_num] += 1
+
+    furo_by_suit: Dict[int, List[Furo]] = dict((i, []) for i in range(4))
+    for fr in furo:
+        furo_by_suit[tile_type_index_mapping[fr.tile.tile_type]].append(fr)
+
+    # 数牌：每种花色取镜像前后较小的一种表示，再按表示排序决定变换后的花色
+    suit_keys = []
+    mirror = []
+    for i in range(3):
+        candidates = []
+        for m in (False, True):
+            nums = counts[i][1:10]
+            if m:
+                nums = nums[::-1]
+            candidates.append(((tuple(nums), tuple(sorted(_furo_signature(fr, m) for fr in furo_by_suit[i]))), m))
+        key, m = min(candidates)
+        suit_keys.append(key)
+        mirror.append(m)
+
+    suit_order = sorted(range(3), key=lambda x: suit_keys[x])
+    suit = [0, 0, 0]
+    for (canonical, i) in enumerate(suit_order):
+        suit[i] = canonical
+
+    # 字牌：风牌之间、三元牌之间按张数与副露排序
+    honor = [0] * 7
+    for honor_class in _honor_classes:
+        def honor_key(num: int):
+            return (counts[3][num],
+                    tuple(sorted(_furo_signature(fr, False)[0::2] for fr in furo_by_suit[3] if fr.tile.num == num)))
+
+        for (canonical, num) in zip(honor_class, sorted(honor_class, key=honor_key)):
+            honor[num - 1] = canonical
+
+    transform = HandTransform(suit=tuple(suit), mirror=tuple(mirror), honor=tuple(honor))
+    hand = CanonicalHand(
+        tiles=tuple(sorted(transform.apply(t) for t in tiles)),
+        furo=tuple(sorted((transform.apply_furo(fr) for fr in furo), key=repr)),
+    )
+    return hand, transform
+
+
+__all__ = ("CanonicalHand", "HandTransform", "canonicalize_hand",)
@@ -0,0 +1,335 @@
+"""
+清一色（单一花色）手牌的预计算索引
+
+索引包含所有单一花色的和牌形（张数为3k+2）及其全部面子分解，以及所有单一花色的听牌形（张数为3k+1）的待牌。
+索引文件在第一次调用get_chinitsu_index（或chinitsu_waits、chinitsu_patterns）时生成，之后以mmap的方式只读打开，
+可被多个进程共享。索引已加载时（loaded_chinitsu_index），is_agari与tenpai_waits（见mahjong_utils.tenpai）对单一花色的门前手牌
+直接查询索引，build_hora通过它拒绝不是和牌形的手牌；这些函数本身不会生成索引文件。向听分析（shanten）与和牌时的役种、番符
+仍由分析库计算，不使用索引。
+
+手牌以各数字的张数表示，编码为以5为底的整数：sum(counts[n-1] * 5 ** (n-1))。
+"""
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.hand_pattern import RegularHandPattern
+from mahjong_utils.models.mentsu import Mentsu, kotsu_pool, shuntsu_pool
+from mahjong_utils.models.tatsu import Tatsu
+from mahjong_utils.models.tile import Tile
+from mahjong_utils.models.tile_type import TileType
+
+FORMAT_VERSION = 1
+
+_magic = b"MJCN"
+_header = struct.Struct("=4sIIII")
+
+# 每个分解占5字节：雀头的数字，以及至多4个面子（1~9为刻子，11~17为以1~7开始的顺子，0为空）
+_decomposition_size = 5
+
+# 和牌形的标记
+FLAG_REGULAR = 1
+FLAG_CHITOI = 2
+
+
+def encode_counts(counts: Sequence[int]) -> int:
+    """
+    将各数字的张数（长度为9）编码为索引的键
+    """
+    key = 0
+    for c in reversed(counts):
+        key = key * 5 + c
+    return key
+
+
+def decode_counts(key: int) -> List[int]:
+    counts = []
+    for _ in range(9):
+        counts.append(key % 5)
+        key //= 5
+    return counts
+
+
+def _mentsu_counts(code: int) -> List[int]:
+    counts = [0] * 9
+    if code < 10:
+        counts[code - 1] = 3
+    else:
+        for n in range(code - 10, code - 7):
+            counts[n - 1] += 1
+    return counts
+
+
+def build_index() -> bytes:
+    """
+    生成索引
+    """
+    mentsu_codes = [*range(1, 10), *range(11, 18)]
+
+    # 和牌形 -> (标记, 分解)
+    agari: Dict[int, Tuple[int, Set[Tuple[int, ...]]]] = {}
+
+    for k in range(5):
+        for mentsu in combinations_with_replacement(mentsu_codes, k):
+            base = [0] * 9
+            for code in mentsu:
+                for (i, c) in enumerate(_mentsu_counts(code)):
+                    base[i] += c
+            if max(base) > 4:
+                continue
+
+            for jyantou in range(1, 10):
+                if base[jyantou - 1] + 2 > 4:
+                    continue
+
+                counts = list(base)
+                counts[jyantou - 1] += 2
+                key = encode_counts(counts)
+                flags, decompositions = agari.setdefault(key, (FLAG_REGULAR, set()))
+                decompositions.add((jyantou, *mentsu, *([0] * (4 - k))))
+
+    for pairs in combinations_with_replacement(range(1, 10), 7):
+        if len(set(pairs)) != 7:
+            continue
+        counts = [0] * 9
+        for n in pairs:
+            counts[n - 1] = 2
+        key = encode_counts(counts)
+        flags, decompositions = agari.get(key, (0, set()))
+        agari[key] = (flags | FLAG_CHITOI, decompositions)
+
+    # 听牌形 -> 待牌的位掩码（第n-1位为1表示待n）
+    tenpai: Dict[int, int] = {}
+    for key in agari:
+        counts = decode_counts(key)
+        for n in range(1, 10):
+            if counts[n - 1] > 0:
+                counts[n - 1] -= 1
+                tenpai_key = encode_counts(counts)
+                tenpai[tenpai_key] = tenpai.get(tenpai_key, 0) | (1 << (n - 1))
+                counts[n - 1] += 1
+
+    tenpai_keys = sorted(tenpai)
+    agari_keys = sorted(agari)
+
+    starts = [0]
+    decomposition_data = bytearray()
+    for key in agari_keys:
+        decompositions = sorted(agari[key][1])
+        for d in decompositions:
+            decomposition_data += bytes(d)
+        starts.append(starts[-1] + len(decompositions))
+
+    out = bytearray(_header.pack(_magic, FORMAT_VERSION, len(tenpai_keys), len(agari_keys), starts[-1]))
+    out += struct.pack(f"={len(tenpai_keys)}I", *tenpai_keys)
+    out += struct.pack(f"={len(agari_keys)}I", *agari_keys)
+    out += struct.pack(f"={len(starts)}I", *starts)
+    out += struct.pack(f"={len(tenpai_keys)}H", *(tenpai[key] for key in tenpai_keys))
+    out += bytes(agari[key][0] for key in agari_keys)
+    out += decomposition_data
+    return bytes(out)
+
+
+class ChinitsuIndex:
+    """
+    只读的清一色索引
+    """
+
+    def __init__(self, data: Union[bytes, mmap.mmap]) -> None:
+        self._data = data
+        view = memoryview(data)
+
+        magic, version, n_tenpai, n_agari, n_decompositions = _header.unpack_from(view)
+        if magic != _magic or version != FORMAT_VERSION:
+            raise ValueError("invalid chinitsu index")
+
+        pos = _header.size
+        self._tenpai_keys = view[pos:pos + n_tenpai * 4].cast("I")
+        pos += n_tenpai * 4
+        self._agari_keys = view[pos:pos + n_agari * 4].cast("I")
+        pos += n_agari * 4
+        self._agari_starts = view[pos:pos + (n_agari + 1) * 4].cast("I")
+        pos += (n_agari + 1) * 4
+        self._tenpai_waits = view[pos:pos + n_tenpai * 2].cast("H")
+        pos += n_tenpai * 2
+        self._agari_flags = view[pos:pos + n_agari]
+        pos += n_agari
+        self._decompositions = view[pos:pos + n_decompositions * _decomposition_size]
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "ChinitsuIndex":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def _find(keys: memoryview, key: int) -> int:
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return i
+        return -1
+
+    def waits(self, counts: Sequence[int]) -> int:
+        """
+        听牌形的待牌（位掩码，第n-1位为1表示待n），不是听牌形时为0
+        """
+        i = self._find(self._tenpai_keys, encode_counts(counts))
+        return self._tenpai_waits[i] if i >= 0 else 0
+
+    def agari_flags(self, counts: Sequence[int]) -> int:
+        """
+        和牌形的标记（FLAG_REGULAR、FLAG_CHITOI），不是和牌形时为0
+        """
+        i = self._find(self._agari_keys, encode_counts(counts))
+        return self._agari_flags[i] if i >= 0 else 0
+
+    def decompositions(self, counts: Sequence[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """
+        和牌形的全部面子分解，每个分解为(雀头的数字, 面子的编码)
+        """
+        i = self._find(self._agari_keys, encode_counts(counts))
+        if i < 0:
+            return []
+
+        ans = []
+        for j in range(self._agari_starts[i], self._agari_starts[i + 1]):
+            d = self._decompositions[j * _decomposition_size:(j + 1) * _decomposition_size]
+            ans.append((d[0], tuple(x for x in d[1:] if x != 0)))
+        return ans
+
+
+_index: Optional[ChinitsuIndex] = None
+_index_lock = threading.Lock()
+
+
+def default_index_path() -> Path:
+    """
+    索引文件的默认路径（可通过环境变量MAHJONG_UTILS_CHINITSU_INDEX指定）
+    """
+    path = os.environ.get("MAHJONG_UTILS_CHINITSU_INDEX")
+    if path:
+        return Path(path)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "mahjong-utils" / f"chinitsu-v{FORMAT_VERSION}.idx"
+
+
+def get_chinitsu_index() -> ChinitsuIndex:
+    """
+    获取清一色索引，索引文件不存在时生成；无法写入索引文件时在内存中使用
+    """
+    global _index
+    if _index is not None:
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            path = default_index_path()
+            try:
+                _index = ChinitsuIndex.open(path)
+            except (OSError, ValueError):
+                data = build_index()
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, path)
+                    _index = ChinitsuIndex.open(path)
+                except OSError:
+                    _index = ChinitsuIndex(data)
+        return _index
+
+
+def loaded_chinitsu_index() -> Optional[ChinitsuIndex]:
+    """
+    已通过get_chinitsu_index加载的清一色索引，尚未加载时为None（不生成、不打开索引文件）
+    """
+    return _index
+
+
+def chinitsu_counts(tiles: Sequence[Tile]) -> Optional[Tuple[TileType, List[int]]]:
+    """
+    若手牌均为同一种数牌，返回(花色, 各数字的张数)，否则返回None
+    """
+    if len(tiles) == 0:
+        return None
+
+    tile_type = tiles[0].tile_type
+    if tile_type == TileType.Z:
+        return None
+
+    counts = [0] * 9
+    for t in tiles:
+        if t.tile_type != tile_type:
+            return None
+        counts[t.real_num - 1] += 1
+    return tile_type, counts
+
+
+def _mentsu(tile_type: TileType, code: int) -> Mentsu:
+    if code < 10:
+        return kotsu_pool[Tile.by_type_and_num(tile_type, code).code]
+    else:
+        return shuntsu_pool[Tile.by_type_and_num(tile_type, code - 10).code]
+
+
+def chinitsu_waits(tiles: Sequence[Tile]) -> Optional[Set[Tile]]:
+    """
+    单一花色的手牌（张数为3k+1）的待牌；手牌不是单一花色时返回None
+    """
+    cc = chinitsu_counts(tiles)
+    if cc is None or len(tiles) % 3 != 1:
+        return None
+
+    tile_type, counts = cc
+    waits = get_chinitsu_index().waits(counts)
+    return set(Tile.by_type_and_num(tile_type, n) for n in range(1, 10) if waits & (1 << (n - 1)))
+
+
+def chinitsu_patterns(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None) -> Optional[List[RegularHandPattern]]:
+    """
+    单一花色的和牌形（张数为3k+2）的全部标准形分解；手牌不是单一花色时返回None，不是标准形的和牌形时返回空列表
+
+    :param tiles: 门前的牌
+    :param furo: 副露
+    """
+    cc = chinitsu_counts(tiles)
+    if cc is None or len(tiles) % 3 != 2:
+        return None
+
+    if furo is None:
+        furo = ()
+
+    tile_type, counts = cc
+    return [RegularHandPattern(
+        k=len(mentsu) + len(furo),
+        jyantou=Tile.by_type_and_num(tile_type, jyantou),
+        menzen_mentsu=tuple(_mentsu(tile_type, code) for code in mentsu),
+        furo=tuple(furo),
+    ) for (jyantou, mentsu) in get_chinitsu_index().decompositions(counts)]
+
+
+def chinitsu_agari_tatsu(pattern: RegularHandPattern, agari: Tile) -> List[Optional[Tatsu]]:
+    """
+    和牌在标准形分解中可能的位置：和牌前的搭子（单骑时为None）
+    """
+    # 分解中不含赤宝牌
+    agari = Tile.by_type_and_num(agari.tile_type, agari.real_num)
+
+    ans: List[Optional[Tatsu]] = []
+    if pattern.jyantou == agari:
+        ans.append(None)
+
+    for mt in set(pattern.menzen_mentsu):
+        if agari in mt.tiles:
+            ans.append(mt.after_discard(agari))
+    return ans
+
+
+__all__ = ("FLAG_REGULAR", "FLAG_CHITOI", "ChinitsuIndex", "build_index", "encode_counts", "decode_counts",
+           "default_index_path", "get_chinitsu_index", "loaded_chinitsu_index",
+           "chinitsu_counts", "chinitsu_waits", "chinitsu_patterns", "chinitsu_agari_tatsu",)
@@ -0,0 +1,331 @@
+import argparse
+import fileinput
+import json
+import queue
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Tuple, Optional, Sequence, TextIO
+
+from stringcase import snakecase
+
+from mahjong_utils.hora import build_hora
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.point_by_han_hu import get_parent_point_by_han_hu, get_child_point_by_han_hu
+from mahjong_utils.prefork import worker_pool
+from mahjong_utils.yaku import get_yaku
+
+operations = ("shanten", "furo-chance", "hora", "points")
+
+
+def _parse_tiles(value) -> List[Tile]:
+    if isinstance(value, str):
+        return parse_tiles(value)
+    return [Tile.by_text(t) for t in value]
+
+
+def _parse_task(op: str, line: str) -> dict:
+    """
+    将一行输入解析为参数
+
+    JSON对象的键与对应函数的参数名一致；否则按空格分隔：
+    shanten为“门前的牌 [副露...]”，furo-chance为“门前的牌 副露机会牌”，
+    hora为“手牌 [副露...]”（最后一张为和牌），points为“番 符”
+    """
+    if line.startswith("{"):
+        args = json.loads(line)
+        if "tiles" in args:
+            args["tiles"] = _parse_tiles(args["tiles"])
+        if "furo" in args:
+            args["furo"] = [Furo.parse(fr) for fr in args["furo"]]
+        if "chance_tile" in args:
+            args["chance_tile"] = Tile.by_text(args["chance_tile"])
+        if "agari" in args:
+            args["agari"] = Tile.by_text(args["agari"])
+        return args
+
+    tokens = line.split()
+    if op == "points":
+        return dict(han=int(tokens[0]), hu=int(tokens[1]))
+    elif op == "furo-chance":
+        return dict(tiles=parse_tiles(tokens[0]), chance_tile=Tile.by_text(tokens[1]))
+    else:
+        return dict(tiles=parse_tiles(tokens[0]), furo=[Furo.parse(fr) for fr in tokens[1:]])
+
+
+@lru_cache(maxsize=None)
+def _snake_case(key: str) -> str:
+    return snakecase(key)
+
+
+def _snake_keys(data: Any) -> Any:
+    # 分析库返回的数据的键为camelCase（牌、搭子等文本不受影响），转换为与其他操作一致的snake_case
+    if isinstance(data, dict):
+        return dict((_snake_case(k), _snake_keys(v)) for (k, v) in data.items())
+    elif isinstance(data, list):
+        return [_snake_keys(v) for v in data]
+    return data
+
+
+def _run_task(op: str, options: dict, args: dict) -> dict:
+    """
+    执行一行输入对应的操作，结果的键均为snake_case
+    """
+    if op == "shanten":
+        furo = args.get("furo")
+        return _snake_keys(libmahjongutils.call("shanten", {
+            "tiles": [str(t) for t in args["tiles"]],
+            "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
+            "calcAdvanceNum": args.get("calc_advance_num", options["calc_advance_num"]),
+            "bestShantenOnly": args.get("best_shanten_only", options["best_shanten_only"]),
+            "allowAnkan": args.get("allow_ankan", options["allow_ankan"]),
+        }))
+    elif op == "furo-chance":
+        return _snake_keys(libmahjongutils.call("furoChanceShanten", {
+            "tiles": [str(t) for t in args["tiles"]],
+            "chanceTile": args["chance_tile"].__encode__(),
+            "allowChi": args.get("allow_chi", options["allow_chi"]),
+            "calcAdvanceNum": args.get("calc_advance_num", options["calc_advance_num"]),
+            "bestShantenOnly": args.get("best_shanten_only", options["best_shanten_only"]),
+        }))
+    elif op == "hora":
+        tiles = args["tiles"]
+        hora = build_hora(
+            tiles, args.get("furo"), args.get("agari", tiles[-1]),
+            args.get("tsumo", options["tsumo"]),
+            dora=args.get("dora", 0),
+            self_wind=Wind[args["self_wind"]] if args.get("self_wind") is not None else None,
+            round_wind=Wind[args["round_wind"]] if args.get("round_wind") is not None else None,
+            extra_yaku=set(get_yaku(yk) for yk in args.get("extra_yaku", ())),
+        )
+        return dict(
+            yaku=sorted(yk.name for yk in hora.yaku),
+            han=hora.han,
+            hu=hora.hu,
+            dora=hora.dora,
+            has_yakuman=hora.has_yakuman,
+            parent_point=hora.parent_point,
+            child_point=hora.child_point,
+        )
+    elif op == "points":
+        return dict(
+            parent_point=get_parent_point_by_han_hu(args["han"], args["hu"]),
+            child_point=get_child_point_by_han_hu(args["han"], args["hu"]),
+        )
+    else:
+        raise ValueError("invalid operation: " + op)
+
+
+def _process_chunk(op: str, options: dict, chunk: Sequence[Tuple[int, str]]) -> List[str]:
+    output = []
+    for (line_no, line) in chunk:
+        try:
+            record = dict(line=line_no, result=_run_task(op, options, _parse_task(op, line)))
+        except Exception as e:
+            record = dict(line=line_no, error=f"{type(e).__name__}: {e}")
+        output.append(json.dumps(record, ensure_ascii=False))
+    return output
+
+
+def _chunks(lines: Iterable[str], skip: int, chunk_size: int) -> Iterator[Tuple[int, int, List[Tuple[int, str]]]]:
+    """
+    将输入分块，每块为(起始行号, 结束行号, [(行号, 行), ...])，相邻块的行号区间首尾相接
+    """
+    numbered = islice(enumerate(lines), skip, None)
+    start = skip
+    while True:
+        items = list(islice(numbered, chunk_size))
+        if len(items) == 0:
+            return
+        end = items[-1][0] + 1
+        chunk = [(i, line.strip()) for (i, line) in items if line.strip()]
+        yield start, end, chunk
+        start = end
+
+
+class Progress:
+    """
+    向标准错误输出报告处理进度与吞吐量
+    """
+
+    def __init__(self, skip: int, interval: float, stream: TextIO) -> None:
+        self.interval = interval
+        self.stream = stream
+        self.start_time = time.perf_counter()
+        self.last_report = self.start_time
+        self.processed = 0
+        # 此行号之前的输入均已输出；按输入顺序输出时之后的输入均未输出，可作为--skip的值恢复中断的任务
+        self.offset = skip
+        self._done_chunks = {}
+
+    def chunk_done(self, start: int, end: int, count: int):
+        self.processed += count
+        self._done_chunks[start] = end
+        while self.offset in self._done_chunks:
+            self.offset = self._done_chunks.pop(self.offset)
+
+        now = time.perf_counter()
+        if self.interval > 0 and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.start_time
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        print(f"processed {self.processed} lines in {elapsed:.1f}s ({rate:.1f} lines/s), offset={self.offset}",
+              file=self.stream, flush=True)
+
+
+def run(
+        op: str,
+        lines: Iterable[str],
+        output: TextIO,
+        *, workers: int = 1,
+        ordered: bool = True,
+        skip: int = 0,
+        chunk_size: int = 64,
+        options: Optional[dict] = None,
+        progress: Optional[Progress] = None,
+) -> int:
+    """
+    流式处理输入的每一行，并将结果以JSONL格式写出
+
+    :param op: 操作（shanten、furo-chance、hora、points）
+    :param lines: 输入的行
+    :param output: 输出
+    :param workers: 工作进程数（为1时在当前进程内处理）
+    :param ordered: 是否按输入顺序输出
+    :param skip: 跳过输入的前skip行（用于恢复中断的任务，只能在按输入顺序输出时使用）
+    :param chunk_size: 每次分派给工作进程的行数
+    :param options: 各行未指定时使用的默认参数
+    :param progress: 进度报告
+    :return: 处理的行数
+    """
+    if op not in operations:
+        raise ValueError("invalid operation: " + op)
+    if skip > 0 and not ordered:
+        # 不按顺序输出时，中断前offset之后的块可能已经写出，恢复时会重复输出
+        raise ValueError("skip requires ordered output")
+
+    default_options = dict(calc_advance_num=True, best_shanten_only=False, allow_ankan=True,
+                           allow_chi=True, tsumo=False)
+    if options is not None:
+        default_options.update(options)
+    options = default_options
+
+    if progress is None:
+        progress = Progress(skip, 0, sys.stderr)
+
+    def emit(chunk: Tuple[int, int, List[Tuple[int, str]]], records: List[str]):
+        for record in records:
+            output.write(record)
+            output.write("\n")
+        progress.chunk_done(chunk[0], chunk[1], len(chunk[2]))
+
+    chunks = _chunks(lines, skip, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            emit(chunk, _process_chunk(op, options, chunk[2]))
+        return progress.processed
+
+    # 限制同时在途的块数，使内存占用与输入规模无关
+    max_pending = workers * 4
+
+    # 子进程各自加载分析库，不复制父进程中的原生运行时状态（见prefork.worker_pool）
+    with worker_pool(workers) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, pool.apply_async(_process_chunk, (op, options, chunk[2]))))
+                while len(pending) >= max_pending:
+                    done_chunk, result = pending.popleft()
+                    emit(done_chunk, result.get())
+
+            while len(pending) > 0:
+                done_chunk, result = pending.popleft()
+                emit(done_chunk, result.get())
+        else:
+            done = queue.Queue()
+            in_flight = 0
+
+            def submit(chunk):
+                pool.apply_async(_process_chunk, (op, options, chunk[2]),
+                                 callback=lambda records: done.put((chunk, records, None)),
+                                 error_callback=lambda e: done.put((chunk, None, e)))
+
+            def collect():
+                done_chunk, records, error = done.get()
+                if error is not None:
+                    raise error
+                emit(done_chunk, records)
+
+            for chunk in chunks:
+                submit(chunk)
+                in_flight += 1
+                while in_flight >= max_pending:
+                    collect()
+                    in_flight -= 1
+
+            while in_flight > 0:
+                collect()
+                in_flight -= 1
+
+    return progress.processed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="mahjong-utils", description="批量进行向听、副露判断、和牌、点数分析，结果以JSONL格式输出")
+    parser.add_argument("operation", choices=operations, help="操作")
+    parser.add_argument("input", nargs="*", help="输入文件（每行一手牌，parse_tiles格式或JSON对象），缺省或为-时读取标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，缺省时写入标准输出")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="工作进程数")
+    parser.add_argument("--unordered", action="store_true", help="不按输入顺序输出（吞吐量更高）")
+    parser.add_argument("--skip", type=int, default=0,
+                        help="跳过输入的前N行（用于恢复中断的任务，取进度报告中的offset；不能与--unordered同时使用）")
+    parser.add_argument("--chunk-size", type=int, default=64, help="每次分派给工作进程的行数")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="进度报告的间隔秒数（为0时不报告）")
+    parser.add_argument("--no-advance-num", action="store_true", help="不计算进张数")
+    parser.add_argument("--best-shanten-only", action="store_true", help="仅计算最优向听数的打法")
+    parser.add_argument("--no-ankan", action="store_true", help="不允许暗杠")
+    parser.add_argument("--no-chi", action="store_true", help="不允许吃")
+    parser.add_argument("--tsumo", action="store_true", help="和牌分析时视为自摸")
+    args = parser.parse_args(argv)
+    if args.skip > 0 and args.unordered:
+        parser.error("--skip cannot be used with --unordered")
+
+    options = dict(
+        calc_advance_num=not args.no_advance_num,
+        best_shanten_only=args.best_shanten_only,
+        allow_ankan=not args.no_ankan,
+        allow_chi=not args.no_chi,
+        tsumo=args.tsumo,
+    )
+
+    progress = Progress(args.skip, args.progress_interval, sys.stderr)
+
+    lines = fileinput.input(args.input or ("-",), openhook=fileinput.hook_encoded("utf-8"))
+    output = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        run(args.operation, lines, output,
+            workers=args.workers, ordered=not args.unordered, skip=args.skip, chunk_size=args.chunk_size,
+            options=options, progress=progress)
+    except KeyboardInterrupt:
+        progress.report()
+        return 130
+    finally:
+        lines.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if args.progress_interval > 0:
+        progress.report()
+    return 0
+
+
+__all__ = ("Progress", "run", "main", "operations")
@@ -0,0 +1,429 @@
+"""
+分析结果的紧凑二进制编码
+
+编码对象为分析库返回的数据（由None、bool、int、float、str、list、dict组成）。
+牌（如"5m"）编码为1字节的Tile.code，面子、搭子（如"123m"）编码为每张牌1字节，
+分析库使用的字段名与类型名编码为1字节的序号，其余的字符串按UTF-8编码。
+
+结果模型（ShantenResult、Hora、HandPattern等）另有dumps_model/loads_model，模型的pickle也使用此编码（见reduce_model）。
+"""
+import struct
+from enum import Enum
+from typing import Any, List, Tuple, NamedTuple, Dict, Optional
+
+from mahjong_utils.models.tile import tile_by_text, tile_pool, Tile
+
+# 格式版本，编码规则变化时递增
+FORMAT_VERSION = 1
+
+# dumps_model的格式版本，模型的字段变化时递增
+MODEL_FORMAT_VERSION = 2
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_TILE = 6
+_TILES = 7
+_NAME = 8
+_LIST = 9
+_DICT = 10
+_TUPLE = 11
+_SET = 12
+_FROZENSET = 13
+_TILE_OBJ = 14
+_MODEL = 15
+_MELD = 16
+_ENUM = 17
+_YAKU = 18
+_TILE_SEQ = 19
+
+# 只能在末尾追加，否则需要递增FORMAT_VERSION
+_names: Tuple[str, ...] = (
+    # 向听分析
+    "type", "shantenNum", "advance", "advanceNum", "goodShapeAdvance", "goodShapeAdvanceNum",
+    "discardToAdvance", "ankanToAdvance", "pass", "chi", "pon", "minkan",
+    "ShantenWithoutGot", "ShantenWithGot", "ShantenWithFuroChance",
+    "hand", "shantenInfo", "regular", "chitoi", "kokushi", "tiles", "furo", "patterns",
+    "Regular", "Chitoi", "Kokushi", "Union", "FuroChance",
+    # 手牌结构
+    "RegularHandPattern", "ChitoiHandPattern", "KokushiHandPattern",
+    "k", "jyantou", "menzenMentsu", "tatsu", "remaining", "pairs", "yaochu", "repeated",
+    "tile", "ankan", "Chi", "Pon", "Kan",
+    # 和牌分析
+    "RegularHoraHandPattern", "ChitoiHoraHandPattern", "KokushiHoraHandPattern",
+    "pattern", "han", "dora", "yaku", "extraYaku", "hasYakuman",
+    "agari", "agariTatsu", "tsumo", "hu", "selfWind", "roundWind",
+    "East", "South", "West", "North",
+)
+_name_index = dict((name, i) for (i, name) in enumerate(_names))
+
+_tile_types = "mpsz"
+
+_float = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7f) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _is_tile_group(s: str) -> bool:
+    # 同一种类的2~4张牌，如"45p"、"123m"、"1111z"
+    return 3 <= len(s) <= 5 and s[-1] in _tile_types and s[:-1].isdigit()
+
+
+def _encode(out: bytearray, obj: Any):
+    if obj is None:
+        out.append(_NONE)
+    elif obj is True:
+        out.append(_TRUE)
+    elif obj is False:
+        out.append(_FALSE)
+    elif isinstance(obj, int):
+        out.append(_INT)
+        _write_varint(out, (obj << 1) if obj >= 0 else ((-obj << 1) - 1))
+    elif isinstance(obj, float):
+        out.append(_FLOAT)
+        out += _float.pack(obj)
+    elif isinstance(obj, str):
+        if obj in tile_by_text:
+            out.append(_TILE)
+            out.append(tile_by_text[obj].code)
+        elif obj in _name_index:
+            out.append(_NAME)
+            out.append(_name_index[obj])
+        elif _is_tile_group(obj):
+            out.append(_TILES)
+            out.append((_tile_types.index(obj[-1]) << 4) | (len(obj) - 1))
+            out += bytes(ord(c) - ord('0') for c in obj[:-1])
+        else:
+            raw = obj.encode("utf-8")
+            out.append(_STR)
+            _write_varint(out, len(raw))
+            out += raw
+    elif isinstance(obj, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(obj))
+        for x in obj:
+            _encode(out, x)
+    elif isinstance(obj, dict):
+        out.append(_DICT)
+        _write_varint(out, len(obj))
+        for (k, v) in obj.items():
+            _encode(out, k)
+            _encode(out, v)
+    else:
+        raise TypeError(f"cannot encode object of type {type(obj).__name__}")
+
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+
+    if tag == _NONE:
+        return None, pos
+    elif tag == _FALSE:
+        return False, pos
+    elif tag == _TRUE:
+        return True, pos
+    elif tag == _INT:
+        value, pos = _read_varint(data, pos)
+        return (value >> 1) if value & 1 == 0 else -((value + 1) >> 1), pos
+    elif tag == _FLOAT:
+        return _float.unpack_from(data, pos)[0], pos + _float.size
+    elif tag == _STR:
+        length, pos = _read_varint(data, pos)
+        return data[pos:pos + length].decode("utf-8"), pos + length
+    elif tag == _TILE:
+        return str(Tile.by_code(data[pos])), pos + 1
+    elif tag == _NAME:
+        return _names[data[pos]], pos + 1
+    elif tag == _TILES:
+        header = data[pos]
+        length = header & 0xf
+        nums = "".join(str(x) for x in data[pos + 1:pos + 1 + length])
+        return nums + _tile_types[header >> 4], pos + 1 + length
+    elif tag == _LIST:
+        length, pos = _read_varint(data, pos)
+        items: List[Any] = []
+        for _ in range(length):
+            x, pos = _decode(data, pos)
+            items.append(x)
+        return items, pos
+    elif tag == _DICT:
+        length, pos = _read_varint(data, pos)
+        d = {}
+        for _ in range(length):
+            k, pos = _decode(data, pos)
+            v, pos = _decode(data, pos)
+            d[k] = v
+        return d, pos
+    else:
+        raise ValueError(f"invalid tag: {tag}")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    将分析库返回的数据编码为二进制
+    """
+    out = bytearray((FORMAT_VERSION,))
+    _encode(out, obj)
+    return bytes(out)
+
+
+def loads(data: bytes) -> Any:
+    """
+    将dumps编码的二进制解码为分析库返回的数据
+    """
+    if len(data) == 0 or data[0] != FORMAT_VERSION:
+        raise ValueError("unsupported format version")
+
+    obj, pos = _decode(data, 1)
+    if pos != len(data):
+        raise ValueError("trailing data")
+    return obj
+
+
+def _model_registry():
+    # 延迟导入，避免与模型模块循环导入（多个线程同时初始化时得到的内容相同，无需加锁）
+    global _registry
+    if _registry is None:
+        from mahjong_utils.hora import Hora
+        from mahjong_utils.models.furo import Chi, Pon, Kan, chi_pool, pon_pool, minkan_pool, ankan_pool
+        from mahjong_utils.models.hand import Hand
+        from mahjong_utils.models.hand_pattern import RegularHandPattern, ChitoiHandPattern, KokushiHandPattern
+        from mahjong_utils.models.hora_hand_pattern import RegularHoraHandPattern, ChitoiHoraHandPattern, \
+            KokushiHoraHandPattern
+        from mahjong_utils.models.mentsu import Kotsu, Shuntsu, kotsu_pool, shuntsu_pool
+        from mahjong_utils.models.tatsu import Toitsu, Ryanmen, Kanchan, Penchan, \
+            toitsu_pool, ryanmen_pool, kanchan_pool, penchan_pool
+        from mahjong_utils.models.wind import Wind
+        from mahjong_utils.shanten import ShantenWithoutGot, ShantenWithGot, ShantenWithFuroChance, ShantenResult, \
+            ShantenResultType
+        from mahjong_utils.yaku import Yaku
+
+        # 只能在末尾追加，否则需要递增MODEL_FORMAT_VERSION
+        models = (ShantenWithoutGot, ShantenWithGot, ShantenWithFuroChance, ShantenResult, Hand,
+                  RegularHandPattern, ChitoiHandPattern, KokushiHandPattern,
+                  RegularHoraHandPattern, ChitoiHoraHandPattern, KokushiHoraHandPattern, Hora)
+        melds = (Kotsu, Shuntsu, Chi, Pon, Kan, Toitsu, Ryanmen, Kanchan, Penchan)
+        # 与melds对应的对象池（按是否暗杠）
+        meld_pools = ((kotsu_pool, kotsu_pool), (shuntsu_pool, shuntsu_pool), (chi_pool, chi_pool),
+                      (pon_pool, pon_pool), (minkan_pool, ankan_pool), (toitsu_pool, toitsu_pool),
+                      (ryanmen_pool, ryanmen_pool), (kanchan_pool, kanchan_pool), (penchan_pool, penchan_pool))
+        enums = (ShantenResultType, Wind)
+
+        _registry = _Registry(
+            models=models,
+            model_index=dict((cls, i) for (i, cls) in enumerate(models)),
+            model_fields=tuple(tuple(cls.__fields__) for cls in models),
+            melds=melds,
+            meld_index=dict((cls, i) for (i, cls) in enumerate(melds)),
+            meld_pools=meld_pools,
+            enums=tuple(tuple(cls) for cls in enums),
+            enum_index=dict((cls, i) for (i, cls) in enumerate(enums)),
+            yaku=Yaku,
+        )
+    return _registry
+
+
+class _Registry(NamedTuple):
+    models: Tuple[type, ...]
+    model_index: Dict[type, int]
+    model_fields: Tuple[Tuple[str, ...], ...]
+    melds: Tuple[type, ...]
+    meld_index: Dict[type, int]
+    meld_pools: Tuple[Tuple[Tuple[Any, ...], Tuple[Any, ...]], ...]
+    enums: Tuple[Tuple[Enum, ...], ...]
+    enum_index: Dict[type, int]
+    yaku: type
+
+
+_registry: Optional[_Registry] = None
+
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+
+# 面子、搭子是不可变的，解码时复用对象池中的对象；不在对象池中的（如含赤宝牌的）缓存于此
+_meld_cache: Dict[Tuple[int, int, bool], Any] = {}
+
+
+def _encode_model(out: bytearray, obj: Any, registry: _Registry):
+    cls = type(obj)
+    if obj is None or obj is True or obj is False or cls is int or cls is str:
+        _encode(out, obj)
+    elif cls is Tile:
+        out.append(_TILE_OBJ)
+        out.append(obj.code)
+    elif cls in registry.model_index:
+        i = registry.model_index[cls]
+        out.append(_MODEL)
+        out.append(i)
+        for name in registry.model_fields[i]:
+            _encode_model(out, getattr(obj, name), registry)
+    elif cls in registry.meld_index:
+        out.append(_MELD)
+        out.append(registry.meld_index[cls])
+        t = obj.first if hasattr(obj, "first") else obj.tile
+        out.append(t.code)
+        out.append(1 if getattr(obj, "ankan", False) else 0)
+    elif cls in registry.enum_index:
+        i = registry.enum_index[cls]
+        out.append(_ENUM)
+        out.append(i)
+        out.append(registry.enums[i].index(obj))
+    elif cls is registry.yaku:
+        out.append(_YAKU)
+        _encode(out, obj.name)
+    elif cls is tuple or cls is list or cls is set or cls is frozenset:
+        kind = _TUPLE if cls is tuple else _LIST if cls is list else _SET if cls is set else _FROZENSET
+        if len(obj) > 0 and all(type(x) is Tile for x in obj):
+            # 牌的序列或集合编码为连续的Tile.code
+            out.append(_TILE_SEQ)
+            out.append(kind)
+            _write_varint(out, len(obj))
+            out += bytes(x.code for x in obj)
+        else:
+            out.append(kind)
+            _write_varint(out, len(obj))
+            for x in obj:
+                _encode_model(out, x, registry)
+    elif cls is dict:
+        out.append(_DICT)
+        _write_varint(out, len(obj))
+        for (k, v) in obj.items():
+            _encode_model(out, k, registry)
+            _encode_model(out, v, registry)
+    else:
+        raise TypeError(f"cannot encode object of type {cls.__name__}")
+
+
+def _decode_model(data: bytes, pos: int, registry: _Registry) -> Tuple[Any, int]:
+    tag = data[pos]
+
+    if tag == _TILE_OBJ:
+        return tile_pool[data[pos + 1]], pos + 2
+    elif tag == _MODEL:
+        i = data[pos + 1]
+        pos += 2
+        values = {}
+        for name in registry.model_fields[i]:
+            # 字段多为None或较小的整数，直接解码以减少递归调用
+            t = data[pos]
+            if t == _NONE:
+                values[name] = None
+                pos += 1
+            elif t == _INT and data[pos + 1] < 0x80:
+                v = data[pos + 1]
+                values[name] = (v >> 1) if v & 1 == 0 else -((v + 1) >> 1)
+                pos += 2
+            else:
+                values[name], pos = _decode_model(data, pos, registry)
+        # 编码前的对象已经过校验，无需再次校验（等同于BaseModel.construct，但省去了对字段的遍历）
+        m = _object_new(registry.models[i])
+        _object_setattr(m, "__dict__", values)
+        _object_setattr(m, "__fields_set__", set(values))
+        return m, pos
+    elif tag == _MELD:
+        key = (data[pos + 1], data[pos + 2], data[pos + 3] != 0)
+        meld = registry.meld_pools[key[0]][key[2]][key[1]]
+        if meld is None:
+            meld = _meld_cache.get(key)
+        if meld is None:
+            cls = registry.melds[key[0]]
+            tile = tile_pool[key[1]]
+            meld = cls(tile, key[2]) if "ankan" in cls.__dataclass_fields__ else cls(tile)
+            # 多个线程同时解码时只保留先写入的对象
+            meld = _meld_cache.setdefault(key, meld)
+        return meld, pos + 4
+    elif tag == _ENUM:
+        return registry.enums[data[pos + 1]][data[pos + 2]], pos + 3
+    elif tag == _YAKU:
+        from mahjong_utils.yaku import get_yaku
+        name, pos = _decode(data, pos + 1)
+        return get_yaku(name), pos
+    elif tag == _TILE_SEQ:
+        kind = data[pos + 1]
+        length, pos = _read_varint(data, pos + 2)
+        tiles = [tile_pool[c] for c in data[pos:pos + length]]
+        pos += length
+        if kind == _TUPLE:
+            return tuple(tiles), pos
+        elif kind == _SET:
+            return set(tiles), pos
+        elif kind == _FROZENSET:
+            return frozenset(tiles), pos
+        return tiles, pos
+    elif tag in (_TUPLE, _LIST, _SET, _FROZENSET):
+        length, pos = _read_varint(data, pos + 1)
+        items = []
+        for _ in range(length):
+            x, pos = _decode_model(data, pos, registry)
+            items.append(x)
+        if tag == _TUPLE:
+            return tuple(items), pos
+        elif tag == _SET:
+            return set(items), pos
+        elif tag == _FROZENSET:
+            return frozenset(items), pos
+        return items, pos
+    elif tag == _DICT:
+        length, pos = _read_varint(data, pos + 1)
+        d = {}
+        for _ in range(length):
+            k, pos = _decode_model(data, pos, registry)
+            d[k], pos = _decode_model(data, pos, registry)
+        return d, pos
+    else:
+        return _decode(data, pos)
+
+
+def dumps_model(obj: Any) -> bytes:
+    """
+    将结果模型（ShantenResult、Hora、HandPattern等）编码为二进制
+
+    模型的每个字段按声明顺序编码，牌编码为1字节的Tile.code，面子、搭子编码为类型、牌与是否暗杠共3字节
+    """
+    out = bytearray((MODEL_FORMAT_VERSION,))
+    _encode_model(out, obj, _model_registry())
+    return bytes(out)
+
+
+def loads_model(data: bytes) -> Any:
+    """
+    将dumps_model编码的二进制解码为结果模型
+    """
+    if len(data) == 0 or data[0] != MODEL_FORMAT_VERSION:
+        raise ValueError("unsupported format version")
+
+    obj, pos = _decode_model(data, 1, _model_registry())
+    if pos != len(data):
+        raise ValueError("trailing data")
+    return obj
+
+
+def reduce_model(obj: Any) -> Tuple[Any, Tuple[bytes]]:
+    """
+    用于实现结果模型的__reduce__，使pickle使用dumps_model的编码
+    """
+    return loads_model, (dumps_model(obj),)
+
+__all__ = ("FORMAT_VERSION", "MODEL_FORMAT_VERSION", "dumps", "loads", "dumps_model", "loads_model",
+           "reduce_model",)
@@ -0,0 +1,112 @@
+from typing import NamedTuple, Optional, Sequence, Dict, List
+
+import numpy as np
+
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import Tile, tile_by_text
+
+
+def _tiles_mask(tiles: Sequence[str]) -> int:
+    mask = 0
+    for t in tiles:
+        mask |= 1 << tile_by_text[t].code
+    return mask
+
+
+class ShantenWithoutGotColumns(NamedTuple):
+    """
+    按列存储的一组未摸牌状态的向听分析结果（每行对应打出或暗杠一张牌后的手牌）
+
+    牌以Tile.code表示，进张以位掩码表示（第code位为1表示该牌为进张）；未计算的进张数记为-1
+    """
+
+    tile: np.ndarray
+    shanten: np.ndarray
+    advance: np.ndarray
+    advance_num: np.ndarray
+    good_shape_advance_num: np.ndarray
+
+    @classmethod
+    def __decode__(cls, data: Dict[str, dict]) -> "ShantenWithoutGotColumns":
+        tile: List[int] = []
+        shanten: List[int] = []
+        advance: List[int] = []
+        advance_num: List[int] = []
+        good_shape_advance_num: List[int] = []
+
+        for (k, v) in data.items():
+            tile.append(tile_by_text[k].code)
+            shanten.append(v["shantenNum"])
+            advance.append(_tiles_mask(v["advance"]))
+            advance_num.append(v["advanceNum"] if v["advanceNum"] is not None else -1)
+            good_shape_advance_num.append(v["goodShapeAdvanceNum"] if v["goodShapeAdvanceNum"] is not None else -1)
+
+        return ShantenWithoutGotColumns(
+            tile=np.array(tile, dtype=np.uint8),
+            shanten=np.array(shanten, dtype=np.int8),
+            advance=np.array(advance, dtype=np.uint64),
+            advance_num=np.array(advance_num, dtype=np.int32),
+            good_shape_advance_num=np.array(good_shape_advance_num, dtype=np.int32),
+        )
+
+    def order(self) -> np.ndarray:
+        """
+        按向听数升序、进张数降序、好型进张数降序排序后的行下标
+        """
+        return np.lexsort((-self.good_shape_advance_num, -self.advance_num, self.shanten))
+
+    def tiles(self) -> List[Tile]:
+        return [Tile.by_code(int(code)) for code in self.tile]
+
+
+class ShantenWithGotColumns(NamedTuple):
+    """
+    按列存储的已摸牌状态的向听分析结果
+    """
+
+    shanten: int
+    discard_to_advance: ShantenWithoutGotColumns
+    ankan_to_advance: ShantenWithoutGotColumns
+
+    @classmethod
+    def __decode__(cls, data: dict) -> "ShantenWithGotColumns":
+        if data['type'] != 'ShantenWithGot':
+            raise ValueError("invalid type: " + data['type'])
+
+        return ShantenWithGotColumns(
+            shanten=data["shantenNum"],
+            discard_to_advance=ShantenWithoutGotColumns.__decode__(data["discardToAdvance"]),
+            ankan_to_advance=ShantenWithoutGotColumns.__decode__(data["ankanToAdvance"]),
+        )
+
+
+def shanten_with_got_columns(
+        tiles: Sequence[Tile],
+        furo: Optional[Sequence[Furo]] = None,
+        calc_advance_num: bool = True,
+        best_shanten_only: bool = False,
+        allow_ankan: bool = True,
+) -> ShantenWithGotColumns:
+    """
+    向听分析（已摸牌状态），以列的形式返回各打法的结果，不构造逐个打法的ShantenWithoutGot对象
+
+    :param tiles: 门前的牌（必须为已摸牌状态）
+    :param furo: 副露
+    :param calc_advance_num: 是否计算进张数
+    :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param allow_ankan: 是否允许暗杠
+    :return 按列存储的向听分析结果
+    """
+    result = libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in tiles],
+        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
+        "calcAdvanceNum": calc_advance_num,
+        "bestShantenOnly": best_shanten_only,
+        "allowAnkan": allow_ankan,
+    })
+
+    return ShantenWithGotColumns.__decode__(result["shantenInfo"])
+
+
+__all__ = ("ShantenWithoutGotColumns", "ShantenWithGotColumns", "shanten_with_got_columns",)
@@ -0,0 +1,369 @@
+"""
+定长二进制手牌语料格式（需要安装numpy）
+
+文件由16字节的文件头（魔数MJHC、版本、每条记录的字节数、记录数）与若干条48字节的记录组成。
+每条记录包含门前各牌的张数（按34种牌的序号，赤宝牌计入对应的5）、赤宝牌数、至多4个副露（赤宝牌记录在标记中）、和牌、自风、场风、
+宝牌数与标记，
+读取时以mmap映射为NumPy的结构化数组，切片不复制数据。
+
+34种牌的序号：万子0~8、筒子9~17、索子18~26、字牌27~33。
+"""
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.furo import Furo, Chi, Pon, Kan
+from mahjong_utils.models.tile import Tile, tile_pool
+from mahjong_utils.models.wind import Wind
+
+FORMAT_VERSION = 1
+
+_magic = b"MJHC"
+_header = struct.Struct("=4sHHQ")
+
+record_dtype = np.dtype([
+    ("counts", np.uint8, (34,)),
+    # 赤宝牌数，每种数牌占2位（万子第0~1位、筒子第2~3位、索子第4~5位）
+    ("red", np.uint8),
+    # 副露的种类（FURO_*），与副露的第一张牌的序号
+    ("furo_kind", np.uint8, (4,)),
+    ("furo_tile", np.uint8, (4,)),
+    # 和牌的序号，没有时为NONE
+    ("agari", np.uint8),
+    # 风（Wind的值），没有时为NONE
+    ("self_wind", np.uint8),
+    ("round_wind", np.uint8),
+    ("dora", np.uint8),
+    # FLAG_*
+    ("flags", np.uint8),
+])
+
+NONE = 0xFF
+
+FURO_NONE = 0
+FURO_CHI = 1
+FURO_PON = 2
+FURO_MINKAN = 3
+FURO_ANKAN = 4
+
+FLAG_TSUMO = 1
+FLAG_AGARI_RED = 2
+# 第i个副露的牌为赤宝牌（如Pon(0m)）时，标记中FLAG_FURO_RED << i位为1
+FLAG_FURO_RED = 4
+
+# 序号 -> 牌（不含赤宝牌），与其文本
+_tiles_34: Tuple[Tile, ...] = tuple(t for t in tile_pool if t is not None and t.num != 0)
+_texts_34: Tuple[str, ...] = tuple(str(t) for t in _tiles_34)
+_red_texts = ("0m", "0p", "0s")
+
+
+def tile_index(t: Tile) -> int:
+    """
+    牌的序号（赤宝牌与对应的5相同）
+    """
+    return t.code // 10 * 9 + t.real_num - 1
+
+
+def encode_hand(
+        tiles: Sequence[Tile],
+        furo: Optional[Sequence[Furo]] = None,
+        agari: Optional[Tile] = None,
+        tsumo: bool = False,
+        self_wind: Optional[Wind] = None,
+        round_wind: Optional[Wind] = None,
+        dora: int = 0,
+) -> np.void:
+    """
+    将手牌编码为一条记录
+    """
+    record = np.zeros((), dtype=record_dtype)
+    counts = record["counts"]
+    red = 0
+    for t in tiles:
+        counts[tile_index(t)] += 1
+        if t.num == 0:
+            red += 1 << (t.code // 10 * 2)
+    record["red"] = red
+
+    flags = FLAG_TSUMO if tsumo else 0
+    if furo is not None:
+        if len(furo) > 4:
+            raise ValueError("too many furo")
+        for (i, fr) in enumerate(furo):
+            if isinstance(fr, Chi):
+                kind = FURO_CHI
+            elif isinstance(fr, Pon):
+                kind = FURO_PON
+            elif isinstance(fr, Kan):
+                kind = FURO_ANKAN if fr.ankan else FURO_MINKAN
+            else:
+                raise ValueError(f"invalid furo: {fr}")
+            record["furo_kind"][i] = kind
+            record["furo_tile"][i] = tile_index(fr.tile)
+            if fr.tile.num == 0:
+                flags |= FLAG_FURO_RED << i
+
+    if agari is not None:
+        record["agari"] = tile_index(agari)
+        if agari.num == 0:
+            flags |= FLAG_AGARI_RED
+    else:
+        record["agari"] = NONE
+
+    record["self_wind"] = self_wind if self_wind is not None else NONE
+    record["round_wind"] = round_wind if round_wind is not None else NONE
+    record["dora"] = dora
+    record["flags"] = flags
+    return record[()]
+
+
+def record_tile_texts(record: np.void) -> List[str]:
+    """
+    记录中门前的牌的文本（按序号排列，与sorted(tiles)的顺序相同），不构造Tile对象
+    """
+    ans = []
+    red = int(record["red"])
+    for (i, c) in enumerate(record["counts"].tolist()):
+        if c == 0:
+            continue
+        if i < 27 and i % 9 == 4:
+            r = red >> (i // 9 * 2) & 3
+            ans += [_texts_34[i]] * (c - r)
+            ans += [_red_texts[i // 9]] * r
+        else:
+            ans += [_texts_34[i]] * c
+    return ans
+
+
+def record_tiles_text(record: np.void) -> str:
+    """
+    记录中门前的牌的文本（同tiles_text，按序号排列）
+    """
+    ans = []
+    prev_type = None
+    for t in record_tile_texts(record):
+        if prev_type is not None and prev_type != t[1]:
+            ans.append(prev_type)
+        ans.append(t[0])
+        prev_type = t[1]
+    if prev_type is not None:
+        ans.append(prev_type)
+    return "".join(ans)
+
+
+def _furo_tile_text(record: np.void, j: int, i: int) -> str:
+    # 第j个副露的牌（序号为i）的文本
+    if record["flags"] & (FLAG_FURO_RED << j):
+        return _red_texts[i // 9]
+    return _texts_34[i]
+
+
+def record_furo_dicts(record: np.void) -> List[dict]:
+    """
+    记录中的副露，编码为分析库使用的格式（同Furo.__encode__），不构造Furo对象
+    """
+    ans = []
+    for (j, (kind, i)) in enumerate(zip(record["furo_kind"].tolist(), record["furo_tile"].tolist())):
+        if kind == FURO_CHI:
+            ans.append(dict(type="Chi", tile=_furo_tile_text(record, j, i)))
+        elif kind == FURO_PON:
+            ans.append(dict(type="Pon", tile=_furo_tile_text(record, j, i)))
+        elif kind == FURO_MINKAN or kind == FURO_ANKAN:
+            ans.append(dict(type="Kan", tile=_furo_tile_text(record, j, i), ankan=kind == FURO_ANKAN))
+    return ans
+
+
+def record_furo_texts(record: np.void) -> List[str]:
+    """
+    记录中的副露的文本（同repr(Furo)）
+    """
+    ans = []
+    for (j, (kind, i)) in enumerate(zip(record["furo_kind"].tolist(), record["furo_tile"].tolist())):
+        if kind == FURO_NONE:
+            continue
+        num, tile_type = _furo_tile_text(record, j, i)
+        if kind == FURO_CHI:
+            n = int(num)
+            ans.append(f"{n}{n + 1}{n + 2}{tile_type}")
+        elif kind == FURO_PON:
+            ans.append(num * 3 + tile_type)
+        elif kind == FURO_MINKAN:
+            ans.append(num * 4 + tile_type)
+        else:
+            ans.append(f"0{num}{num}0{tile_type}")
+    return ans
+
+
+def record_agari_text(record: np.void) -> Optional[str]:
+    i = int(record["agari"])
+    if i == NONE:
+        return None
+    if record["flags"] & FLAG_AGARI_RED:
+        return _red_texts[i // 9]
+    return _texts_34[i]
+
+
+def decode_hand(record: np.void) -> dict:
+    """
+    将一条记录解码为build_hora的关键字参数（tiles、furo、agari、tsumo、self_wind、round_wind、dora）
+    """
+    agari = record_agari_text(record)
+    return dict(
+        tiles=[Tile.by_text(t) for t in record_tile_texts(record)],
+        furo=[Furo.__decode__(fr) for fr in record_furo_dicts(record)],
+        agari=Tile.by_text(agari) if agari is not None else None,
+        tsumo=bool(record["flags"] & FLAG_TSUMO),
+        self_wind=Wind(int(record["self_wind"])) if record["self_wind"] != NONE else None,
+        round_wind=Wind(int(record["round_wind"])) if record["round_wind"] != NONE else None,
+        dora=int(record["dora"]),
+    )
+
+
+class CorpusWriter:
+    """
+    将手牌逐条写入语料文件，记录数在close时写入文件头
+    """
+
+    def __init__(self, path: Union[str, Path], buffer_size: int = 4096) -> None:
+        self._f = open(path, "wb")
+        self._f.write(_header.pack(_magic, FORMAT_VERSION, record_dtype.itemsize, 0))
+        self._buffer = np.zeros(buffer_size, dtype=record_dtype)
+        self._buffered = 0
+        self.count = 0
+
+    def write(self, tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None, **kwargs) -> None:
+        """
+        写入一手牌（其他参数同encode_hand）
+        """
+        self._buffer[self._buffered] = encode_hand(tiles, furo, **kwargs)
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def write_records(self, records: np.ndarray) -> None:
+        """
+        写入已编码的记录
+        """
+        if records.dtype != record_dtype:
+            raise ValueError("invalid record dtype")
+        self.flush()
+        self._f.write(np.ascontiguousarray(records).tobytes())
+        self.count += len(records)
+
+    def flush(self) -> None:
+        if self._buffered > 0:
+            self._f.write(self._buffer[:self._buffered].tobytes())
+            self.count += self._buffered
+            self._buffered = 0
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.seek(0)
+        self._f.write(_header.pack(_magic, FORMAT_VERSION, record_dtype.itemsize, self.count))
+        self._f.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def write_corpus(path: Union[str, Path], hands: Iterable[Union[Sequence[Tile], dict]]) -> int:
+    """
+    将手牌写入语料文件
+
+    :param hands: 门前的牌，或encode_hand的关键字参数
+    :return: 写入的记录数
+    """
+    with CorpusWriter(path) as writer:
+        for hand in hands:
+            if isinstance(hand, dict):
+                writer.write(**hand)
+            else:
+                writer.write(hand)
+    return writer.count
+
+
+class Corpus:
+    """
+    只读的语料文件，记录以mmap映射为NumPy的结构化数组（records），切片与字段（如records["counts"]）均不复制数据
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        with open(path, "rb") as f:
+            magic, version, record_size, count = _header.unpack(f.read(_header.size))
+        if magic != _magic or version != FORMAT_VERSION or record_size != record_dtype.itemsize:
+            raise ValueError("invalid corpus file")
+
+        if count > 0:
+            self.records: np.ndarray = np.memmap(path, dtype=record_dtype, mode="r",
+                                                 offset=_header.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=record_dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, item) -> np.ndarray:
+        return self.records[item]
+
+    def __iter__(self) -> Iterator[np.void]:
+        return iter(self.records)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        各记录门前各牌的张数，形状为(记录数, 34)
+        """
+        return self.records["counts"]
+
+    def hand(self, i: int) -> dict:
+        """
+        第i条记录解码后的手牌（同decode_hand）
+        """
+        return decode_hand(self.records[i])
+
+
+def shanten_numbers(
+        records: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        *, allow_ankan: bool = True,
+) -> np.ndarray:
+    """
+    对语料中的每条记录（或其切片）进行向听分析，返回向听数的数组，不构造Tile与ShantenResult对象
+
+    :param records: 语料的记录（Corpus.records或其切片）
+    :param out: 写入结果的int8数组（长度与records相同），为None时新建
+    :param allow_ankan: 是否允许暗杠
+    :return: 各记录的向听数
+    """
+    if records.dtype != record_dtype:
+        raise ValueError("invalid record dtype")
+    if out is None:
+        out = np.empty(len(records), dtype=np.int8)
+
+    for (i, record) in enumerate(records):
+        result = libmahjongutils.call("shanten", {
+            "tiles": record_tile_texts(record),
+            "furo": record_furo_dicts(record),
+            "calcAdvanceNum": False,
+            "bestShantenOnly": True,
+            "allowAnkan": allow_ankan,
+        })
+        out[i] = result["shantenInfo"]["shantenNum"]
+    return out
+
+
+__all__ = ("FORMAT_VERSION", "record_dtype", "NONE",
+           "FURO_NONE", "FURO_CHI", "FURO_PON", "FURO_MINKAN", "FURO_ANKAN", "FLAG_TSUMO", "FLAG_AGARI_RED",
+           "FLAG_FURO_RED",
+           "tile_index", "encode_hand", "decode_hand",
+           "record_tile_texts", "record_tiles_text", "record_furo_dicts", "record_furo_texts", "record_agari_text",
+           "CorpusWriter", "write_corpus", "Corpus", "shanten_numbers",)
@@ -0,0 +1,152 @@
+"""
+有时间预算的分析
+
+库的调用无法中途取消，因此在后台线程中按阶段依次调用，到达截止时间时返回已完成的阶段的结果；
+被放弃的调用不再开始后面的阶段，正在进行的调用在后台继续执行至结束（结果被丢弃）。
+
+后台线程来自一个有上限的线程池（默认min(32, CPU数+4)，可通过环境变量MAHJONG_UTILS_DEADLINE_WORKERS指定），
+被放弃的调用不会无限制地累积线程；线程都被占用时新的调用排队等待，超出时间预算后不再执行。
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from mahjong_utils.metrics import metrics
+
+T = TypeVar("T")
+
+_max_workers = int(os.environ.get("MAHJONG_UTILS_DEADLINE_WORKERS", 0)) or min(32, (os.cpu_count() or 1) + 4)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(_max_workers, thread_name_prefix="mahjong-utils-deadline")
+        return _executor
+
+
+def _after_fork_in_child() -> None:
+    # 线程池的线程不会被fork到子进程中
+    global _executor, _executor_lock, _in_flight
+    _executor = None
+    _executor_lock = threading.Lock()
+    _in_flight = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def in_flight() -> int:
+    """
+    已提交到后台、尚未结束的调用数（包括超出时间预算而被放弃、仍在执行或排队的调用）
+    """
+    with _executor_lock:
+        return _in_flight
+
+
+def resolve_deadline(deadline: Optional[float], time_budget: Optional[float]) -> Optional[float]:
+    """
+    将截止时间（time.monotonic()的时刻）与时间预算（秒）合并为截止时间，两者都未指定时返回None
+    """
+    if time_budget is not None:
+        budget_deadline = time.monotonic() + time_budget
+        if deadline is None or budget_deadline < deadline:
+            deadline = budget_deadline
+    return deadline
+
+
+def run_anytime(name: str, stages: Sequence[Callable[[], T]], deadline: float,
+                min_stages: int = 0) -> Tuple[List[T], bool]:
+    """
+    在后台线程中依次执行各阶段，等待至全部完成或到达截止时间
+
+    :param name: 用于统计的名称
+    :param stages: 各阶段，后面的阶段给出更完整的结果
+    :param deadline: 截止时间（time.monotonic()的时刻）
+    :param min_stages: 至少等待完成的阶段数，到达截止时间时仍未完成的也继续等待
+    :return: (截止时间前完成的各阶段的结果, 是否全部完成)
+    """
+    global _in_flight
+
+    if min_stages == 0 and deadline <= time.monotonic():
+        metrics.add(f"deadline.overrun.{name}")
+        return [], False
+
+    results: List[T] = []
+    error: List[BaseException] = []
+    cond = threading.Condition()
+    abandoned = [False]
+
+    def work():
+        global _in_flight
+        try:
+            for stage in stages:
+                with cond:
+                    if abandoned[0]:
+                        # 结果已被丢弃，不再开始后面的阶段
+                        return
+                x = stage()
+                with cond:
+                    results.append(x)
+                    cond.notify_all()
+        except BaseException as e:
+            with cond:
+                error.append(e)
+                cond.notify_all()
+        finally:
+            with cond:
+                overrun = abandoned[0]
+            if overrun:
+                metrics.add(f"deadline.overrun_seconds.{name}", time.monotonic() - deadline)
+            with _executor_lock:
+                _in_flight -= 1
+
+    # 在复制的上下文中执行，使delegate_calls等上下文设置对后台线程同样有效
+    ctx = contextvars.copy_context()
+    executor = _get_executor()
+    with _executor_lock:
+        _in_flight += 1
+    try:
+        executor.submit(ctx.run, work)
+    except BaseException:
+        with _executor_lock:
+            _in_flight -= 1
+        raise
+
+    # 为了min_stages在截止时间后继续等待
+    waited = False
+    with cond:
+        while len(results) < len(stages) and not error:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if len(results) >= min_stages:
+                    break
+                waited = True
+                remaining = None
+            cond.wait(remaining)
+
+        if error:
+            raise error[0]
+
+        complete = len(results) == len(stages)
+        if not complete:
+            abandoned[0] = True
+        results = list(results)
+
+    if not complete or waited:
+        metrics.add(f"deadline.overrun.{name}")
+    if waited and complete:
+        # 未完成时由后台线程在结束时统计
+        metrics.add(f"deadline.overrun_seconds.{name}", time.monotonic() - deadline)
+    return results, complete
+
+
+__all__ = ("resolve_deadline", "run_anytime", "in_flight",)
@@ -0,0 +1,192 @@
+"""
+打法排序
+
+先以一次向听分析（按列返回，见shanten_with_got_columns）得到各打法的向听数与进张数，
+再对听牌的打法逐个待牌进行和牌分析，计算立直与默听的期望点数。
+"""
+from enum import Enum
+from typing import NamedTuple, Optional, Sequence, Set, List, Tuple
+
+import numpy as np
+
+from mahjong_utils.columnar import shanten_with_got_columns, ShantenWithoutGotColumns
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.furo import Furo, Kan
+from mahjong_utils.models.tile import Tile, mask_to_tiles
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.yaku import Yaku
+from mahjong_utils.yaku.extra import richi
+
+
+class DiscardObjective(str, Enum):
+    """
+    打法排序的目标
+
+    speed：向听数升序、进张数降序、好型进张数降序，最后按期望点数降序；
+    points：向听数升序、期望点数与进张数之积降序，最后按进张数降序
+    """
+
+    speed = "speed"
+    points = "points"
+
+
+class RankedDiscard(NamedTuple):
+    """
+    一种打法的评估结果
+
+    进张数与好型进张数未计算时为-1。
+    riichi_point、dama_point为立直、默听时荣和的期望点数（按各待牌的剩余张数加权平均），
+    不听牌时为None；已副露（暗杠除外）时riichi_point为None。
+    """
+
+    tile: Tile
+    shanten: int
+    advance: List[Tile]
+    advance_num: int
+    good_shape_advance_num: int
+    riichi_point: Optional[float]
+    dama_point: Optional[float]
+
+    @property
+    def expected_point(self) -> float:
+        """
+        立直与默听中较高的期望点数，不听牌时为0
+        """
+        return max(self.riichi_point or 0.0, self.dama_point or 0.0)
+
+
+def _sort_key(objective: DiscardObjective, d: RankedDiscard) -> Tuple:
+    if objective == DiscardObjective.speed:
+        return d.shanten, -d.advance_num, -d.good_shape_advance_num, -d.expected_point
+    else:
+        return d.shanten, -d.expected_point * max(d.advance_num, 0), -d.advance_num, -d.good_shape_advance_num
+
+
+def _ron_point(tiles: List[Tile], furo: Sequence[Furo], agari: Tile, dora: int,
+               self_wind: Optional[Wind], round_wind: Optional[Wind], extra_yaku: Set[Yaku]) -> int:
+    try:
+        hora = build_hora(tiles, list(furo), agari, False, dora=dora,
+                          self_wind=self_wind, round_wind=round_wind, extra_yaku=extra_yaku)
+    except ValueError:
+        return 0
+
+    if self_wind == Wind.east:
+        return hora.parent_point[0]
+    else:
+        return hora.child_point[0]
+
+
+def _expected_points(tiles: List[Tile], furo: Sequence[Furo], waits: List[Tile], dora: int,
+                     self_wind: Optional[Wind], round_wind: Optional[Wind],
+                     extra_yaku: Set[Yaku]) -> Tuple[Optional[float], Optional[float]]:
+    visible = [0] * 38
+    for t in tiles:
+        visible[t.code - t.num + t.real_num] += 1
+    for fr in furo:
+        for t in fr.tiles:
+            visible[t.code - t.num + t.real_num] += 1
+
+    menzen = all(isinstance(fr, Kan) and fr.ankan for fr in furo)
+
+    riichi_total, dama_total, weight_total = 0, 0, 0
+    for w in waits:
+        weight = max(4 - visible[w.code - w.num + w.real_num], 0)
+        if weight == 0:
+            continue
+        weight_total += weight
+
+        hand = tiles + [w]
+        dama_total += weight * _ron_point(hand, furo, w, dora, self_wind, round_wind, extra_yaku)
+        if menzen:
+            riichi_total += weight * _ron_point(hand, furo, w, dora, self_wind, round_wind, extra_yaku | {richi})
+
+    if weight_total == 0:
+        return (0.0 if menzen else None), 0.0
+    return (riichi_total / weight_total if menzen else None), dama_total / weight_total
+
+
+def rank_discards(
+        tiles: Sequence[Tile],
+        furo: Optional[Sequence[Furo]] = None,
+        *, objective: DiscardObjective = DiscardObjective.speed,
+        top_k: Optional[int] = None,
+        dora: int = 0,
+        self_wind: Optional[Wind] = None,
+        round_wind: Optional[Wind] = None,
+        extra_yaku: Optional[Set[Yaku]] = None,
+        best_shanten_only: bool = False,
+) -> List[RankedDiscard]:
+    """
+    对已摸牌状态的手牌的各打法进行排序
+
+    听牌的打法对每个待牌进行荣和的和牌分析，以剩余张数（4张减去自己手牌与副露中的张数）加权平均得到期望点数。
+    指定top_k时，向听数不可能进入前k位的打法不进行和牌分析。
+
+    :param tiles: 门前的牌（必须为已摸牌状态）
+    :param furo: 副露
+    :param objective: 排序的目标
+    :param top_k: 只返回前k种打法
+    :param dora: 宝牌数（不随待牌变化）
+    :param self_wind: 自风
+    :param round_wind: 场风
+    :param extra_yaku: 额外役（不含立直，立直的期望点数会自动加上立直）
+    :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :return 排序后的打法
+    """
+    if furo is None:
+        furo = ()
+    if extra_yaku is None:
+        extra_yaku = set()
+
+    objective = DiscardObjective(objective)
+    columns: ShantenWithoutGotColumns = shanten_with_got_columns(
+        tiles, furo, calc_advance_num=True, best_shanten_only=best_shanten_only, allow_ankan=False
+    ).discard_to_advance
+
+    order = columns.order()
+    if top_k is not None:
+        if top_k <= 0:
+            return []
+        if len(order) > top_k:
+            # 向听数为第一排序键，向听数大于第k位的打法不可能进入前k位
+            kth_shanten = columns.shanten[order[top_k - 1]]
+            order = order[columns.shanten[order] <= kth_shanten]
+
+            if objective == DiscardObjective.speed:
+                # 进张数与好型进张数也完全相同的打法才需要比较期望点数
+                kth = order[top_k - 1]
+                same = (columns.shanten[order] == kth_shanten) \
+                    & (columns.advance_num[order] == columns.advance_num[kth]) \
+                    & (columns.good_shape_advance_num[order] == columns.good_shape_advance_num[kth])
+                order = order[:max(top_k, int(np.flatnonzero(same)[-1]) + 1)]
+
+    ans: List[RankedDiscard] = []
+    for i in order:
+        tile = Tile.by_code(int(columns.tile[i]))
+        shanten = int(columns.shanten[i])
+        advance = mask_to_tiles(int(columns.advance[i]))
+
+        riichi_point, dama_point = None, None
+        if shanten == 0:
+            remaining = list(tiles)
+            remaining.remove(tile)
+            riichi_point, dama_point = _expected_points(remaining, furo, advance, dora,
+                                                        self_wind, round_wind, extra_yaku)
+
+        ans.append(RankedDiscard(
+            tile=tile,
+            shanten=shanten,
+            advance=advance,
+            advance_num=int(columns.advance_num[i]),
+            good_shape_advance_num=int(columns.good_shape_advance_num[i]),
+            riichi_point=riichi_point,
+            dama_point=dama_point,
+        ))
+
+    ans.sort(key=lambda d: _sort_key(objective, d))
+    if top_k is not None:
+        ans = ans[:top_k]
+    return ans
+
+
+__all__ = ("DiscardObjective", "RankedDiscard", "rank_discards",)
@@ -0,0 +1,222 @@
+"""
+将手牌与向听分析结果编码为模型训练用的特征张量（需要安装numpy）
+
+特征写入调用方预先分配的缓冲区（FeatureBuffers），逐样本编码时不分配新的数组；各函数不持有状态，
+可以在多个数据加载进程（或线程）中各自对自己的缓冲区调用。
+
+牌以34种牌的序号表示（万子0~8、筒子9~17、索子18~26、字牌27~33），赤宝牌计入对应的5。
+"""
+from typing import NamedTuple, Optional, Sequence, Iterable, Tuple
+
+import numpy as np
+
+from mahjong_utils.columnar import ShantenWithGotColumns
+from mahjong_utils.corpus import record_dtype, tile_index, FURO_CHI, FURO_PON, FURO_MINKAN, FURO_ANKAN
+from mahjong_utils.models.furo import Furo, Chi, Pon, Kan
+from mahjong_utils.models.tile import Tile, tile_pool
+from mahjong_utils.shanten import ShantenResult
+
+# 门前的牌：第k个平面为1表示该牌至少有k+1张
+TILE_PLANES = 4
+
+# 副露：吃、碰、明杠、暗杠各一个平面，值为副露中该牌的张数
+FURO_PLANES = 4
+FURO_PLANE_CHI, FURO_PLANE_PON, FURO_PLANE_MINKAN, FURO_PLANE_ANKAN = range(FURO_PLANES)
+
+# 打法：按打出的牌的序号
+DISCARD_CHANNELS = 4
+DISCARD_VALID = 0
+"""
+能否打出该牌（1或0）
+"""
+DISCARD_SHANTEN = 1
+"""
+打出后的向听数
+"""
+DISCARD_ADVANCE_NUM = 2
+"""
+打出后的进张数（未计算时为-1）
+"""
+DISCARD_GOOD_SHAPE_ADVANCE_NUM = 3
+"""
+打出后的好型进张数（未计算时为-1）
+"""
+
+# Tile.code -> 序号（code为30时为-1）
+_code_index: Tuple[int, ...] = tuple(tile_index(t) if t is not None else -1 for t in tile_pool)
+
+_plane_thresholds = np.arange(TILE_PLANES, dtype=np.uint8)[:, None]
+_red_shifts = np.array([0, 2, 4], dtype=np.uint8)
+
+
+class FeatureBuffers(NamedTuple):
+    """
+    一批样本的特征缓冲区，第一维为样本
+
+    tiles：(N, TILE_PLANES, 34)，门前的牌
+    furo：(N, FURO_PLANES, 34)，副露
+    red：(N, 3)，万子、筒子、索子的赤宝牌张数
+    discard：(N, DISCARD_CHANNELS, 34)，各打法的向听数与进张数
+    advance：(N, 34, 34)，advance[i, d, a]为1表示打出d后a为进张
+    """
+
+    tiles: np.ndarray
+    furo: np.ndarray
+    red: np.ndarray
+    discard: np.ndarray
+    advance: np.ndarray
+
+    @classmethod
+    def allocate(cls, batch_size: int, dtype=np.float32) -> "FeatureBuffers":
+        """
+        分配一批样本的缓冲区（每个数据加载进程分配一次，之后重复使用）
+        """
+        return FeatureBuffers(
+            tiles=np.zeros((batch_size, TILE_PLANES, 34), dtype=dtype),
+            furo=np.zeros((batch_size, FURO_PLANES, 34), dtype=dtype),
+            red=np.zeros((batch_size, 3), dtype=dtype),
+            discard=np.zeros((batch_size, DISCARD_CHANNELS, 34), dtype=dtype),
+            advance=np.zeros((batch_size, 34, 34), dtype=dtype),
+        )
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+
+def encode_hand(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]], out: FeatureBuffers, i: int) -> None:
+    """
+    将一手牌编码到第i个样本的tiles、furo与red
+    """
+    planes = out.tiles[i]
+    planes[:] = 0
+    red = out.red[i]
+    red[:] = 0
+    for t in tiles:
+        idx = _code_index[t.code]
+        # 已写入的张数即为下一个平面
+        k = 0
+        while planes[k, idx]:
+            k += 1
+        planes[k, idx] = 1
+        if t.num == 0:
+            red[t.code // 10] += 1
+
+    planes = out.furo[i]
+    planes[:] = 0
+    if furo is not None:
+        for fr in furo:
+            idx = _code_index[fr.tile.code]
+            if isinstance(fr, Chi):
+                planes[FURO_PLANE_CHI, idx:idx + 3] += 1
+            elif isinstance(fr, Pon):
+                planes[FURO_PLANE_PON, idx] += 3
+            elif isinstance(fr, Kan):
+                planes[FURO_PLANE_ANKAN if fr.ankan else FURO_PLANE_MINKAN, idx] += 4
+
+
+def encode_hands(
+        hands: Iterable[Tuple[Sequence[Tile], Optional[Sequence[Furo]]]],
+        out: FeatureBuffers,
+        start: int = 0,
+) -> int:
+    """
+    将一组(门前的牌, 副露)依次编码到第start个起的样本
+
+    :return: 编码的样本数
+    """
+    n = 0
+    for (tiles, furo) in hands:
+        encode_hand(tiles, furo, out, start + n)
+        n += 1
+    return n
+
+
+def encode_records(records: np.ndarray, out: FeatureBuffers, start: int = 0) -> int:
+    """
+    将语料的记录（Corpus.records或其切片，见mahjong_utils.corpus）整批编码到第start个起的样本的tiles、furo与red，
+    不逐条处理记录
+
+    :return: 编码的样本数
+    """
+    if records.dtype != record_dtype:
+        raise ValueError("invalid record dtype")
+
+    n = len(records)
+    end = start + n
+
+    np.greater(records["counts"][:, None, :], _plane_thresholds, out=out.tiles[start:end], casting="unsafe")
+    np.bitwise_and(np.right_shift(records["red"][:, None], _red_shifts), 3, out=out.red[start:end], casting="unsafe")
+
+    planes = out.furo[start:end]
+    planes[:] = 0
+    kinds = records["furo_kind"]
+    idx = records["furo_tile"].astype(np.intp)
+    for slot in range(kinds.shape[1]):
+        for (kind, plane, width, count) in ((FURO_CHI, FURO_PLANE_CHI, 3, 1),
+                                            (FURO_PON, FURO_PLANE_PON, 1, 3),
+                                            (FURO_MINKAN, FURO_PLANE_MINKAN, 1, 4),
+                                            (FURO_ANKAN, FURO_PLANE_ANKAN, 1, 4)):
+            rows = np.flatnonzero(kinds[:, slot] == kind)
+            if len(rows) == 0:
+                continue
+            for offset in range(width):
+                planes[rows, plane, idx[rows, slot] + offset] += count
+    return n
+
+
+def _write_discard(out: FeatureBuffers, i: int, code: int, shanten: int, advance: int,
+                   advance_num: int, good_shape_advance_num: int) -> None:
+    d = _code_index[code]
+    channels = out.discard[i]
+    channels[DISCARD_VALID, d] = 1
+    channels[DISCARD_SHANTEN, d] = shanten
+    channels[DISCARD_ADVANCE_NUM, d] = advance_num
+    channels[DISCARD_GOOD_SHAPE_ADVANCE_NUM, d] = good_shape_advance_num
+
+    row = out.advance[i, d]
+    row[:] = 0
+    while advance:
+        low = advance & -advance
+        row[_code_index[low.bit_length() - 1]] = 1
+        advance ^= low
+
+
+def encode_analysis(columns: ShantenWithGotColumns, out: FeatureBuffers, i: int) -> None:
+    """
+    将已摸牌状态的向听分析结果（按列，见shanten_with_got_columns）编码到第i个样本的discard与advance
+    （赤宝牌与对应的5的打法合并为同一个序号）
+    """
+    out.discard[i] = 0
+    out.advance[i] = 0
+
+    cols = columns.discard_to_advance
+    for (code, shanten, advance, advance_num, good_shape_advance_num) in zip(
+            cols.tile.tolist(), cols.shanten.tolist(), cols.advance.tolist(),
+            cols.advance_num.tolist(), cols.good_shape_advance_num.tolist()):
+        _write_discard(out, i, code, shanten, advance, advance_num, good_shape_advance_num)
+
+
+def encode_shanten_result(result: ShantenResult, out: FeatureBuffers, i: int) -> None:
+    """
+    将已摸牌状态的向听分析结果编码到第i个样本的discard与advance（同encode_analysis）
+    """
+    discard_to_advance = result.discard_to_advance
+    if discard_to_advance is None:
+        raise ValueError("result must be with got tile")
+
+    out.discard[i] = 0
+    out.advance[i] = 0
+    for (t, sh) in discard_to_advance.items():
+        advance = 0
+        for a in sh.advance:
+            advance |= 1 << a.code
+        _write_discard(out, i, t.code, sh.shanten, advance,
+                       sh.advance_num if sh.advance_num is not None else -1,
+                       sh.good_shape_advance_num if sh.good_shape_advance_num is not None else -1)
+
+
+__all__ = ("TILE_PLANES", "FURO_PLANES", "FURO_PLANE_CHI", "FURO_PLANE_PON", "FURO_PLANE_MINKAN", "FURO_PLANE_ANKAN",
+           "DISCARD_CHANNELS", "DISCARD_VALID", "DISCARD_SHANTEN", "DISCARD_ADVANCE_NUM",
+           "DISCARD_GOOD_SHAPE_ADVANCE_NUM",
+           "FeatureBuffers", "encode_hand", "encode_hands", "encode_records", "encode_analysis",
+           "encode_shanten_result",)
@@ -0,0 +1,112 @@
+"""
+解码时共享结构相同的子结果（hash consing）
+
+已摸牌的向听分析结果中，许多打法的ShantenWithoutGot相同，Union结果的手牌与分解也与其regular、chitoi、kokushi子结果重复。
+在hash_consing的上下文内，ShantenWithoutGot、ShantenWithGot、Hand与HandPattern按分析库返回的数据去重，
+结构相同的子结果只解码一次，在上下文内解码的多个结果共享这些子结果的字段与其中的容器。
+
+去重是可选的：不在hash_consing的上下文内时直接解码，不建立去重表，结果之间不共享任何对象。
+在上下文内解码的结果应视为只读，修改其中一个结果的子结果会影响共享它的其他结果。
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+_current: ContextVar[Optional["HashConsTable"]] = ContextVar("mahjong_utils_hash_cons_table", default=None)
+
+
+class HashConsTable:
+    """
+    解码结果的去重表，以(种类, 数据的编号)为键
+
+    结构相同的dict与list被编为同一个编号，编号由子节点的编号自底向上得到，每个节点只需哈希其直接子节点；
+    同一次最外层解码中，子结果的编号在计算外层编号时已经得到，不再重新遍历。
+
+    去重表不是线程安全的，不应在多个线程中同时使用同一个表。
+    """
+
+    def __init__(self) -> None:
+        self._table: Dict[Tuple[str, Any], Any] = {}
+        # 节点（子节点编号组成的元组）-> 编号
+        self._nodes: Dict[Tuple[Any, ...], int] = {}
+        # 最外层解码期间，id(数据) -> 编号；此期间数据都被最外层的数据引用，id不会被复用
+        self._refs: Dict[int, Tuple[int]] = {}
+        self._depth = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def _ref(self, data: Any) -> Any:
+        # 分析库返回的数据只含dict、list与标量；dict与list的编号以一元组表示，与标量区分
+        if not isinstance(data, (dict, list)):
+            return data
+
+        ref = self._refs.get(id(data))
+        if ref is None:
+            if isinstance(data, dict):
+                node = (dict,) + tuple((k, self._ref(v)) for (k, v) in data.items())
+            else:
+                node = (list,) + tuple(self._ref(v) for v in data)
+            ref = self._refs[id(data)] = (self._nodes.setdefault(node, len(self._nodes)),)
+        return ref
+
+    def intern(self, kind: str, data: Any, decode: Callable[[Any], Any]) -> Any:
+        """
+        返回与data结构相同的数据已解码的对象，没有时以decode解码并保存
+        """
+        self._depth += 1
+        try:
+            key = (kind, self._ref(data))
+            obj = self._table.get(key)
+            if obj is None:
+                self.misses += 1
+                obj = self._table[key] = decode(data)
+            else:
+                self.hits += 1
+            return obj
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._refs.clear()
+
+    def clear(self) -> None:
+        self._table.clear()
+        self._nodes.clear()
+
+
+def current_table() -> Optional[HashConsTable]:
+    """
+    当前上下文的去重表，不在hash_consing的上下文内时为None
+    """
+    return _current.get()
+
+
+@contextmanager
+def hash_consing(table: Optional[HashConsTable] = None) -> Iterator[HashConsTable]:
+    """
+    在此上下文内（仅限当前线程或协程）解码的结果共享结构相同的子结果
+
+    :param table: 使用的去重表，为None时新建
+    """
+    if table is None:
+        table = HashConsTable()
+    token = _current.set(table)
+    try:
+        yield table
+    finally:
+        _current.reset(token)
+
+
+def decode_interned(kind: str, data: Any, decode: Callable[[Any], Any]) -> Any:
+    """
+    在hash_consing的上下文内经去重表解码，否则直接解码
+    """
+    table = _current.get()
+    if table is None:
+        return decode(data)
+    return table.intern(kind, data, decode)
+
+
+__all__ = ("HashConsTable", "current_table", "hash_consing", "decode_interned",)
@@ -1,16 +1,53 @@
-from typing import Optional, Set, List, Tuple
+from itertools import product
+from typing import Optional, Set, List, Tuple, NamedTuple, FrozenSet, Sequence, Iterable, Dict
 
 from pydantic import BaseModel
-from stringcase import snakecase, pascalcase
 
+from mahjong_utils.chinitsu import chinitsu_counts, loaded_chinitsu_index
+from mahjong_utils.codec import reduce_model
+from mahjong_utils.deadline import resolve_deadline, run_anytime
 from mahjong_utils.lib import libmahjongutils
 from mahjong_utils.models.furo import Furo
 from mahjong_utils.models.hora_hand_pattern import HoraHandPattern
+from mahjong_utils.models.names import wind_names, yaku_names
 from mahjong_utils.models.tile import Tile
 from mahjong_utils.models.wind import Wind
 from mahjong_utils.point_by_han_hu import get_parent_point_by_han_hu, get_child_point_by_han_hu
 from mahjong_utils.shanten import ShantenResult
-from mahjong_utils.yaku import Yaku, get_yaku
+from mahjong_utils.yaku import Yaku
+
+# 七对子、国士无双的符数固定
+_fixed_hu = {"ChitoiHoraHandPattern": 25, "KokushiHoraHandPattern": 20}
+
+
+def _parent_point(yaku: Iterable[Yaku], has_yakuman: bool, han: int, hu: int) -> Tuple[int, int]:
+    yaku = tuple(yaku)
+    if len(yaku) == 0:
+        return 0, 0
+    elif has_yakuman:
+        times = 0
+        for yk in yaku:
+            times += yk.han // 13
+
+        ans = get_parent_point_by_han_hu(13, 20)
+        return ans[0] * times, ans[1] * times
+    else:
+        return get_parent_point_by_han_hu(han, hu)
+
+
+def _child_point(yaku: Iterable[Yaku], has_yakuman: bool, han: int, hu: int) -> Tuple[int, int, int]:
+    yaku = tuple(yaku)
+    if len(yaku) == 0:
+        return 0, 0, 0
+    elif has_yakuman:
+        times = 0
+        for yk in yaku:
+            times += yk.han // 13
+
+        ans = get_child_point_by_han_hu(13, 20)
+        return ans[0] * times, ans[1] * times, ans[2] * times
+    else:
+        return get_child_point_by_han_hu(han, hu)
 
 
 class Hora(BaseModel):
@@ -27,11 +64,14 @@ class Hora(BaseModel):
             pattern=HoraHandPattern.__decode__(data["pattern"]),
             han=data["han"],
             dora=data["dora"],
-            yaku=set(get_yaku(snakecase(yk)) for yk in data["yaku"]),
-            extra_yaku=set(get_yaku(snakecase(yk)) for yk in data["extraYaku"]),
+            yaku=set(yaku_names.decode(yk) for yk in data["yaku"]),
+            extra_yaku=set(yaku_names.decode(yk) for yk in data["extraYaku"]),
             has_yakuman=data["hasYakuman"]
         )
 
+    def __reduce__(self):
+        return reduce_model(self)
+
     @property
     def hu(self) -> int:
         return self.pattern.hu
@@ -59,17 +99,7 @@ class Hora(BaseModel):
 
         :return: (荣和点数, 自摸各家点数)
         """
-        if len(self.yaku) == 0:
-            return 0, 0
-        elif self.has_yakuman:
-            times = 0
-            for yaku in self.yaku:
-                times += yaku.han // 13
-
-            ans = get_parent_point_by_han_hu(13, 20)
-            return ans[0] * times, ans[1] * times
-        else:
-            return get_parent_point_by_han_hu(self.han, self.hu)
+        return _parent_point(self.yaku, self.has_yakuman, self.han, self.hu)
 
     @property
     def child_point(self) -> Tuple[int, int, int]:
@@ -78,17 +108,42 @@ class Hora(BaseModel):
 
         :return: (荣和点数, 自摸庄家点数, 自摸闲家点数)
         """
-        if len(self.yaku) == 0:
-            return 0, 0, 0
-        elif self.has_yakuman:
-            times = 0
-            for yaku in self.yaku:
-                times += yaku.han // 13
+        return _child_point(self.yaku, self.has_yakuman, self.han, self.hu)
+
+
+def _context_params(agari: Tile, tsumo: bool,
+                    dora: int = 0, self_wind: Optional[Wind] = None, round_wind: Optional[Wind] = None,
+                    extra_yaku: Optional[Iterable[Yaku]] = None) -> dict:
+    # 和牌分析的参数中与手牌无关的部分
+    return {
+        "agari": str(agari),
+        "tsumo": tsumo,
+        "dora": dora,
+        "selfWind": wind_names.encode(self_wind),
+        "roundWind": wind_names.encode(round_wind),
+        "extraYaku": [yaku_names.encode(yk) for yk in extra_yaku] if extra_yaku is not None else []
+    }
+
+
+def _hora_params(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]], agari: Tile, tsumo: bool,
+                 dora: int = 0, self_wind: Optional[Wind] = None, round_wind: Optional[Wind] = None,
+                 extra_yaku: Optional[Iterable[Yaku]] = None) -> dict:
+    return {
+        "tiles": [str(t) for t in tiles],
+        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
+        **_context_params(agari, tsumo, dora, self_wind, round_wind, extra_yaku),
+    }
 
-            ans = get_child_point_by_han_hu(13, 20)
-            return ans[0] * times, ans[1] * times, ans[2] * times
-        else:
-            return get_child_point_by_han_hu(self.han, self.hu)
+
+def _hora_columns(data: dict) -> tuple:
+    # 由分析库返回的数据直接计算(番, 符, 役种, 是否役满, 亲家点数, 子家点数)，不构造Hora对象
+    pattern = data["pattern"]
+    hu = pattern.get("hu", _fixed_hu.get(pattern["type"]))
+    yaku = frozenset(yaku_names.decode(yk) for yk in data["yaku"])
+    han = data["han"]
+    has_yakuman = data["hasYakuman"]
+    return han, hu, yaku, has_yakuman, \
+        _parent_point(yaku, has_yakuman, han, hu), _child_point(yaku, has_yakuman, han, hu)
 
 
 def build_hora(
@@ -96,7 +151,9 @@ def build_hora(
         tsumo: bool,
         *, dora: int = 0,
         self_wind: Optional[Wind] = None, round_wind: Optional[Wind] = None,
-        extra_yaku: Optional[Set[Yaku]] = None
+        extra_yaku: Optional[Set[Yaku]] = None,
+        deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
 ) -> Hora:
     """
     和牌分析
@@ -109,18 +166,28 @@ def build_hora(
     :param self_wind: 自风
     :param round_wind: 场风
     :param extra_yaku: 额外役
+    :param deadline: 截止时间（time.monotonic()的时刻）
+    :param time_budget: 时间预算（秒），超出时抛出TimeoutError（和牌分析没有可用的部分结果）
     :return: 和牌分析结果
     """
-    result = libmahjongutils.call("hora", {
-        "tiles": [str(t) for t in tiles],
-        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
-        "agari": str(agari),
-        "tsumo": tsumo,
-        "dora": dora,
-        "selfWind": pascalcase(self_wind.name) if self_wind is not None else None,
-        "roundWind": pascalcase(round_wind.name) if round_wind is not None else None,
-        "extraYaku": [pascalcase(yk.name) for yk in extra_yaku] if extra_yaku is not None else []
-    })
+    # 已加载清一色索引时（见get_chinitsu_index），单一花色的门前手牌通过索引直接判断是否和牌；
+    # 和牌时的分解、役种与番符仍由分析库计算
+    index = loaded_chinitsu_index()
+    if index is not None and len(tiles) % 3 == 2:
+        cc = chinitsu_counts(tiles)
+        if cc is not None and index.agari_flags(cc[1]) == 0:
+            raise ValueError(f"{tiles} is not agari")
+
+    params = _hora_params(tiles, furo, agari, tsumo, dora, self_wind, round_wind, extra_yaku)
+
+    deadline = resolve_deadline(deadline, time_budget)
+    if deadline is None:
+        result = libmahjongutils.call("hora", params)
+    else:
+        results, complete = run_anytime("hora", [lambda: libmahjongutils.call("hora", params)], deadline)
+        if not complete:
+            raise TimeoutError("hora did not finish within the time budget")
+        result = results[0]
 
     return Hora.decode(result)
 
@@ -136,7 +203,7 @@ def build_hora_from_shanten_result(
     """
     和牌分析（根据向听分析结果）
 
-    :param shanten_result: 向听分析结果
+    :param shanten_result: 向听分析结果（须保留全部手牌分解，即patterns为PatternsOption.full）
     :param agari: 和牌
     :param tsumo: 是否自摸
     :param dora: 宝牌数
@@ -147,15 +214,138 @@ def build_hora_from_shanten_result(
     """
     result = libmahjongutils.call("hora", {
         "shantenResult": shanten_result.__encode__(),
-        "agari": str(agari),
-        "tsumo": tsumo,
-        "dora": dora,
-        "selfWind": pascalcase(self_wind.name) if self_wind is not None else None,
-        "roundWind": pascalcase(round_wind.name) if round_wind is not None else None,
-        "extraYaku": [pascalcase(yk.name) for yk in extra_yaku] if extra_yaku is not None else []
+        **_context_params(agari, tsumo, dora, self_wind, round_wind, extra_yaku),
     })
 
     return Hora.decode(result)
 
 
-__all__ = ("Hora", "build_hora", "build_hora_from_shanten_result")
+class HoraContext(NamedTuple):
+    """
+    和牌分析的场况
+    """
+
+    tsumo: bool
+    """
+    是否自摸
+    """
+
+    dora: int = 0
+    """
+    宝牌数
+    """
+
+    self_wind: Optional[Wind] = None
+    """
+    自风
+    """
+
+    round_wind: Optional[Wind] = None
+    """
+    场风
+    """
+
+    extra_yaku: FrozenSet[Yaku] = frozenset()
+    """
+    额外役（如立直、一发）
+    """
+
+
+def hora_contexts(
+        tsumo: Iterable[bool] = (False, True),
+        dora: Iterable[int] = (0,),
+        self_wind: Iterable[Optional[Wind]] = (None,),
+        round_wind: Iterable[Optional[Wind]] = (None,),
+        extra_yaku: Iterable[Iterable[Yaku]] = ((),),
+) -> List[HoraContext]:
+    """
+    各参数取值的全部组合
+
+    :return: 场况的列表，可传给build_hora_matrix
+    """
+    return [HoraContext(ts, dr, sw, rw, frozenset(ey))
+            for (ts, dr, sw, rw, ey) in product(tsumo, dora, self_wind, round_wind, extra_yaku)]
+
+
+class HoraMatrix(NamedTuple):
+    """
+    同一和牌在各场况下的分析结果，每列与contexts一一对应
+    """
+
+    contexts: Tuple[HoraContext, ...]
+    han: Tuple[int, ...]
+    hu: Tuple[int, ...]
+    yaku: Tuple[FrozenSet[Yaku], ...]
+    has_yakuman: Tuple[bool, ...]
+
+    parent_point: Tuple[Tuple[int, int], ...]
+    """
+    亲家和牌点数：(荣和点数, 自摸各家点数)
+    """
+
+    child_point: Tuple[Tuple[int, int, int], ...]
+    """
+    子家和牌点数：(荣和点数, 自摸庄家点数, 自摸闲家点数)
+    """
+
+    point: Tuple[int, ...]
+    """
+    和牌者的收入（不含供托与本场），自风为东时按亲家计算，否则按子家计算
+    """
+
+
+def _matrix_row(data: dict, ctx: HoraContext) -> tuple:
+    han, hu, yaku, has_yakuman, parent_point, child_point = _hora_columns(data)
+    if ctx.self_wind == Wind.east:
+        point = parent_point[1] * 3 if ctx.tsumo else parent_point[0]
+    else:
+        point = child_point[1] + child_point[2] * 2 if ctx.tsumo else child_point[0]
+    return han, hu, yaku, has_yakuman, parent_point, child_point, point
+
+
+def build_hora_matrix(
+        tiles: List[Tile], furo: Optional[List[Furo]], agari: Tile,
+        contexts: Sequence[HoraContext],
+) -> HoraMatrix:
+    """
+    同一和牌在多个场况下的和牌分析
+
+    手牌只分解一次，各场况基于同一个分解结果计算役种、番符与点数（相当于build_hora_from_shanten_result），
+    相同的场况只计算一次，结果不构造Hora对象。
+
+    :param tiles: 手牌
+    :param furo: 副露
+    :param agari: 和牌
+    :param contexts: 各场况（可通过hora_contexts生成）
+    :return: 各场况的分析结果
+    """
+    shanten_data = libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in tiles],
+        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
+        "calcAdvanceNum": False,
+        "bestShantenOnly": True,
+        "allowAnkan": False,
+    })
+    if shanten_data["shantenInfo"]["shantenNum"] != -1:
+        raise ValueError(f"{tiles} is not agari")
+
+    # 直接构造的HoraContext的extra_yaku可能是set等不可哈希的类型，统一为frozenset后再去重
+    contexts = tuple(ctx if isinstance(ctx.extra_yaku, frozenset) else ctx._replace(extra_yaku=frozenset(ctx.extra_yaku))
+                     for ctx in contexts)
+
+    rows: Dict[HoraContext, tuple] = {}
+    for ctx in contexts:
+        if ctx in rows:
+            continue
+        data = libmahjongutils.call("hora", {
+            "shantenResult": shanten_data,
+            **_context_params(agari, ctx.tsumo, ctx.dora, ctx.self_wind, ctx.round_wind, ctx.extra_yaku),
+        })
+        rows[ctx] = _matrix_row(data, ctx)
+
+    columns = tuple(zip(*(rows[ctx] for ctx in contexts))) if len(contexts) > 0 else ((),) * 7
+    return HoraMatrix(contexts, *columns)
+
+
+__all__ = ("Hora", "build_hora", "build_hora_from_shanten_result",
+           "HoraContext", "hora_contexts", "HoraMatrix", "build_hora_matrix")
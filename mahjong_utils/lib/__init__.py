@@ -1,41 +1,180 @@
 import json
+import os
 import sys
 import threading
+import time
+import warnings
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
 from importlib import resources
-from typing import Optional, Mapping, Any
+from typing import Optional, Mapping, Any, Iterator, NamedTuple
 
-import cffi
+_call_delegate: ContextVar[Optional[Any]] = ContextVar("mahjong_utils_call_delegate", default=None)
+
+
+def gil_disabled() -> bool:
+    """
+    当前解释器是否以自由线程（free-threaded，无GIL）模式运行
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _rss() -> int:
+    # 进程当前的常驻内存（字节）；不支持/proc的平台上为峰值，都无法获取时为-1
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return -1
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class LibStats(NamedTuple):
+    """
+    分析库的调用统计（不含通过delegate_calls转交的调用）
+    """
+
+    calls: int
+    """
+    调用次数
+    """
+
+    errors: int
+    """
+    返回错误的调用次数
+    """
+
+    call_seconds: float
+    """
+    调用的总耗时（秒，不含参数与结果的JSON编解码）
+    """
+
+    max_call_seconds: float
+    """
+    单次调用的最大耗时（秒）
+    """
+
+    slow_calls: int
+    """
+    耗时超过slow_call_seconds的调用次数
+    """
+
+    rss: int
+    """
+    进程的常驻内存（字节，分析库的堆也在其中），无法获取时为-1
+    """
 
 
 class LibMahjongUtils:
-    def __init__(self) -> None:
-        self.ffi = cffi.FFI()
+    """
+    分析库的调用入口
 
-        with resources.open_text(__name__, "libmahjongutils_api.i") as f:
-            h = f.read()
-            self.ffi.cdef(h)
+    库在第一次调用时加载（加载过程加锁）。加载后的对象只读，每个线程各自缓存符号表，call可以在多个线程中并发调用，
+    包括自由线程（无GIL）的解释器。模型层（mahjong_utils.models）不依赖本模块，在不能加载cffi的子解释器中也可以使用，
+    此时可以通过delegate_calls将调用转交给其他解释器或进程中的分析服务。
 
-        if sys.platform == 'win32':
-            libname = "libmahjongutils.dll"  # windows
-        elif sys.platform == 'darwin':
-            libname = "libmahjongutils.dylib"  # macOS
-        else:
-            libname = "libmahjongutils.so"  # unix/linux
+    fork后的子进程中，锁与每个线程的符号表被重置；若父进程在fork前已加载分析库，子进程继承的原生运行时状态（如垃圾回收线程）
+    不完整，第一次调用时发出RuntimeWarning。需要fork的场景（如gunicorn、multiprocessing的fork）应保证fork前不调用分析库，
+    见mahjong_utils.prefork。
 
-        with resources.path(__name__, libname) as libpath:
-            self.lib = self.ffi.dlopen(str(libpath))
+    分析库的垃圾回收参数在编译时确定（见setup.py的build_kt --binary-options），可以通过path或环境变量MAHJONG_UTILS_LIB
+    加载以不同参数编译的库。
+    """
 
+    def __init__(self, path: Optional[str] = None, slow_call_seconds: float = 0.05) -> None:
+        """
+        :param path: 分析库的路径，默认为环境变量MAHJONG_UTILS_LIB，未设置时使用随包安装的库
+        :param slow_call_seconds: 统计慢调用（LibStats.slow_calls）的阈值（秒）
+        """
+        self._load_lock = threading.Lock()
+        self._loaded = False
         self._lib_sy = threading.local()
+        self._path = path
+        self.slow_call_seconds = slow_call_seconds
+
+        self._stats_lock = threading.Lock()
+        self._calls = 0
+        self._errors = 0
+        self._call_seconds = 0.0
+        self._max_call_seconds = 0.0
+        self._slow_calls = 0
+
+        # 父进程在fork前已加载分析库
+        self._inherited = False
+        _instances.add(self)
+
+    @property
+    def loaded(self) -> bool:
+        """
+        本进程中是否已加载分析库（包括fork前由父进程加载）
+        """
+        return self._loaded
+
+    def _after_fork_in_child(self) -> None:
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._lib_sy = threading.local()
+        if self._loaded:
+            self._inherited = True
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._loaded:
+                return
+
+            import cffi
+
+            ffi = cffi.FFI()
+
+            with resources.open_text(__name__, "libmahjongutils_api.i") as f:
+                h = f.read()
+                ffi.cdef(h)
+
+            if sys.platform == 'win32':
+                libname = "libmahjongutils.dll"  # windows
+            elif sys.platform == 'darwin':
+                libname = "libmahjongutils.dylib"  # macOS
+            else:
+                libname = "libmahjongutils.so"  # unix/linux
+
+            path = self._path or os.environ.get("MAHJONG_UTILS_LIB")
+            if path:
+                self.lib = ffi.dlopen(path)
+            else:
+                with resources.path(__name__, libname) as libpath:
+                    self.lib = ffi.dlopen(str(libpath))
+            self.ffi = ffi
+            self._loaded = True
 
     @property
     def lib_sy(self):
-        if not hasattr(self._lib_sy, "value"):
-            self._lib_sy.value = self.lib.libmahjongutils_symbols()
-        return self._lib_sy.value
+        value = getattr(self._lib_sy, "value", None)
+        if value is None:
+            if not self._loaded:
+                self._load()
+            elif self._inherited:
+                self._inherited = False
+                warnings.warn("libmahjongutils was loaded before fork, the native runtime in this child process "
+                              "may not work correctly; avoid calling it before fork (see mahjong_utils.prefork) "
+                              "or use the spawn start method", RuntimeWarning, stacklevel=3)
+            value = self._lib_sy.value = self.lib.libmahjongutils_symbols()
+        return value
 
     def call(self, name: str, params: dict,
              params_dumps_kwargs: Optional[Mapping[str, Any]] = None,
              result_loads_kwargs: Optional[Mapping[str, Any]] = None) -> dict:
+        delegate = _call_delegate.get()
+        if delegate is not None:
+            return delegate.call(name, params, params_dumps_kwargs, result_loads_kwargs)
+
         if params_dumps_kwargs is None:
             params_dumps_kwargs = {}
         if result_loads_kwargs is None:
@@ -43,15 +182,28 @@ class LibMahjongUtils:
 
         params = json.dumps(params, **params_dumps_kwargs)
 
-        entry = self.lib_sy.kotlin.root.mahjongutils.get_ENTRY()
-        result = self.lib_sy.kotlin.root.mahjongutils.Entry.call(
+        lib_sy = self.lib_sy
+        entry = lib_sy.kotlin.root.mahjongutils.get_ENTRY()
+        start = time.perf_counter()
+        result = lib_sy.kotlin.root.mahjongutils.Entry.call(
             entry,
             self.ffi.new("char[]", name.encode()),
             self.ffi.new("char[]", params.encode()))
         result = self.ffi.string(result)
+        elapsed = time.perf_counter() - start
 
         result = json.loads(result, **result_loads_kwargs)
 
+        with self._stats_lock:
+            self._calls += 1
+            self._call_seconds += elapsed
+            if elapsed > self._max_call_seconds:
+                self._max_call_seconds = elapsed
+            if elapsed > self.slow_call_seconds:
+                self._slow_calls += 1
+            if result['code'] != 200:
+                self._errors += 1
+
         if result['code'] == 200:
             return result['data']
         elif result['code'] == 404:
@@ -61,10 +213,64 @@ class LibMahjongUtils:
         else:
             raise RuntimeError(result['msg'])
 
+    def stats(self) -> LibStats:
+        """
+        获取调用统计与进程的常驻内存
+        """
+        rss = _rss()
+        with self._stats_lock:
+            return LibStats(calls=self._calls, errors=self._errors, call_seconds=self._call_seconds,
+                            max_call_seconds=self._max_call_seconds, slow_calls=self._slow_calls, rss=rss)
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._calls = 0
+            self._errors = 0
+            self._call_seconds = 0.0
+            self._max_call_seconds = 0.0
+            self._slow_calls = 0
+
     def close(self):
-        self.ffi.dlclose(self.lib)
+        with self._load_lock:
+            if self._loaded:
+                self.ffi.dlclose(self.lib)
+                self._loaded = False
+                self._lib_sy = threading.local()
+
+
+_instances: "weakref.WeakSet[LibMahjongUtils]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for lib in list(_instances):
+        lib._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+@contextmanager
+def delegate_calls(delegate: Any) -> Iterator[Any]:
+    """
+    在此上下文内（仅限当前线程或协程），将所有对libmahjongutils.call的调用转交给delegate
+
+    :param delegate: 具有与LibMahjongUtils.call相同签名的call方法的对象
+    """
+    token = _call_delegate.set(delegate)
+    try:
+        yield delegate
+    finally:
+        _call_delegate.reset(token)
+
+
+def current_delegate() -> Optional[Any]:
+    """
+    当前上下文中通过delegate_calls指定的delegate，没有时为None
+    """
+    return _call_delegate.get()
 
 
 libmahjongutils = LibMahjongUtils()
 
-__all__ = ("LibMahjongUtils", "libmahjongutils")
+__all__ = ("LibMahjongUtils", "LibStats", "libmahjongutils", "delegate_calls", "current_delegate", "gil_disabled")
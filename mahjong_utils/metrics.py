@@ -0,0 +1,43 @@
+"""
+运行时统计
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """
+    线程安全的计数器
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = defaultdict(float)
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._values[name] += value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+metrics = Metrics()
+"""
+全局的计数器，各项的含义：
+
+- deadline.overrun.<name>：调用<name>时超出时间预算的次数
+- deadline.overrun_seconds.<name>：超出时间预算的调用在后台完成时实际超出的秒数之和
+"""
+
+__all__ = ("Metrics", "metrics",)
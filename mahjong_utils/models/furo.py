@@ -1,10 +1,10 @@
 from abc import ABC
-from typing import List, Sequence, Union
+from typing import Sequence, Union, Tuple, Optional, Dict
 
 from pydantic.dataclasses import dataclass
 
 from .mentsu import Shuntsu, Kotsu, Mentsu
-from .tile import Tile, parse_tiles
+from .tile import Tile, parse_tiles, tile_pool
 from .tile_type import TileType
 
 
@@ -18,15 +18,17 @@ class Furo(Mentsu, ABC):
 
     @classmethod
     def __decode__(cls, data: dict) -> "Furo":
-        t = Tile.__decode__(data['tile'])
-        if data['type'] == 'Chi':
-            return Chi(t)
-        elif data['type'] == 'Pon':
-            return Pon(t)
-        elif data['type'] == 'Kan':
-            return Kan(t, data['ankan'])
-        else:
+        pool = _pools.get((data['type'], data.get('ankan', False)), None)
+        if pool is not None:
+            t = Tile.__decode__(data['tile'])
+            fr = pool[t.code]
+            if fr is not None:
+                return fr
+
+        decoder = _decoders.get(data['type'], None)
+        if decoder is None:
             raise ValueError("invalid type: " + data['type'])
+        return decoder(Tile.__decode__(data['tile']), data)
 
     @staticmethod
     def parse(t: Union[Sequence[Tile], str], ankan: bool = False) -> "Furo":
@@ -38,18 +40,18 @@ class Furo(Mentsu, ABC):
 
         if len(t) == 3:
             if t[0] == t[1] == t[2]:
-                return Pon(t[0])
+                return pon_pool[t[0].code] or Pon(t[0])
             else:
                 if t[0].tile_type == TileType.Z or t[1].tile_type == TileType.Z or t[2].tile_type == TileType.Z:
                     raise ValueError(f"invalid tiles: {t}")
                 t = sorted(t)
                 if t[1] - t[0] == 1 and t[2] - t[1] == 1:
-                    return Chi(t[0])
+                    return chi_pool[t[0].code] or Chi(t[0])
                 else:
                     raise ValueError(f"invalid tiles: {t}")
         elif len(t) == 4:
             if t[0] == t[1] == t[2] == t[3]:
-                return Kan(t[0], ankan)
+                return (ankan_pool if ankan else minkan_pool)[t[0].code] or Kan(t[0], ankan)
 
         raise ValueError(f"invalid tiles: {t}")
 
@@ -94,5 +96,33 @@ class Kan(Kotsu, Furo):
             return f"{self.tile.num}{self.tile.num}{self.tile.num}{self.tile.num}{self.tile.tile_type.lower()}"
 
     @property
-    def tiles(self) -> List[Tile]:
-        return [self.tile] * 4
+    def tiles(self) -> Tuple[Tile, ...]:
+        return _kan_tiles[self.tile.code]
+
+
+# 副露的种类很少，预先构造全部的副露（以tile.code为下标，与tile_pool相同），解码与parse时复用同一个对象
+chi_pool: Tuple[Optional[Chi], ...] = tuple(
+    Chi(t) if t is not None and t.tile_type != TileType.Z and 1 <= t.num <= 7 else None for t in tile_pool)
+
+pon_pool: Tuple[Optional[Pon], ...] = tuple(Pon(t) if t is not None else None for t in tile_pool)
+
+minkan_pool: Tuple[Optional[Kan], ...] = tuple(Kan(t, False) if t is not None else None for t in tile_pool)
+
+ankan_pool: Tuple[Optional[Kan], ...] = tuple(Kan(t, True) if t is not None else None for t in tile_pool)
+
+_kan_tiles: Tuple[Optional[Tuple[Tile, ...]], ...] = tuple(
+    (t,) * 4 if t is not None else None for t in tile_pool)
+
+# (type, ankan) -> 副露池
+_pools: Dict[Tuple[str, bool], Tuple[Optional[Furo], ...]] = {
+    ("Chi", False): chi_pool,
+    ("Pon", False): pon_pool,
+    ("Kan", False): minkan_pool,
+    ("Kan", True): ankan_pool,
+}
+
+_decoders = {
+    "Chi": lambda t, data: Chi(t),
+    "Pon": lambda t, data: Pon(t),
+    "Kan": lambda t, data: Kan(t, data['ankan']),
+}
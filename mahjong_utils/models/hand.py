@@ -3,6 +3,8 @@ from typing import Sequence
 from pydantic.fields import Field
 from pydantic.main import BaseModel
 
+from mahjong_utils.codec import reduce_model
+from mahjong_utils.hashcons import decode_interned
 from mahjong_utils.models.furo import Furo, Kan
 from mahjong_utils.models.hand_pattern import HandPattern
 from mahjong_utils.models.tile import Tile
@@ -29,8 +31,15 @@ class Hand(BaseModel):
 
     @classmethod
     def __decode__(cls, data: dict) -> "Hand":
+        return decode_interned("Hand", data, cls._decode)
+
+    @classmethod
+    def _decode(cls, data: dict) -> "Hand":
         return Hand(
             tiles=[Tile.__decode__(x) for x in data["tiles"]],
             furo=[Furo.__decode__(x) for x in data["furo"]],
             patterns=[HandPattern.__decode__(x) for x in data["patterns"]]
         )
+
+    def __reduce__(self):
+        return reduce_model(self)
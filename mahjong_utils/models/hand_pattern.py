@@ -4,6 +4,8 @@ from typing import Iterable, Optional, Tuple, FrozenSet
 from pydantic import Field
 from pydantic.main import BaseModel
 
+from mahjong_utils.codec import reduce_model
+from mahjong_utils.hashcons import decode_interned
 from mahjong_utils.models.furo import Furo, Kan
 from mahjong_utils.models.mentsu import Mentsu, Shuntsu, Kotsu
 from mahjong_utils.models.tatsu import Tatsu
@@ -30,14 +32,13 @@ class HandPattern(BaseModel, ABC):
 
     @classmethod
     def __decode__(cls, data: dict) -> "HandPattern":
-        if data['type'] == 'RegularHandPattern':
-            return RegularHandPattern.__decode__(data)
-        elif data['type'] == 'ChitoiHandPattern':
-            return ChitoiHandPattern.__decode__(data)
-        elif data['type'] == 'KokushiHandPattern':
-            return KokushiHandPattern.__decode__(data)
-        else:
+        decoder = _decoders.get(data['type'], None)
+        if decoder is None:
             raise ValueError("invalid type: " + data['type'])
+        return decode_interned(data['type'], data, decoder)
+
+    def __reduce__(self):
+        return reduce_model(self)
 
 
 class RegularHandPattern(HandPattern):
@@ -198,3 +199,10 @@ class KokushiHandPattern(HandPattern):
             yield t
 
     __all__ = ("HandPattern", "RegularHandPattern", "ChitoiHandPattern", "KokushiHandPattern")
+
+
+_decoders = {
+    "RegularHandPattern": RegularHandPattern.__decode__,
+    "ChitoiHandPattern": ChitoiHandPattern.__decode__,
+    "KokushiHandPattern": KokushiHandPattern.__decode__,
+}
@@ -2,9 +2,9 @@ from abc import ABC, abstractmethod
 from typing import Optional, FrozenSet, Tuple
 
 from pydantic import Field
-from stringcase import pascalcase, snakecase
 
 from mahjong_utils.models.hand_pattern import RegularHandPattern, HandPattern, ChitoiHandPattern, KokushiHandPattern
+from mahjong_utils.models.names import wind_names
 from mahjong_utils.models.tatsu import Tatsu
 from mahjong_utils.models.tile import Tile, all_yaochu
 from mahjong_utils.models.wind import Wind
@@ -23,14 +23,10 @@ class HoraHandPattern(HandPattern, ABC):
 
     @classmethod
     def __decode__(cls, data: dict) -> "HoraHandPattern":
-        if data['type'] == 'RegularHoraHandPattern':
-            return RegularHoraHandPattern.__decode__(data)
-        elif data['type'] == 'ChitoiHoraHandPattern':
-            return ChitoiHoraHandPattern.__decode__(data)
-        elif data['type'] == 'KokushiHoraHandPattern':
-            return KokushiHoraHandPattern.__decode__(data)
-        else:
+        decoder = _decoders.get(data['type'], None)
+        if decoder is None:
             raise ValueError("invalid type: " + data['type'])
+        return decoder(data)
 
 
 class RegularHoraHandPattern(HoraHandPattern, RegularHandPattern):
@@ -42,8 +38,8 @@ class RegularHoraHandPattern(HoraHandPattern, RegularHandPattern):
             type="RegularHoraHandPattern",
             agari=self.agari.__encode__(),
             tsumo=self.tsumo,
-            self_wind=pascalcase(self.self_wind.name) if self.self_wind is not None else None,
-            round_wind=pascalcase(self.round_wind.name) if self.round_wind is not None else None,
+            self_wind=wind_names.encode(self.self_wind),
+            round_wind=wind_names.encode(self.round_wind),
             agari_tatsu=self.agari_tatsu.__encode__() if self.agari_tatsu is not None else None,
             pattern=RegularHandPattern.__encode__(self)
         )
@@ -53,8 +49,8 @@ class RegularHoraHandPattern(HoraHandPattern, RegularHandPattern):
         return RegularHoraHandPattern(
             agari=Tile.__decode__(data["agari"]),
             tsumo=data["tsumo"],
-            self_wind=Wind[snakecase(data["selfWind"])] if data["selfWind"] is not None else None,
-            round_wind=Wind[snakecase(data["roundWind"])] if data["roundWind"] is not None else None,
+            self_wind=wind_names.decode(data["selfWind"]),
+            round_wind=wind_names.decode(data["roundWind"]),
             agari_tatsu=Tatsu.__decode__(data["agariTatsu"]) if data["agariTatsu"] is not None else None,
             hu=data["hu"],
             **RegularHandPattern.__decode__(data["pattern"]).dict()
@@ -71,8 +67,8 @@ class ChitoiHoraHandPattern(HoraHandPattern, ChitoiHandPattern):
             pairs=[t.__encode__() for t in self.pairs],
             agari=self.agari.__encode__(),
             tsumo=self.tsumo,
-            self_wind=pascalcase(self.self_wind.name) if self.self_wind is not None else None,
-            round_wind=pascalcase(self.round_wind.name) if self.round_wind is not None else None,
+            self_wind=wind_names.encode(self.self_wind),
+            round_wind=wind_names.encode(self.round_wind),
         )
 
     @classmethod
@@ -81,8 +77,8 @@ class ChitoiHoraHandPattern(HoraHandPattern, ChitoiHandPattern):
             agari=Tile.__decode__(data["agari"]),
             pairs=frozenset(Tile.__decode__(t) for t in data["pairs"]),
             tsumo=data["tsumo"],
-            self_wind=Wind[snakecase(data["selfWind"])] if data["selfWind"] is not None else None,
-            round_wind=Wind[snakecase(data["roundWind"])] if data["roundWind"] is not None else None,
+            self_wind=wind_names.decode(data["selfWind"]),
+            round_wind=wind_names.decode(data["roundWind"]),
         )
 
 
@@ -102,8 +98,8 @@ class KokushiHoraHandPattern(HoraHandPattern, KokushiHandPattern):
             repeated=self.repeated.__encode__(),
             agari=self.agari.__encode__(),
             tsumo=self.tsumo,
-            self_wind=pascalcase(self.self_wind.name) if self.self_wind is not None else None,
-            round_wind=pascalcase(self.round_wind.name) if self.round_wind is not None else None,
+            self_wind=wind_names.encode(self.self_wind),
+            round_wind=wind_names.encode(self.round_wind),
         )
 
     @classmethod
@@ -112,6 +108,13 @@ class KokushiHoraHandPattern(HoraHandPattern, KokushiHandPattern):
             repeated=Tile.__decode__(data["repeated"]),
             agari=Tile.__decode__(data["agari"]),
             tsumo=data["tsumo"],
-            self_wind=Wind[snakecase(data["selfWind"])] if data["selfWind"] is not None else None,
-            round_wind=Wind[snakecase(data["roundWind"])] if data["roundWind"] is not None else None,
+            self_wind=wind_names.decode(data["selfWind"]),
+            round_wind=wind_names.decode(data["roundWind"]),
         )
+
+
+_decoders = {
+    "RegularHoraHandPattern": RegularHoraHandPattern.__decode__,
+    "ChitoiHoraHandPattern": ChitoiHoraHandPattern.__decode__,
+    "KokushiHoraHandPattern": KokushiHoraHandPattern.__decode__,
+}
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Sequence, Union, Iterable, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Sequence, Union, Iterable, TYPE_CHECKING, Tuple, Optional, Mapping
 
 from pydantic.dataclasses import dataclass
 
-from .tile import Tile, parse_tiles
+from .tile import Tile, parse_tiles, tile_pool
 from .tile_type import TileType
 
 if TYPE_CHECKING:
@@ -31,7 +32,10 @@ class Mentsu(ABC):
 
     @classmethod
     def __decode__(cls, data: str) -> "Mentsu":
-        return Mentsu.parse(data)
+        mt = mentsu_by_text.get(data, None)
+        if mt is None:
+            mt = Mentsu.parse(data)
+        return mt
 
     @staticmethod
     def parse(t: Union[Sequence[Tile], str]) -> "Mentsu":
@@ -42,13 +46,13 @@ class Mentsu(ABC):
             raise ValueError("_tiles must has length of 3")
 
         if t[0] == t[1] == t[2]:
-            return Kotsu(t[0])
+            return kotsu_pool[t[0].code] or Kotsu(t[0])
         else:
             if t[0].tile_type == TileType.Z or t[1].tile_type == TileType.Z or t[2].tile_type == TileType.Z:
                 raise ValueError(f"invalid _tiles: {t}")
             t = sorted(t)
             if t[1] - t[0] == 1 and t[2] - t[1] == 1:
-                return Shuntsu(t[0])
+                return shuntsu_pool[t[0].code] or Shuntsu(t[0])
             else:
                 raise ValueError(f"invalid _tiles: {t}")
 
@@ -63,13 +67,13 @@ class Kotsu(Mentsu):
         return f"{self.tile.num}{self.tile.num}{self.tile.num}{self.tile.tile_type.lower()}"
 
     @property
-    def tiles(self) -> List[Tile]:
-        return [self.tile] * 3
+    def tiles(self) -> Tuple[Tile, ...]:
+        return _kotsu_tiles[self.tile.code]
 
     def after_discard(self, discard: Tile) -> "Toitsu":
-        from .tatsu import Toitsu
+        from .tatsu import toitsu_pool
         if discard == self.tile:
-            return Toitsu(discard)
+            return toitsu_pool[discard.code]
         raise ValueError()
 
 
@@ -87,26 +91,42 @@ class Shuntsu(Mentsu):
         return f"{self.tile.num}{self.tile.num + 1}{self.tile.num + 2}{self.tile.tile_type.lower()}"
 
     @property
-    def tiles(self) -> List[Tile]:
-        return [self.tile, self.tile + 1, self.tile + 2]
+    def tiles(self) -> Tuple[Tile, ...]:
+        return _shuntsu_tiles[self.tile.code]
 
     def after_discard(self, discard: Tile) -> "Union[Penchan, Ryanmen, Kanchan]":
-        from .tatsu import Penchan, Kanchan, Ryanmen
+        from .tatsu import penchan_pool, kanchan_pool, ryanmen_pool
         if discard == self.tile:
             if discard.num == 7:
-                return Penchan(discard + 1)
+                return penchan_pool[discard.code + 1]
             elif discard.num == 3:
-                return Penchan(discard - 2)
+                return penchan_pool[discard.code - 2]
             else:
-                return Ryanmen(discard + 1)
+                return ryanmen_pool[discard.code + 1]
         elif discard == self.tile + 1:
-            return Kanchan(self.tile)
+            return kanchan_pool[self.tile.code]
         elif discard == self.tile + 2:
             if self.tile.num == 1:
-                return Penchan(self.tile)
+                return penchan_pool[self.tile.code]
             else:
-                return Ryanmen(self.tile)
+                return ryanmen_pool[self.tile.code]
         raise ValueError()
 
 
-__all__ = ("Mentsu", "Kotsu", "Shuntsu",)
+# 面子的种类很少，预先构造全部的面子（以tile.code为下标，与tile_pool相同），解码与parse时复用同一个对象
+kotsu_pool: Tuple[Optional[Kotsu], ...] = tuple(
+    Kotsu(t) if t is not None else None for t in tile_pool)
+
+shuntsu_pool: Tuple[Optional[Shuntsu], ...] = tuple(
+    Shuntsu(t) if t is not None and t.tile_type != TileType.Z and 1 <= t.num <= 7 else None for t in tile_pool)
+
+mentsu_by_text: Mapping[str, Mentsu] = MappingProxyType(dict(
+    (str(mt), mt) for mt in (*kotsu_pool, *shuntsu_pool) if mt is not None))
+
+_kotsu_tiles: Tuple[Optional[Tuple[Tile, ...]], ...] = tuple(
+    (t,) * 3 if t is not None else None for t in tile_pool)
+
+_shuntsu_tiles: Tuple[Optional[Tuple[Tile, ...]], ...] = tuple(
+    (t, t + 1, t + 2) if mt is not None else None for (t, mt) in zip(tile_pool, shuntsu_pool))
+
+__all__ = ("Mentsu", "Kotsu", "Shuntsu", "kotsu_pool", "shuntsu_pool", "mentsu_by_text",)
@@ -0,0 +1,49 @@
+"""
+Python侧的枚举值与库（Kotlin）侧名称的对照表
+
+对照表在导入时生成一次，编解码时只做字典查找，不再逐个调用stringcase做大小写转换。
+"""
+from typing import Dict, Generic, Iterable, Optional, Tuple, TypeVar
+
+from stringcase import pascalcase
+
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.yaku import Yaku, all_yaku
+
+T = TypeVar("T")
+
+
+class NameTable(Generic[T]):
+    """
+    值与名称的双向对照表
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, T]]) -> None:
+        self._by_name: Dict[str, T] = {}
+        self._names: Dict[T, str] = {}
+        for (name, value) in items:
+            self._by_name[name] = value
+            self._names[value] = name
+
+    def encode(self, value: Optional[T]) -> Optional[str]:
+        if value is None:
+            return None
+        return self._names[value]
+
+    def decode(self, name: Optional[str]) -> Optional[T]:
+        if name is None:
+            return None
+        value = self._by_name.get(name, None)
+        if value is None:
+            raise ValueError(f"invalid name: {name}")
+        return value
+
+    def names(self) -> Iterable[str]:
+        return self._by_name.keys()
+
+
+wind_names: NameTable[Wind] = NameTable((pascalcase(w.name), w) for w in Wind)
+
+yaku_names: NameTable[Yaku] = NameTable((pascalcase(yk.name), yk) for yk in all_yaku)
+
+__all__ = ("NameTable", "wind_names", "yaku_names")
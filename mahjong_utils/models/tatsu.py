@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Set, Sequence, Union
+from types import MappingProxyType
+from typing import Set, Sequence, Union, FrozenSet, Tuple, Optional, Mapping, Dict
 
 from pydantic.dataclasses import dataclass
 
 from .mentsu import Mentsu, Shuntsu, Kotsu
-from .tile import Tile, parse_tiles, tiles_text
+from .tile import Tile, parse_tiles, tiles_text, tile_pool
 from .tile_type import TileType
 
 
@@ -21,8 +22,15 @@ class Tatsu(ABC):
         raise NotImplementedError()
 
     @property
+    def waiting(self) -> FrozenSet[Tile]:
+        table = _waiting_tables.get(type(self), None)
+        waiting = table[self.first.code] if table is not None else None
+        if waiting is None:
+            waiting = frozenset(self._waiting())
+        return waiting
+
     @abstractmethod
-    def waiting(self) -> Set[Tile]:
+    def _waiting(self) -> Set[Tile]:
         raise NotImplementedError()
 
     def with_waiting(self, tile: Tile) -> Mentsu:
@@ -33,7 +41,10 @@ class Tatsu(ABC):
 
     @classmethod
     def __decode__(cls, data: str) -> "Tatsu":
-        return Tatsu.parse(data)
+        tt = tatsu_by_text.get(data, None)
+        if tt is None:
+            tt = Tatsu.parse(data)
+        return tt
 
     @staticmethod
     def parse(t: Union[Sequence[Tile], str]) -> "Tatsu":
@@ -49,18 +60,18 @@ class Tatsu(ABC):
             first, second = second, first
 
         if first == second:
-            return Toitsu(first)
+            return toitsu_pool[first.code] or Toitsu(first)
         else:
             if first.tile_type == TileType.Z or second.tile_type == TileType.Z:
                 raise ValueError(f"invalid tiles: {t}")
 
             if second - first == 1:
                 if first.num == 1 or first.num == 8:
-                    return Penchan(first)
+                    return penchan_pool[first.code] or Penchan(first)
                 else:
-                    return Ryanmen(first)
+                    return ryanmen_pool[first.code] or Ryanmen(first)
             elif second - first == 2:
-                return Kanchan(first)
+                return kanchan_pool[first.code] or Kanchan(first)
             else:
                 raise ValueError(f"invalid tiles: {first}, {second}")
 
@@ -79,8 +90,7 @@ class Ryanmen(Tatsu):
     def second(self) -> Tile:
         return self.first + 1
 
-    @property
-    def waiting(self) -> Set[Tile]:
+    def _waiting(self) -> Set[Tile]:
         return {self.first - 1, self.second + 1}
 
     def with_waiting(self, tile: Tile) -> Mentsu:
@@ -109,8 +119,7 @@ class Penchan(Tatsu):
     def second(self) -> Tile:
         return self.first + 1
 
-    @property
-    def waiting(self) -> Set[Tile]:
+    def _waiting(self) -> Set[Tile]:
         if self.first.num == 1:
             return {self.first + 2}
         else:
@@ -142,8 +151,7 @@ class Kanchan(Tatsu):
     def second(self) -> Tile:
         return self.first + 2
 
-    @property
-    def waiting(self) -> Set[Tile]:
+    def _waiting(self) -> Set[Tile]:
         return {self.first + 1}
 
     def with_waiting(self, tile: Tile) -> Mentsu:
@@ -166,8 +174,7 @@ class Toitsu(Tatsu):
     def second(self) -> Tile:
         return self.first
 
-    @property
-    def waiting(self) -> Set[Tile]:
+    def _waiting(self) -> Set[Tile]:
         return {self.first}
 
     def with_waiting(self, tile: Tile) -> Mentsu:
@@ -180,4 +187,30 @@ class Toitsu(Tatsu):
         return f"{self.first.num}{self.second.num}{self.first.tile_type.lower()}"
 
 
-__all__ = ("Tatsu", "Toitsu", "Kanchan", "Ryanmen", "Penchan",)
+def _make_pool(cls: type, valid) -> tuple:
+    return tuple(cls(t) if t is not None and valid(t) else None for t in tile_pool)
+
+
+# 搭子的种类很少，预先构造全部的搭子（以first.code为下标，与tile_pool相同），解码与parse时复用同一个对象
+toitsu_pool: Tuple[Optional[Toitsu], ...] = _make_pool(Toitsu, lambda t: True)
+
+ryanmen_pool: Tuple[Optional[Ryanmen], ...] = _make_pool(
+    Ryanmen, lambda t: t.tile_type != TileType.Z and 2 <= t.num <= 7)
+
+penchan_pool: Tuple[Optional[Penchan], ...] = _make_pool(
+    Penchan, lambda t: t.tile_type != TileType.Z and (t.num == 1 or t.num == 8))
+
+kanchan_pool: Tuple[Optional[Kanchan], ...] = _make_pool(
+    Kanchan, lambda t: t.tile_type != TileType.Z and 1 <= t.num <= 7)
+
+tatsu_by_text: Mapping[str, Tatsu] = MappingProxyType(dict(
+    (str(tt), tt) for tt in (*toitsu_pool, *ryanmen_pool, *penchan_pool, *kanchan_pool) if tt is not None))
+
+# 搭子的类 -> 以first.code为下标的待牌
+_waiting_tables: Dict[type, Tuple[Optional[FrozenSet[Tile]], ...]] = dict(
+    (cls, tuple(frozenset(tt._waiting()) if tt is not None else None for tt in pool))
+    for (cls, pool) in ((Toitsu, toitsu_pool), (Ryanmen, ryanmen_pool), (Penchan, penchan_pool),
+                        (Kanchan, kanchan_pool)))
+
+__all__ = ("Tatsu", "Toitsu", "Kanchan", "Ryanmen", "Penchan",
+           "toitsu_pool", "ryanmen_pool", "penchan_pool", "kanchan_pool", "tatsu_by_text",)
@@ -1,5 +1,6 @@
 from io import StringIO
-from typing import Union, List, Iterable, Optional, NamedTuple
+from types import MappingProxyType
+from typing import Union, List, Iterable, Optional, NamedTuple, Mapping, Tuple
 
 from mahjong_utils.models.tile_type import TileType, tile_type_index_mapping, tile_type_reversed_index_mapping
 
@@ -132,23 +133,37 @@ class Tile(NamedTuple):
 
     @classmethod
     def __decode__(cls, data: str) -> "Tile":
-        return cls.by_text(data)
+        t = tile_by_text.get(data, None)
+        if t is None:
+            return cls.by_text(data)
+        return t
 
+    def __reduce__(self):
+        # 以code代替TileType与num，反序列化时得到tile_pool中的同一个对象
+        return Tile.by_code, (self.code,)
 
-tile_pool: List[Optional[Tile]] = []
 
-for i in range(0, 10):
-    tile_pool.append(Tile(TileType.M, i))
-for i in range(0, 10):
-    tile_pool.append(Tile(TileType.P, i))
-for i in range(0, 10):
-    tile_pool.append(Tile(TileType.S, i))
-tile_pool.append(None)
-for i in range(1, 8):
-    tile_pool.append(Tile(TileType.Z, i))
+def _make_tile_pool() -> Tuple[Optional[Tile], ...]:
+    pool: List[Optional[Tile]] = []
+    for i in range(0, 10):
+        pool.append(Tile(TileType.M, i))
+    for i in range(0, 10):
+        pool.append(Tile(TileType.P, i))
+    for i in range(0, 10):
+        pool.append(Tile(TileType.S, i))
+    pool.append(None)
+    for i in range(1, 8):
+        pool.append(Tile(TileType.Z, i))
+    return tuple(pool)
+
+
+# 牌池与文本对照表在导入后不再修改，可以在多个线程（包括无GIL的解释器）中并发读取
+tile_pool: Tuple[Optional[Tile], ...] = _make_tile_pool()
 
 Tile._tile_pool = tile_pool
 
+tile_by_text: Mapping[str, Tile] = MappingProxyType(dict((str(t), t) for t in tile_pool if t is not None))
+
 
 def parse_tiles(text: str) -> List[Tile]:
     ans: List[Tile] = []
@@ -188,6 +203,30 @@ def tiles_text(tiles: Union[Tile, Iterable[Tile]]) -> str:
         return sio.getvalue()
 
 
+def tiles_to_mask(tiles: Iterable[Tile]) -> int:
+    """
+    将一组牌转换为位掩码（第code位为1表示包含该牌）
+    """
+    mask = 0
+    for t in tiles:
+        mask |= 1 << t.code
+    return mask
+
+
+def mask_to_tiles(mask: int) -> List[Tile]:
+    """
+    将位掩码转换回牌（按code升序）
+    """
+    ans: List[Tile] = []
+    code = 0
+    while mask:
+        if mask & 1:
+            ans.append(Tile.by_code(code))
+        mask >>= 1
+        code += 1
+    return ans
+
+
 all_yaochu = frozenset(parse_tiles("19m19s19p1234567z"))
 
 
@@ -240,5 +279,5 @@ def is_sangen(t: Tile) -> bool:
     return t.tile_type == TileType.Z and 5 <= t.num <= 7
 
 
-__all__ = ("Tile", "parse_tiles", "tiles_text", "all_yaochu",
+__all__ = ("Tile", "tile_by_text", "parse_tiles", "tiles_text", "tiles_to_mask", "mask_to_tiles", "all_yaochu",
            "is_m", "is_p", "is_s", "is_z", "is_wind", "is_sangen", "is_yaochu")
@@ -0,0 +1,277 @@
+"""
+多进程批量分析，结果经共享内存返回（需要安装numpy）
+
+父进程为结果分配一块共享内存（SharedArena），工作进程按下标把结果直接写入其中，经管道传递的只有共享内存的描述与下标范围。
+全部工作进程完成后父进程立即删除共享内存的名称（unlink），返回的NumPy数组仍然有效，在不再被引用时释放；出错时也会删除。
+"""
+import os
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mahjong_utils.corpus import record_dtype, shanten_numbers
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import Tile, tiles_to_mask
+from mahjong_utils.prefork import worker_pool
+from mahjong_utils.shanten import shanten, PatternsOption
+
+_alignment = 64
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    """
+    映射随引用它的最后一个数组一起释放的共享内存
+    """
+
+    def close(self):
+        # NumPy数组以mmap对象为基，但不持有其缓冲区的导出，显式关闭mmap会使数组失效；只释放本对象的引用，
+        # mmap在最后一个数组释放时解除映射（mmap持有自己的文件描述符，这里的可以先关闭）
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+        self._mmap = None
+        fd = getattr(self, "_fd", -1)
+        if fd >= 0:
+            os.close(fd)
+            self._fd = -1
+
+
+class ArenaDescriptor(NamedTuple):
+    """
+    共享内存的描述，经管道传给工作进程
+    """
+
+    name: str
+    layout: Tuple[Tuple[str, str, Tuple[int, ...], int], ...]
+    """
+    各数组的(名称, dtype, 形状, 偏移)
+    """
+
+
+def _views(shm: shared_memory.SharedMemory, layout) -> Dict[str, np.ndarray]:
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for (name, dtype, shape, offset) in layout}
+
+
+class SharedArena:
+    """
+    一块共享内存，划分为若干个NumPy数组
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, Any, Tuple[int, ...]]]) -> None:
+        """
+        :param fields: 各数组的(名称, dtype, 形状)
+        """
+        layout = []
+        size = 0
+        for (name, dtype, shape) in fields:
+            dtype = np.dtype(dtype)
+            shape = tuple(shape)
+            size = -(-size // _alignment) * _alignment
+            layout.append((name, dtype.str, shape, size))
+            size += dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+
+        self._shm = _SharedMemory(create=True, size=max(size, 1))
+        self.descriptor = ArenaDescriptor(self._shm.name, tuple(layout))
+        self.arrays = _views(self._shm, layout)
+        self._unlinked = False
+
+    def unlink(self) -> None:
+        """
+        删除共享内存的名称，之后工作进程不能再连接；已有的数组仍然有效
+        """
+        if not self._unlinked:
+            self._unlinked = True
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedArena":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.unlink()
+
+
+@contextmanager
+def attach(descriptor: ArenaDescriptor) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    在工作进程中连接共享内存，退出上下文后不能再使用得到的数组
+    """
+    shm = _SharedMemory(name=descriptor.name)
+    arrays = _views(shm, descriptor.layout)
+    try:
+        yield arrays
+    finally:
+        arrays.clear()
+        shm.close()
+
+
+def _run(fields: Sequence[Tuple[str, Any, Tuple[int, ...]]], worker: Callable, items: Sequence,
+         options: Mapping[str, Any], workers: int, chunk_size: int) -> Dict[str, np.ndarray]:
+    with SharedArena(fields) as arena:
+        chunks = [(arena.descriptor, start, items[start:start + chunk_size], options)
+                  for start in range(0, len(items), chunk_size)]
+        if workers <= 1:
+            for chunk in chunks:
+                worker(chunk)
+        else:
+            with worker_pool(workers) as pool:
+                for _ in pool.imap_unordered(worker, chunks):
+                    pass
+        return arena.arrays
+
+
+class ShantenArrays(NamedTuple):
+    """
+    各手牌的向听分析结果；已摸牌的手牌取最优的打法（向听数最小、进张数最多）打出后的结果
+    """
+
+    shanten: np.ndarray
+    """
+    向听数（int8）
+    """
+
+    discard: np.ndarray
+    """
+    最优打法打出的牌的code（uint8），未摸牌的手牌为0xFF
+    """
+
+    advance: np.ndarray
+    """
+    进张的位掩码（uint64，第code位为1表示该牌为进张）
+    """
+
+    advance_num: np.ndarray
+    """
+    进张数（int32）
+    """
+
+    good_shape_advance_num: np.ndarray
+    """
+    好型进张数（int32，未计算时为-1）
+    """
+
+
+def _shanten_worker(chunk) -> int:
+    descriptor, start, hands, options = chunk
+    with attach(descriptor) as arrays:
+        for (i, (tiles, furo)) in enumerate(hands, start):
+            result = shanten(tiles, furo, allow_ankan=options["allow_ankan"], patterns=PatternsOption.none)
+            arrays["shanten"][i] = result.shanten
+            if result.with_got:
+                discard, info = min(result.discard_to_advance.items(),
+                                    key=lambda x: (x[1].shanten, -x[1].advance_num))
+                arrays["discard"][i] = discard.code
+            else:
+                info = result.shanten_info
+                arrays["discard"][i] = 0xFF
+            arrays["advance"][i] = tiles_to_mask(info.advance)
+            arrays["advance_num"][i] = info.advance_num
+            arrays["good_shape_advance_num"][i] = info.good_shape_advance_num \
+                if info.good_shape_advance_num is not None else -1
+    return len(hands)
+
+
+def parallel_shanten(
+        hands: Sequence[Sequence[Tile]],
+        furo: Optional[Sequence[Optional[Sequence[Furo]]]] = None,
+        *, allow_ankan: bool = True,
+        workers: int = 1,
+        chunk_size: int = 256,
+) -> ShantenArrays:
+    """
+    以多个进程对一组手牌进行向听分析
+
+    :param hands: 各手牌的门前的牌
+    :param furo: 各手牌的副露（与hands一一对应）
+    :param allow_ankan: 是否允许暗杠
+    :param workers: 工作进程数（为1时在当前进程内处理）
+    :param chunk_size: 每次分派给工作进程的手牌数
+    """
+    n = len(hands)
+    if furo is None:
+        furo = [None] * n
+    arrays = _run([("shanten", np.int8, (n,)), ("discard", np.uint8, (n,)), ("advance", np.uint64, (n,)),
+                   ("advance_num", np.int32, (n,)), ("good_shape_advance_num", np.int32, (n,))],
+                  _shanten_worker, list(zip(hands, furo)), {"allow_ankan": allow_ankan}, workers, chunk_size)
+    return ShantenArrays(**arrays)
+
+
+def _shanten_numbers_worker(chunk) -> int:
+    descriptor, start, records, options = chunk
+    with attach(descriptor) as arrays:
+        shanten_numbers(records, arrays["shanten"][start:start + len(records)], allow_ankan=options["allow_ankan"])
+    return len(records)
+
+
+def parallel_shanten_numbers(
+        records: np.ndarray,
+        *, allow_ankan: bool = True,
+        workers: int = 1,
+        chunk_size: int = 1024,
+) -> np.ndarray:
+    """
+    以多个进程对语料中的每条记录进行向听分析（同corpus.shanten_numbers）
+
+    :param records: 语料的记录（Corpus.records或其切片）
+    :param allow_ankan: 是否允许暗杠
+    :param workers: 工作进程数（为1时在当前进程内处理）
+    :param chunk_size: 每次分派给工作进程的记录数
+    :return: 各记录的向听数（int8）
+    """
+    if records.dtype != record_dtype:
+        raise ValueError("invalid record dtype")
+    arrays = _run([("shanten", np.int8, (len(records),))], _shanten_numbers_worker, records,
+                  {"allow_ankan": allow_ankan}, workers, chunk_size)
+    return arrays["shanten"]
+
+
+class HoraArrays(NamedTuple):
+    """
+    各手牌的和牌分析结果（int32）；不是和牌形的手牌番数为-1，点数为0
+    """
+
+    han: np.ndarray
+    hu: np.ndarray
+    parent_ron: np.ndarray
+    parent_tsumo: np.ndarray
+    child_ron: np.ndarray
+    child_tsumo_parent: np.ndarray
+    child_tsumo_child: np.ndarray
+
+
+def _hora_worker(chunk) -> int:
+    descriptor, start, hands, options = chunk
+    with attach(descriptor) as arrays:
+        for (i, kwargs) in enumerate(hands, start):
+            try:
+                hora = build_hora(**kwargs)
+            except ValueError:
+                arrays["points"][i] = (-1, 0, 0, 0, 0, 0, 0)
+                continue
+            arrays["points"][i] = (hora.han, hora.hu, *hora.parent_point, *hora.child_point)
+    return len(hands)
+
+
+def parallel_hora(
+        hands: Sequence[Mapping[str, Any]],
+        *, workers: int = 1,
+        chunk_size: int = 256,
+) -> HoraArrays:
+    """
+    以多个进程对一组手牌进行和牌分析
+
+    :param hands: 各手牌的build_hora参数
+    :param workers: 工作进程数（为1时在当前进程内处理）
+    :param chunk_size: 每次分派给工作进程的手牌数
+    """
+    arrays = _run([("points", np.int32, (len(hands), len(HoraArrays._fields)))], _hora_worker, list(hands), {},
+                  workers, chunk_size)
+    points = arrays["points"]
+    return HoraArrays(*(points[:, j] for j in range(len(HoraArrays._fields))))
+
+
+__all__ = ("ArenaDescriptor", "SharedArena", "attach",
+           "ShantenArrays", "parallel_shanten", "parallel_shanten_numbers", "HoraArrays", "parallel_hora",)
@@ -0,0 +1,290 @@
+"""
+手牌的结构分析（Hand.patterns）
+
+分析库总是返回全部的分解，PatternsOption控制其中有多少被解码为HandPattern对象；
+iter_patterns在Python侧逐个枚举分解，不需要一次性保存全部的分解。
+"""
+from enum import Enum
+from typing import Iterator, List, Optional, Sequence, Union
+
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.hand_pattern import HandPattern, RegularHandPattern, ChitoiHandPattern, KokushiHandPattern
+from mahjong_utils.models.mentsu import Mentsu, kotsu_pool, shuntsu_pool
+from mahjong_utils.models.tatsu import Tatsu, toitsu_pool, ryanmen_pool, penchan_pool, kanchan_pool
+from mahjong_utils.models.tile import Tile, tile_pool, all_yaochu
+
+
+class PatternsOption(str, Enum):
+    """
+    向听分析结果中保留的手牌分解
+    """
+
+    none = "none"
+    """
+    不保留（Hand.patterns为空）
+    """
+
+    best = "best"
+    """
+    只保留孤张最少的一个
+    """
+
+    full = "full"
+    """
+    全部保留
+    """
+
+
+PatternsArg = Union[PatternsOption, str, int]
+
+
+def limit_patterns(data: dict, patterns: PatternsArg) -> dict:
+    """
+    在解码前裁剪分析库返回的向听分析结果（含regular、chitoi、kokushi子结果）中的手牌分解
+
+    :param data: 分析库返回的向听分析结果
+    :param patterns: PatternsOption，或保留的分解的个数上限
+    :return: data（原地修改）
+    """
+    if isinstance(patterns, int) and not isinstance(patterns, bool):
+        if patterns < 0:
+            raise ValueError("patterns must not be negative")
+        cap = patterns
+    else:
+        option = PatternsOption(patterns)
+        if option == PatternsOption.full:
+            return data
+        cap = 0 if option == PatternsOption.none else None
+
+    _limit(data, cap)
+    return data
+
+
+def _pattern_rank(p: dict):
+    return len(p["remaining"]), -len(p.get("menzenMentsu") or ())
+
+
+def _limit(data: Optional[dict], cap: Optional[int]):
+    if data is None:
+        return
+
+    hand = data["hand"]
+    if cap is None:
+        if len(hand["patterns"]) > 1:
+            hand["patterns"] = [min(hand["patterns"], key=_pattern_rank)]
+    else:
+        del hand["patterns"][cap:]
+
+    for key in ("regular", "chitoi", "kokushi"):
+        _limit(data.get(key), cap)
+
+
+# 枚举标准形分解时，同一张牌所在的块的种类（按此顺序选取，避免同一分解被枚举多次）
+_KOTSU, _SHUNTSU, _JYANTOU, _TOITSU, _RYANMEN, _KANCHAN, _REMAINING = range(7)
+
+
+class _RegularSearch:
+    """
+    以各code的张数为状态的深度优先搜索，手牌分解保存在栈中，叶子处产出向听数
+    """
+
+    def __init__(self, counts: List[int], k: int, furo: Sequence[Furo]) -> None:
+        self.counts = counts
+        self.k = k
+        self.furo = tuple(furo)
+        self.jyantou: Optional[Tile] = None
+        self.mentsu: List[Mentsu] = []
+        self.tatsu: List[Tatsu] = []
+        self.remaining: List[Tile] = []
+        # 只搜索向听数不大于bound的分解
+        self.bound = 2 * k
+
+    def _shanten(self) -> int:
+        m = len(self.furo) + len(self.mentsu)
+        j = 1 if self.jyantou is not None else 0
+        # 面子与搭子的总数超过k时，多余的搭子不减少向听数
+        return 2 * (self.k - m) - min(len(self.tatsu), self.k - m) - j
+
+    def search(self, i: int = 0, min_kind: int = 0, rest: Optional[int] = None) -> Iterator[int]:
+        counts = self.counts
+        if rest is None:
+            rest = sum(counts)
+
+        while i < len(counts) and counts[i] == 0:
+            i += 1
+            min_kind = 0
+
+        shanten = self._shanten()
+        # 剩余的每张牌至多使向听数减少2/3（组成面子）
+        if max(shanten - 2 * rest // 3, -1) > self.bound:
+            return
+
+        if i == len(counts):
+            yield shanten
+            return
+
+        t = tile_pool[i]
+        suited = i < 30
+        num = i % 10
+        m = len(self.furo) + len(self.mentsu)
+        can_tatsu = m + len(self.tatsu) < self.k
+
+        for kind in range(min_kind, 7):
+            if kind == _KOTSU:
+                if counts[i] < 3 or m >= self.k:
+                    continue
+                counts[i] -= 3
+                self.mentsu.append(kotsu_pool[i])
+                yield from self.search(i, kind, rest - 3)
+                self.mentsu.pop()
+                counts[i] += 3
+            elif kind == _SHUNTSU:
+                if not suited or num > 7 or counts[i + 1] == 0 or counts[i + 2] == 0 or m >= self.k:
+                    continue
+                counts[i] -= 1
+                counts[i + 1] -= 1
+                counts[i + 2] -= 1
+                self.mentsu.append(shuntsu_pool[i])
+                yield from self.search(i, kind, rest - 3)
+                self.mentsu.pop()
+                counts[i] += 1
+                counts[i + 1] += 1
+                counts[i + 2] += 1
+            elif kind == _JYANTOU:
+                if counts[i] < 2 or self.jyantou is not None:
+                    continue
+                counts[i] -= 2
+                self.jyantou = t
+                yield from self.search(i, kind, rest - 2)
+                self.jyantou = None
+                counts[i] += 2
+            elif kind == _TOITSU or kind == _RYANMEN or kind == _KANCHAN:
+                if not can_tatsu:
+                    continue
+                if kind == _TOITSU:
+                    if counts[i] < 2:
+                        continue
+                    other = i
+                    tt = toitsu_pool[i]
+                elif kind == _RYANMEN:
+                    if not suited or num > 8 or counts[i + 1] == 0:
+                        continue
+                    other = i + 1
+                    tt = penchan_pool[i] if num == 1 or num == 8 else ryanmen_pool[i]
+                else:
+                    if not suited or num > 7 or counts[i + 2] == 0:
+                        continue
+                    other = i + 2
+                    tt = kanchan_pool[i]
+                counts[i] -= 1
+                counts[other] -= 1
+                self.tatsu.append(tt)
+                yield from self.search(i, kind, rest - 2)
+                self.tatsu.pop()
+                counts[i] += 1
+                counts[other] += 1
+            else:
+                counts[i] -= 1
+                self.remaining.append(t)
+                yield from self.search(i, kind, rest - 1)
+                self.remaining.pop()
+                counts[i] += 1
+
+    def min_shanten(self) -> int:
+        self.bound = 2 * self.k
+        for shanten in self.search():
+            # 之后只搜索向听数更小的分解
+            self.bound = shanten - 1
+        return self.bound + 1
+
+    def pattern(self) -> RegularHandPattern:
+        return RegularHandPattern(
+            k=self.k,
+            jyantou=self.jyantou,
+            menzen_mentsu=tuple(self.mentsu),
+            furo=self.furo,
+            tatsu=tuple(self.tatsu),
+            remaining=tuple(self.remaining),
+        )
+
+
+def _normal_counts(tiles: Sequence[Tile]) -> List[int]:
+    counts = [0] * len(tile_pool)
+    for t in tiles:
+        code = t.code
+        if code < 30 and code % 10 == 0:
+            code += 5
+        counts[code] += 1
+    return counts
+
+
+def iter_patterns(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None) -> Iterator[HandPattern]:
+    """
+    逐个产出手牌向听数最小的全部分解（标准形、七对子与国士无双中向听数最小者，不含赤宝牌），
+    与Hand.patterns相同的内容，但内存占用只取决于手牌的张数
+
+    :param tiles: 门前的牌
+    :param furo: 副露
+    """
+    if furo is None:
+        furo = ()
+
+    counts = _normal_counts(tiles)
+    k = len(tiles) // 3 + len(furo)
+
+    search = _RegularSearch(counts, k, furo)
+    regular = search.min_shanten()
+    best = regular
+
+    chitoi = None
+    kokushi = None
+    if len(furo) == 0 and len(tiles) in (13, 14):
+        pairs = sum(1 for c in counts if c >= 2)
+        kinds = sum(1 for c in counts if c > 0)
+        chitoi = 6 - pairs + max(0, 7 - kinds)
+
+        yaochu_kinds = sum(1 for t in all_yaochu if counts[t.code] > 0)
+        has_pair = any(counts[t.code] >= 2 for t in all_yaochu)
+        kokushi = 13 - yaochu_kinds - (1 if has_pair else 0)
+
+        best = min(best, chitoi, kokushi)
+
+    if regular == best:
+        search.bound = best
+        for shanten in search.search():
+            if shanten == best:
+                yield search.pattern()
+
+    if chitoi == best:
+        yield _chitoi_pattern(counts)
+
+    if kokushi == best:
+        yield from _kokushi_patterns(counts)
+
+
+def _chitoi_pattern(counts: List[int]) -> ChitoiHandPattern:
+    pairs = []
+    remaining = []
+    for (code, c) in enumerate(counts):
+        if c >= 2 and len(pairs) < 7:
+            pairs.append(tile_pool[code])
+            c -= 2
+        remaining += [tile_pool[code]] * c
+    return ChitoiHandPattern(pairs=frozenset(pairs), remaining=tuple(remaining))
+
+
+def _kokushi_patterns(counts: List[int]) -> Iterator[KokushiHandPattern]:
+    yaochu = frozenset(t for t in all_yaochu if counts[t.code] > 0)
+    repeated_candidates = sorted(t for t in yaochu if counts[t.code] >= 2) or [None]
+
+    for repeated in repeated_candidates:
+        remaining = []
+        for (code, c) in enumerate(counts):
+            t = tile_pool[code]
+            if t in yaochu:
+                c -= 2 if t == repeated else 1
+            remaining += [t] * c
+        yield KokushiHandPattern(yaochu=yaochu, repeated=repeated, remaining=tuple(remaining))
+
+
+__all__ = ("PatternsOption", "limit_patterns", "iter_patterns",)
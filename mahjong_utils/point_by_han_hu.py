@@ -1,4 +1,13 @@
-from mahjong_utils.lib import libmahjongutils
+from typing import Dict, Tuple, Iterable
+
+from mahjong_utils.lib import libmahjongutils, current_delegate
+
+# (番, 符) -> 点数，结果只取决于番符，可以在进程间共享（见load_point_table）；
+# 通过delegate_calls转交调用时不使用，使查询都到达delegate
+_parent_points: Dict[Tuple[int, int], Tuple[int, int]] = {}
+_child_points: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+
+all_hu = (20, 25, *range(30, 120, 10))
 
 
 def get_parent_point_by_han_hu(han: int, hu: int):
@@ -9,12 +18,18 @@ def get_parent_point_by_han_hu(han: int, hu: int):
     :param hu: 符
     :return: (荣和点数, 自摸各家点数)
     """
-    result = libmahjongutils.call("getParentPointByHanHu", {
-        "han": han,
-        "hu": hu
-    })
+    cached = current_delegate() is None
+    point = _parent_points.get((han, hu)) if cached else None
+    if point is None:
+        result = libmahjongutils.call("getParentPointByHanHu", {
+            "han": han,
+            "hu": hu
+        })
+        point = (result["ron"], result["tsumo"])
+        if cached:
+            point = _parent_points.setdefault((han, hu), point)
 
-    return result["ron"], result["tsumo"]
+    return point
 
 
 def get_child_point_by_han_hu(han: int, hu: int):
@@ -25,12 +40,39 @@ def get_child_point_by_han_hu(han: int, hu: int):
     :param hu: 符
     :return: (荣和点数, 自摸庄家点数, 自摸闲家点数)
     """
-    result = libmahjongutils.call("getChildPointByHanHu", {
-        "han": han,
-        "hu": hu
-    })
+    cached = current_delegate() is None
+    point = _child_points.get((han, hu)) if cached else None
+    if point is None:
+        result = libmahjongutils.call("getChildPointByHanHu", {
+            "han": han,
+            "hu": hu
+        })
+        point = (result["ron"], result["tsumoParent"], result["tsumoChild"])
+        if cached:
+            point = _child_points.setdefault((han, hu), point)
+
+    return point
+
+
+def point_table(max_han: int = 13, hu: Iterable[int] = all_hu) -> dict:
+    """
+    计算1~max_han番、各符数的点数表（调用分析库）
+
+    :return: {"parent": {(番, 符): 点数}, "child": {(番, 符): 点数}}，可传给load_point_table
+    """
+    hu = tuple(hu)
+    return {
+        "parent": {(han, x): get_parent_point_by_han_hu(han, x) for han in range(1, max_han + 1) for x in hu},
+        "child": {(han, x): get_child_point_by_han_hu(han, x) for han in range(1, max_han + 1) for x in hu},
+    }
 
-    return result["ron"], result["tsumoParent"], result["tsumoChild"]
+
+def load_point_table(table: dict) -> None:
+    """
+    载入point_table计算的点数表，之后查询其中的番符不再调用分析库（通过delegate_calls转交调用时除外）
+    """
+    _parent_points.update(table["parent"])
+    _child_points.update(table["child"])
 
 
-__all__ = ("get_parent_point_by_han_hu", "get_child_point_by_han_hu",)
+__all__ = ("get_parent_point_by_han_hu", "get_child_point_by_han_hu", "point_table", "load_point_table",)
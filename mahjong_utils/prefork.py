@@ -0,0 +1,102 @@
+"""
+预先fork的工作进程
+
+分析库（Kotlin/Native运行时）不能在fork后继续使用，但模型层的对照表、解码表、点数表等只读数据不依赖分析库。
+warm_up在父进程中准备好这些数据（点数表由一个临时的spawn子进程计算，父进程不加载分析库），之后fork出的子进程以写时复制的方式
+共享这些内存页，各自在第一次调用时加载分析库。
+
+gunicorn（preload_app）、Celery等自行fork的框架可以在fork前调用warm_up；multiprocessing可以使用worker_pool。
+"""
+import gc
+import multiprocessing
+import multiprocessing.pool
+from typing import Callable, Optional, Sequence
+
+from mahjong_utils.lib import libmahjongutils
+
+_points_loaded = False
+_frozen = False
+
+
+def _point_table() -> dict:
+    from mahjong_utils.point_by_han_hu import point_table
+    return point_table()
+
+
+def warm_up(points: bool = True, chinitsu: bool = True, freeze: bool = False) -> None:
+    """
+    在父进程中准备子进程共享的只读数据，不加载分析库
+
+    :param points: 是否准备点数表（由一个临时的spawn子进程计算）
+    :param chinitsu: 是否打开清一色索引（不存在时生成）
+    :param freeze: 是否在完成后调用gc.freeze()，使当时已有的对象不再被垃圾回收遍历（遍历会写入对象头所在的内存页，破坏写时复制）。
+        gc.freeze()作用于整个进程的所有对象（包括与本库无关的对象，它们的循环引用不再被回收），只在第一次调用时执行
+    """
+    global _points_loaded, _frozen
+
+    # 牌、面子、搭子、副露的对象池与役种表在导入时构造
+    import mahjong_utils.hora  # noqa: F401
+    import mahjong_utils.patterns  # noqa: F401
+    import mahjong_utils.shanten  # noqa: F401
+    import mahjong_utils.tenpai  # noqa: F401
+    from mahjong_utils.codec import _model_registry
+
+    _model_registry()
+
+    if chinitsu:
+        from mahjong_utils.chinitsu import get_chinitsu_index
+        get_chinitsu_index()
+
+    if points and not _points_loaded:
+        from mahjong_utils.point_by_han_hu import load_point_table
+        if libmahjongutils.loaded:
+            load_point_table(_point_table())
+        else:
+            try:
+                with multiprocessing.get_context("spawn").Pool(1) as pool:
+                    load_point_table(pool.apply(_point_table))
+            except (OSError, RuntimeError):
+                # 点数表只是缓存，不能计算时由子进程各自调用分析库
+                pass
+        _points_loaded = True
+
+    if freeze and not _frozen:
+        gc.collect()
+        gc.freeze()
+        _frozen = True
+
+
+def fork_available() -> bool:
+    """
+    能否安全地fork：平台支持fork，且本进程尚未加载分析库
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and not libmahjongutils.loaded
+
+
+def worker_pool(
+        processes: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Sequence = (),
+        warm: bool = True,
+        freeze: bool = False,
+) -> multiprocessing.pool.Pool:
+    """
+    创建工作进程池：能安全地fork时（见fork_available）先在本进程中warm_up再fork，否则使用spawn
+
+    :param processes: 进程数
+    :param initializer: 每个工作进程启动时调用
+    :param initargs: initializer的参数
+    :param warm: fork前是否调用warm_up（不生成清一色索引）
+    :param freeze: warm_up时是否调用gc.freeze()（见warm_up）
+    """
+    if fork_available():
+        if warm:
+            warm_up(chinitsu=False, freeze=freeze)
+        ctx = multiprocessing.get_context("fork")
+    else:
+        # 派生的子进程会重新加载分析库，不复制父进程中的原生运行时状态
+        ctx = multiprocessing.get_context("spawn")
+    return ctx.Pool(processes, initializer, tuple(initargs))
+
+
+__all__ = ("warm_up", "fork_available", "worker_pool",)
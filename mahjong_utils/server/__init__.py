@@ -0,0 +1,239 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any
+
+from mahjong_utils.lib import libmahjongutils
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+priorities = (INTERACTIVE, BULK)
+
+
+class LatencyStats:
+    """
+    记录最近若干次请求的延迟（秒）
+    """
+
+    def __init__(self, window: int = 4096) -> None:
+        self.count = 0
+        self._samples = deque(maxlen=window)
+
+    def add(self, latency: float):
+        self.count += 1
+        self._samples.append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        if len(samples) == 0:
+            return dict(count=self.count, mean=None, p50=None, p90=None, p99=None, max=None)
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return dict(
+            count=self.count,
+            mean=sum(samples) / len(samples),
+            p50=percentile(0.5),
+            p90=percentile(0.9),
+            p99=percentile(0.99),
+            max=samples[-1],
+        )
+
+
+class _Request:
+    __slots__ = ("method", "params", "priority", "future", "enqueue_time")
+
+    def __init__(self, method: str, params: dict, priority: str, future: asyncio.Future) -> None:
+        self.method = method
+        self.params = params
+        self.priority = priority
+        self.future = future
+        self.enqueue_time = time.perf_counter()
+
+
+class AnalysisServer:
+    """
+    本地分析服务器
+
+    协议为逐行的JSON：请求为{"id": ..., "method": ..., "params": {...}, "priority": "interactive"或"bulk"}，
+    method与LibMahjongUtils.call的name相同（另有"stats"用于获取队列深度与延迟统计）；
+    响应为{"id": ..., "code": ..., "data": ...}或{"id": ..., "code": ..., "msg": ...}，code的含义与分析库相同。
+
+    并发到达的请求被合并为小批次，每个批次在线程池中调度一次、在同一个线程中依次调用分析库（分析库只提供逐个调用的入口，
+    合并节省的是调度与唤醒的开销，而不是分析本身）；interactive请求总是先于bulk请求处理，
+    正在处理的bulk批次会在interactive请求到达时让出。
+    """
+
+    def __init__(self, max_batch: int = 32, batch_window: float = 0.001) -> None:
+        """
+        :param max_batch: 每个批次的最大请求数
+        :param batch_window: 收到批次的第一个请求后，继续等待更多请求的秒数
+        """
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+
+        self._queues: Dict[str, deque] = dict((p, deque()) for p in priorities)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._servers: List[asyncio.AbstractServer] = []
+
+        self.latency: Dict[str, LatencyStats] = dict((p, LatencyStats()) for p in priorities)
+        self.batches = 0
+        self.batched_requests = 0
+
+    @property
+    def queue_depth(self) -> Dict[str, int]:
+        return dict((p, len(q)) for (p, q) in self._queues.items())
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            queue_depth=self.queue_depth,
+            batches=self.batches,
+            mean_batch_size=self.batched_requests / self.batches if self.batches > 0 else None,
+            latency=dict((p, s.summary()) for (p, s) in self.latency.items()),
+        )
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None,
+                    unix_path: Optional[str] = None):
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        if unix_path is not None:
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, path=unix_path))
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host, port))
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    async def submit(self, method: str, params: dict, priority: str = INTERACTIVE) -> dict:
+        """
+        提交一个请求并等待其响应
+        """
+        if priority not in self._queues:
+            raise ValueError("invalid priority: " + priority)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(_Request(method, params, priority, future))
+        self._wakeup.set()
+        return await future
+
+    def _take_batch(self) -> List[_Request]:
+        # 只从优先级最高的非空队列中取请求，避免interactive请求等待同批次的bulk请求
+        for p in priorities:
+            q = self._queues[p]
+            if len(q) > 0:
+                return [q.popleft() for _ in range(min(len(q), self.max_batch))]
+        return []
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if all(len(q) == 0 for q in self._queues.values()):
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # 等待一个很短的窗口，让并发到达的请求进入同一批次
+            if self.batch_window > 0 and sum(self.queue_depth.values()) < self.max_batch:
+                await asyncio.sleep(self.batch_window)
+
+            batch = self._take_batch()
+            responses = await loop.run_in_executor(None, self._run_batch, batch)
+
+            self.batches += 1
+            self.batched_requests += len(responses)
+
+            now = time.perf_counter()
+            for (r, response) in zip(batch, responses):
+                self.latency[r.priority].add(now - r.enqueue_time)
+                if not r.future.done():
+                    r.future.set_result(response)
+
+            # bulk批次在有interactive请求到达时被中断，未处理的请求放回队首
+            for r in reversed(batch[len(responses):]):
+                self._queues[r.priority].appendleft(r)
+
+    def _run_batch(self, batch: List[_Request]) -> List[dict]:
+        # 在线程池的一个线程中逐个调用分析库
+        interactive_queue = self._queues[INTERACTIVE]
+        responses = []
+        for r in batch:
+            if r.priority != INTERACTIVE and len(interactive_queue) > 0 and len(responses) > 0:
+                break
+
+            try:
+                responses.append(dict(code=200, data=libmahjongutils.call(r.method, r.params)))
+            except ValueError as e:
+                responses.append(dict(code=400, msg=str(e)))
+            except Exception as e:
+                responses.append(dict(code=500, msg=str(e)))
+        return responses
+
+    async def _handle_request(self, line: bytes, writer: asyncio.StreamWriter, drain_lock: asyncio.Lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            if request["method"] == "stats":
+                response = dict(code=200, data=self.stats())
+            else:
+                response = await self.submit(request["method"], request.get("params", {}),
+                                             request.get("priority", INTERACTIVE))
+        except (ValueError, KeyError, TypeError) as e:
+            response = dict(code=400, msg=str(e))
+
+        response["id"] = request_id
+        writer.write(json.dumps(response).encode() + b"\n")
+        # 客户端读取较慢时等待发送缓冲区排空，避免缓冲区无限增长；同一连接上的等待依次进行
+        try:
+            async with drain_lock:
+                await writer.drain()
+        except ConnectionError:
+            # 连接已断开，读取循环随之结束
+            pass
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        drain_lock = asyncio.Lock()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._handle_request(line, writer, drain_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if len(tasks) > 0:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+
+async def serve(host: Optional[str] = None, port: Optional[int] = None, unix_path: Optional[str] = None,
+                max_batch: int = 32, batch_window: float = 0.001):
+    """
+    启动分析服务器并一直运行
+    """
+    server = AnalysisServer(max_batch, batch_window)
+    await server.start(host, port, unix_path)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+__all__ = ("AnalysisServer", "LatencyStats", "serve", "INTERACTIVE", "BULK",)
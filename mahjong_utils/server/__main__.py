@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from mahjong_utils.server import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m mahjong_utils.server", description="本地分析服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听的地址")
+    parser.add_argument("--port", type=int, default=None, help="监听的TCP端口")
+    parser.add_argument("--unix", default=None, help="监听的Unix套接字路径")
+    parser.add_argument("--max-batch", type=int, default=32, help="每个批次的最大请求数")
+    parser.add_argument("--batch-window", type=float, default=1.0, help="合并批次的等待时间（毫秒）")
+    args = parser.parse_args()
+
+    if args.port is None and args.unix is None:
+        parser.error("either --port or --unix is required")
+
+    try:
+        asyncio.run(
+            serve(args.host if args.port is not None else None, args.port, args.unix,
+                  args.max_batch, args.batch_window / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
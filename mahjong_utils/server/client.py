@@ -0,0 +1,155 @@
+import functools
+import itertools
+import json
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Optional, Mapping, Any, Union, Tuple, Dict, Iterator
+
+from mahjong_utils.hora import build_hora, build_hora_from_shanten_result
+from mahjong_utils.lib import delegate_calls
+from mahjong_utils.point_by_han_hu import get_parent_point_by_han_hu, get_child_point_by_han_hu
+from mahjong_utils.server import INTERACTIVE
+from mahjong_utils.shanten import shanten, regular_shanten, chitoi_shanten, kokushi_shanten, furo_chance_shanten
+
+
+def _delegating(func):
+    @functools.wraps(func)
+    def wrapper(self: "AnalysisClient", *args, **kwargs):
+        with delegate_calls(self):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class AnalysisClient:
+    """
+    本地分析服务器的客户端
+
+    call与LibMahjongUtils.call的签名与语义相同；shanten、build_hora等方法与同名函数相同，但由服务器进行分析。
+    也可以在activate()的上下文内直接调用原有的函数。
+    客户端可以被多个线程共享，并发的请求会在服务器上合并为批次。
+    """
+
+    def __init__(self, address: Union[str, Tuple[str, int]], priority: str = INTERACTIVE,
+                 timeout: Optional[float] = None) -> None:
+        """
+        :param address: 服务器的Unix套接字路径，或(地址, 端口)
+        :param priority: 请求的优先级（"interactive"或"bulk"）
+        :param timeout: 等待响应的超时秒数
+        """
+        if isinstance(address, str):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(address)
+        else:
+            self._sock = socket.create_connection(address)
+
+        self.priority = priority
+        self.timeout = timeout
+
+        self._ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._write_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def _read_responses(self):
+        error: BaseException = ConnectionError("connection closed")
+        try:
+            with self._sock.makefile("rb") as f:
+                for line in f:
+                    response = json.loads(line)
+                    with self._pending_lock:
+                        future = self._pending.pop(response.get("id"), None)
+                    if future is not None:
+                        future.set_result((response, line))
+        except OSError:
+            pass
+        except BaseException as e:
+            error = ConnectionError(f"invalid response: {e}")
+        finally:
+            # 读取线程结束后不再有响应，之后的请求直接失败
+            with self._pending_lock:
+                self._closed = True
+                pending = list(self._pending.values())
+                self._pending.clear()
+            for future in pending:
+                future.set_exception(error)
+
+    def _request(self, method: str, params: dict,
+                 params_dumps_kwargs: Optional[Mapping[str, Any]] = None) -> Tuple[dict, bytes]:
+        request_id = next(self._ids)
+        future = Future()
+        with self._pending_lock:
+            if self._closed:
+                raise ConnectionError("connection closed")
+            self._pending[request_id] = future
+
+        line = json.dumps(dict(id=request_id, method=method, params=params, priority=self.priority),
+                          **(params_dumps_kwargs or {}))
+        try:
+            with self._write_lock:
+                self._sock.sendall(line.encode() + b"\n")
+        except OSError:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise
+
+        return future.result(self.timeout)
+
+    def call(self, name: str, params: dict,
+             params_dumps_kwargs: Optional[Mapping[str, Any]] = None,
+             result_loads_kwargs: Optional[Mapping[str, Any]] = None) -> dict:
+        result, line = self._request(name, params, params_dumps_kwargs)
+        if result_loads_kwargs:
+            result = json.loads(line, **result_loads_kwargs)
+
+        if result['code'] == 200:
+            return result['data']
+        elif result['code'] == 404:
+            raise ValueError(result['msg'])
+        elif result['code'] == 400:
+            raise ValueError(result['msg'])
+        else:
+            raise RuntimeError(result['msg'])
+
+    def stats(self) -> dict:
+        """
+        获取服务器的队列深度与延迟统计
+        """
+        return self.call("stats", {})
+
+    def activate(self) -> Iterator["AnalysisClient"]:
+        """
+        在此上下文内（仅限当前线程），所有分析函数都由服务器进行分析
+        """
+        return delegate_calls(self)
+
+    shanten = _delegating(shanten)
+    regular_shanten = _delegating(regular_shanten)
+    chitoi_shanten = _delegating(chitoi_shanten)
+    kokushi_shanten = _delegating(kokushi_shanten)
+    furo_chance_shanten = _delegating(furo_chance_shanten)
+    build_hora = _delegating(build_hora)
+    build_hora_from_shanten_result = _delegating(build_hora_from_shanten_result)
+    get_parent_point_by_han_hu = _delegating(get_parent_point_by_han_hu)
+    get_child_point_by_han_hu = _delegating(get_child_point_by_han_hu)
+
+    def close(self):
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join()
+
+    def __enter__(self) -> "AnalysisClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+__all__ = ("AnalysisClient",)
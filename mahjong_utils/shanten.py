@@ -1,15 +1,19 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Optional, Sequence, Set, Dict
+from typing import Optional, Sequence, Set, Dict, List
 
 from pydantic import BaseModel
-from stringcase import snakecase, pascalcase
 
+from mahjong_utils.codec import reduce_model
+from mahjong_utils.deadline import resolve_deadline, run_anytime
+from mahjong_utils.hashcons import decode_interned
 from mahjong_utils.lib import libmahjongutils
 from mahjong_utils.models.furo import Furo
 from mahjong_utils.models.hand import Hand
 from mahjong_utils.models.tatsu import Tatsu
-from mahjong_utils.models.tile import Tile
+from mahjong_utils.models.tile import Tile, tile_pool
+from mahjong_utils.models.tile_type import TileType
+from mahjong_utils.patterns import PatternsArg, PatternsOption, limit_patterns
 
 
 class Shanten(BaseModel, ABC):
@@ -21,14 +25,13 @@ class Shanten(BaseModel, ABC):
 
     @classmethod
     def __decode__(cls, data: dict) -> "Shanten":
-        if data['type'] == 'ShantenWithoutGot':
-            return ShantenWithoutGot.__decode__(data)
-        elif data['type'] == 'ShantenWithGot':
-            return ShantenWithGot.__decode__(data)
-        elif data['type'] == 'ShantenWithFuroChance':
-            return ShantenWithFuroChance.__decode__(data)
-        else:
+        decoder = _decoders.get(data['type'], None)
+        if decoder is None:
             raise ValueError("invalid type: " + data['type'])
+        return decoder(data)
+
+    def __reduce__(self):
+        return reduce_model(self)
 
 
 class ShantenWithoutGot(Shanten):
@@ -50,6 +53,10 @@ class ShantenWithoutGot(Shanten):
 
     @classmethod
     def __decode__(cls, data: dict) -> "ShantenWithoutGot":
+        return decode_interned("ShantenWithoutGot", data, cls._decode)
+
+    @classmethod
+    def _decode(cls, data: dict) -> "ShantenWithoutGot":
         return ShantenWithoutGot(
             shanten=data["shantenNum"],
             advance=set(Tile.__decode__(x) for x in data["advance"]),
@@ -76,6 +83,10 @@ class ShantenWithGot(Shanten):
 
     @classmethod
     def __decode__(cls, data: dict) -> "ShantenWithGot":
+        return decode_interned("ShantenWithGot", data, cls._decode)
+
+    @classmethod
+    def _decode(cls, data: dict) -> "ShantenWithGot":
         return ShantenWithGot(
             shanten=data["shantenNum"],
             discard_to_advance=dict(
@@ -120,6 +131,13 @@ class ShantenWithFuroChance(Shanten):
         )
 
 
+_decoders = {
+    "ShantenWithoutGot": ShantenWithoutGot.__decode__,
+    "ShantenWithGot": ShantenWithGot.__decode__,
+    "ShantenWithFuroChance": ShantenWithFuroChance.__decode__,
+}
+
+
 class ShantenResultType(str, Enum):
     regular = "Regular"
     chitoi = "Chitoi"
@@ -135,10 +153,12 @@ class ShantenResult(BaseModel):
     regular: Optional["ShantenResult"]
     chitoi: Optional["ShantenResult"]
     kokushi: Optional["ShantenResult"]
+    # 是否为到达时间预算时未完成的结果（只有向听数与最优打法，不含进张数）
+    partial: bool = False
 
     def __encode__(self) -> dict:
         return dict(
-            type=pascalcase(self.type.name),
+            type=self.type.value,
             hand=self.hand.__encode__(),
             shantenInfo=self.shanten_info.__encode__(),
             regular=self.regular.__encode__() if self.regular is not None else None,
@@ -149,7 +169,7 @@ class ShantenResult(BaseModel):
     @classmethod
     def __decode__(cls, data: dict) -> "ShantenResult":
         return ShantenResult(
-            type=ShantenResultType[snakecase(data["type"])],
+            type=ShantenResultType(data["type"]),
             hand=Hand.__decode__(data["hand"]),
             shanten_info=Shanten.__decode__(data["shantenInfo"]),
             regular=ShantenResult.__decode__(data["regular"]) if data["regular"] is not None else None,
@@ -157,6 +177,9 @@ class ShantenResult(BaseModel):
             kokushi=ShantenResult.__decode__(data["kokushi"]) if data["kokushi"] is not None else None,
         )
 
+    def __reduce__(self):
+        return reduce_model(self)
+
     @property
     def shanten(self) -> Optional[int]:
         return getattr(self.shanten_info, "shanten", None)
@@ -190,12 +213,49 @@ class ShantenResult(BaseModel):
         return self.discard_to_advance is not None
 
 
+def _decode_result(data: dict, patterns: PatternsArg) -> ShantenResult:
+    return ShantenResult.__decode__(limit_patterns(data, patterns))
+
+
+def _shanten_params(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]],
+                    calc_advance_num: bool, best_shanten_only: bool, allow_ankan: bool) -> dict:
+    return {
+        "tiles": [str(t) for t in tiles],
+        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
+        "calcAdvanceNum": calc_advance_num,
+        "bestShantenOnly": best_shanten_only,
+        "allowAnkan": allow_ankan,
+    }
+
+
+def _call_shanten(name: str, params: dict, deadline: Optional[float], time_budget: Optional[float],
+                  patterns: PatternsArg = PatternsOption.full) -> ShantenResult:
+    deadline = resolve_deadline(deadline, time_budget)
+    if deadline is None:
+        return _decode_result(libmahjongutils.call(name, params), patterns)
+
+    # 先只计算向听数与最优打法，再计算完整的结果
+    stages = [lambda: libmahjongutils.call(name, params)]
+    if params["calcAdvanceNum"] or not params["bestShantenOnly"]:
+        quick_params = dict(params, calcAdvanceNum=False, bestShantenOnly=True)
+        stages.insert(0, lambda: libmahjongutils.call(name, quick_params))
+
+    # 截止时间前没有完成任何阶段时，等待最快的阶段完成后返回其结果
+    results, complete = run_anytime(name, stages, deadline, min_stages=1)
+    result = _decode_result(results[-1], patterns)
+    result.partial = not complete
+    return result
+
+
 def regular_shanten(
         tiles: Sequence[Tile],
         furo: Optional[Sequence[Furo]] = None,
         calc_advance_num: bool = True,
         best_shanten_only: bool = False,
         allow_ankan: bool = True,
+        *, deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        patterns: PatternsArg = PatternsOption.full,
 ) -> ShantenResult:
     """
     标准形向听分析
@@ -205,23 +265,20 @@ def regular_shanten(
     :param calc_advance_num: 是否计算进张数
     :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
     :param allow_ankan: 是否允许暗杠
+    :param deadline: 截止时间（time.monotonic()的时刻）
+    :param time_budget: 时间预算（秒），超出时返回只有向听数与最优打法的结果（partial为True，可能略超出预算）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
     :return 向听分析结果
     """
-    result = libmahjongutils.call("regularShanten", {
-        "tiles": [str(t) for t in tiles],
-        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
-        "calcAdvanceNum": calc_advance_num,
-        "bestShantenOnly": best_shanten_only,
-        "allowAnkan": allow_ankan,
-    })
-
-    return ShantenResult.__decode__(result)
+    return _call_shanten("regularShanten", _shanten_params(tiles, furo, calc_advance_num, best_shanten_only, allow_ankan),
+                         deadline, time_budget, patterns)
 
 
 def chitoi_shanten(
         tiles: Sequence[Tile],
         calc_advance_num: bool = True,
         best_shanten_only: bool = False,
+        *, patterns: PatternsArg = PatternsOption.full,
 ) -> ShantenResult:
     """
     七对子向听分析
@@ -229,6 +286,7 @@ def chitoi_shanten(
     :param tiles: 门前的牌
     :param calc_advance_num: 是否计算进张数
     :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
     :return 向听分析结果
     """
     result = libmahjongutils.call("chitoiShanten", {
@@ -237,13 +295,14 @@ def chitoi_shanten(
         "bestShantenOnly": best_shanten_only,
     })
 
-    return ShantenResult.__decode__(result)
+    return _decode_result(result, patterns)
 
 
 def kokushi_shanten(
         tiles: Sequence[Tile],
         calc_advance_num: bool = True,
         best_shanten_only: bool = False,
+        *, patterns: PatternsArg = PatternsOption.full,
 ) -> ShantenResult:
     """
     国士无双向听分析
@@ -251,6 +310,7 @@ def kokushi_shanten(
     :param tiles: 门前的牌
     :param calc_advance_num: 是否计算进张数
     :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
     :return 向听分析结果
     """
     result = libmahjongutils.call("kokushiShanten", {
@@ -259,7 +319,7 @@ def kokushi_shanten(
         "bestShantenOnly": best_shanten_only,
     })
 
-    return ShantenResult.__decode__(result)
+    return _decode_result(result, patterns)
 
 
 def shanten(
@@ -268,6 +328,9 @@ def shanten(
         calc_advance_num: bool = True,
         best_shanten_only: bool = False,
         allow_ankan: bool = True,
+        *, deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        patterns: PatternsArg = PatternsOption.full,
 ) -> ShantenResult:
     """
     向听分析
@@ -277,17 +340,13 @@ def shanten(
     :param calc_advance_num: 是否计算进张数
     :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
     :param allow_ankan: 是否允许暗杠
+    :param deadline: 截止时间（time.monotonic()的时刻）
+    :param time_budget: 时间预算（秒），超出时返回只有向听数与最优打法的结果（partial为True，可能略超出预算）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
     :return 向听分析结果
     """
-    result = libmahjongutils.call("shanten", {
-        "tiles": [str(t) for t in tiles],
-        "furo": [fr.__encode__() for fr in furo] if furo is not None else [],
-        "calcAdvanceNum": calc_advance_num,
-        "bestShantenOnly": best_shanten_only,
-        "allowAnkan": allow_ankan,
-    })
-
-    return ShantenResult.__decode__(result)
+    return _call_shanten("shanten", _shanten_params(tiles, furo, calc_advance_num, best_shanten_only, allow_ankan),
+                         deadline, time_budget, patterns)
 
 
 def furo_chance_shanten(
@@ -296,6 +355,9 @@ def furo_chance_shanten(
         allow_chi: bool = True,
         calc_advance_num: bool = True,
         best_shanten_only: bool = False,
+        *, deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        patterns: PatternsArg = PatternsOption.full,
 ):
     """
     副露判断分析
@@ -305,22 +367,75 @@ def furo_chance_shanten(
     :param allow_chi: 是否允许吃
     :param calc_advance_num: 是否计算进张数
     :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param deadline: 截止时间（time.monotonic()的时刻）
+    :param time_budget: 时间预算（秒），超出时返回只有向听数与最优打法的结果（partial为True，可能略超出预算）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
     :return 向听分析结果
     """
-    result = libmahjongutils.call("furoChanceShanten", {
+    return _call_shanten("furoChanceShanten", {
         "tiles": [str(t) for t in tiles],
         "chanceTile": chance_tile.__encode__(),
         "allowChi": allow_chi,
         "calcAdvanceNum": calc_advance_num,
         "bestShantenOnly": best_shanten_only,
-    })
+    }, deadline, time_budget, patterns)
+
 
-    return ShantenResult.__decode__(result)
+def _furo_chance_tiles(tiles: Sequence[Tile], allow_chi: bool) -> List[Tile]:
+    """
+    能够吃、碰或杠的牌（含赤宝牌）
+    """
+    # 以不区分赤宝牌的code计数
+    counts = [0] * len(tile_pool)
+    for t in tiles:
+        counts[t.code - t.num + t.real_num] += 1
+
+    ans = []
+    for t in tile_pool:
+        if t is None:
+            continue
+
+        code = t.code - t.num + t.real_num
+        if counts[code] >= 2:
+            ans.append(t)
+        elif allow_chi and t.tile_type != TileType.Z:
+            n = t.real_num
+            if (n >= 3 and counts[code - 2] and counts[code - 1]) \
+                    or (2 <= n <= 8 and counts[code - 1] and counts[code + 1]) \
+                    or (n <= 7 and counts[code + 1] and counts[code + 2]):
+                ans.append(t)
+    return ans
+
+
+def furo_chance_table(
+        tiles: Sequence[Tile],
+        allow_chi: bool = True,
+        calc_advance_num: bool = True,
+        best_shanten_only: bool = False,
+        *, patterns: PatternsArg = PatternsOption.full,
+) -> Dict[Tile, ShantenResult]:
+    """
+    对每一张可能打出的牌进行副露判断分析
+
+    只对能够吃、碰或杠的牌进行分析，不在结果中的牌只能选择不副露（与门前的牌的向听分析相同）。
+
+    :param tiles: 门前的牌
+    :param allow_chi: 是否允许吃（对家与下家打出的牌不能吃，可分别建表）
+    :param calc_advance_num: 是否计算进张数
+    :param best_shanten_only: 仅计算最优向听数的打法（不计算退向打法）
+    :param patterns: 结果中保留的手牌分解（PatternsOption，或个数上限）
+    :return 副露机会牌 -> 副露判断分析结果
+    """
+    return dict((t, furo_chance_shanten(tiles, t, allow_chi, calc_advance_num, best_shanten_only,
+                                        patterns=patterns))
+                for t in _furo_chance_tiles(tiles, allow_chi))
 
 
-__all__ = ("regular_shanten",
+__all__ = ("PatternsOption",
+           "regular_shanten",
            "chitoi_shanten",
            "kokushi_shanten",
            "furo_chance_shanten",
+           "furo_chance_table",
            "shanten",
            "ShantenResult",)
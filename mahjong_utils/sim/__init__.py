@@ -0,0 +1,16 @@
+"""
+四人麻将的自对局模拟
+
+- state：以bytearray存储的局面（牌山、手牌、牌河等）
+- policy：可替换的打牌策略
+- engine：进行一局、一场
+- runner：在多个进程中并行进行多场
+"""
+from .engine import HandResult, TableResult, play_hand, play_table
+from .policy import Policy, CallingPolicy
+from .runner import iter_tables, run_tables
+from .state import TableState, make_wall
+
+__all__ = ("HandResult", "TableResult", "play_hand", "play_table", "Policy", "CallingPolicy", "iter_tables",
+           "run_tables",
+           "TableState", "make_wall",)
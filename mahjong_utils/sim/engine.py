@@ -0,0 +1,266 @@
+import random
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from mahjong_utils.hora import build_hora, Hora
+from mahjong_utils.models.tile import tile_pool
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.shanten import shanten, PatternsOption
+from mahjong_utils.sim.policy import Policy
+from mahjong_utils.sim.state import TableState, make_wall, normal_code
+from mahjong_utils.yaku.extra import richi, ippatsu, haitei, houtei
+
+
+class HandResult(NamedTuple):
+    """
+    一局的结果
+
+    kind为"tsumo"、"ron"或"draw"（流局）；流局时winner为-1，自摸与流局时loser为-1。
+    deltas为各家的点数变化（含立直棒与本场）。
+    """
+
+    kind: str
+    winner: int
+    loser: int
+    han: int
+    hu: int
+    deltas: Tuple[int, int, int, int]
+    draws: int
+
+
+class TableResult(NamedTuple):
+    """
+    一场的结果
+    """
+
+    seed: int
+    scores: Tuple[int, int, int, int]
+    hands: List[HandResult]
+
+
+def _waits(state: TableState, seat: int) -> int:
+    result = shanten(state.tiles(seat), state.furo[seat], calc_advance_num=False, best_shanten_only=True,
+                     patterns=PatternsOption.none)
+    if result.shanten != 0:
+        return 0
+
+    mask = 0
+    for t in result.advance:
+        mask |= 1 << t.code
+    return mask
+
+
+def _hora(state: TableState, seat: int, code: int, tsumo: bool) -> Optional[Hora]:
+    tiles = state.tiles(seat) if tsumo else state.tiles(seat, code)
+    extra_yaku = set()
+    if state.riichi[seat]:
+        extra_yaku.add(richi)
+        if state.ippatsu[seat]:
+            extra_yaku.add(ippatsu)
+    if state.remaining == 0:
+        extra_yaku.add(haitei if tsumo else houtei)
+
+    try:
+        hora = build_hora(tiles, state.furo[seat], tile_pool[code], tsumo,
+                          dora=state.dora(seat, tiles, ura=state.riichi[seat] != 0),
+                          self_wind=Wind(state.seat_wind(seat)), round_wind=Wind(state.round_wind),
+                          extra_yaku=extra_yaku)
+    except ValueError:
+        return None
+
+    # 没有役（宝牌不算役）时不能和牌
+    if len(hora.yaku) == 0:
+        return None
+    return hora
+
+
+def _win(state: TableState, hora: Hora, winner: int, loser: int) -> HandResult:
+    deltas = [0] * 4
+    dealer = winner == state.dealer
+
+    if loser < 0:
+        if dealer:
+            each = hora.parent_point[1]
+            for seat in range(4):
+                if seat != winner:
+                    deltas[seat] -= each + 100 * state.honba
+        else:
+            _, from_dealer, from_child = hora.child_point
+            for seat in range(4):
+                if seat != winner:
+                    deltas[seat] -= (from_dealer if seat == state.dealer else from_child) + 100 * state.honba
+        deltas[winner] -= sum(deltas)
+    else:
+        point = hora.parent_point[0] if dealer else hora.child_point[0]
+        deltas[loser] -= point + 300 * state.honba
+        deltas[winner] += point + 300 * state.honba
+
+    deltas[winner] += 1000 * state.kyotaku
+    return HandResult("tsumo" if loser < 0 else "ron", winner, loser, hora.han, hora.hu, tuple(deltas), state.draws)
+
+
+def _exhaustive_draw(state: TableState) -> HandResult:
+    tenpai = [seat for seat in range(4) if state.waits[seat] != 0]
+    deltas = [0] * 4
+    if 0 < len(tenpai) < 4:
+        for seat in range(4):
+            if seat in tenpai:
+                deltas[seat] += 3000 // len(tenpai)
+            else:
+                deltas[seat] -= 3000 // (4 - len(tenpai))
+    return HandResult("draw", -1, -1, 0, 0, tuple(deltas), state.draws)
+
+
+def _discard(state: TableState, seat: int, code: int, policies: Sequence[Policy],
+             allow_calls: bool) -> Tuple[Optional[HandResult], Optional[int]]:
+    """
+    第seat家打出code，返回(和牌时的结果, 副露的一家)
+    """
+    state.hands[seat][code] -= 1
+    state.rivers[seat].append(code)
+    state.ippatsu[seat] = 0
+    if not state.riichi[seat]:
+        state.missed[seat] = 0
+
+    n = normal_code(code)
+    for i in range(1, 4):
+        other = (seat + i) % 4
+        if state.waits[other] >> n & 1 and not state.furiten(other):
+            hora = _hora(state, other, code, False)
+            if hora is not None:
+                if policies[other].win(state, other, code, False):
+                    return _win(state, hora, other, seat), None
+                state.missed[other] = 1
+
+    if not allow_calls or state.remaining == 0:
+        return None, None
+
+    for i in range(1, 4):
+        other = (seat + i) % 4
+        if state.riichi[other]:
+            continue
+        options = state.call_options(other, code, allow_chi=i == 1)
+        if len(options) == 0:
+            continue
+        fr = policies[other].call(state, other, code, options)
+        if fr is not None:
+            codes = state.codes_for_call(other, code, fr)
+            for c in codes:
+                state.hands[other][c] -= 1
+            state.furo[other].append(fr)
+            state.furo_red[other] += sum(1 for c in (code, *codes) if normal_code(c) != c)
+            # 被副露的牌从牌河中移除，副露打断所有人的一发
+            state.rivers[seat].pop()
+            for j in range(4):
+                state.ippatsu[j] = 0
+            return None, other
+
+    return None, None
+
+
+def play_hand(state: TableState, policies: Sequence[Policy], allow_calls: bool = True) -> HandResult:
+    """
+    进行一局，直到和牌或流局（不含杠与途中流局）
+    """
+    # 配牌即听牌时，第一次摸牌就可以和牌
+    for i in range(4):
+        state.waits[i] = _waits(state, i)
+
+    seat = state.turn
+    drawn: Optional[int] = None
+    need_draw = True
+
+    while True:
+        if need_draw:
+            if state.remaining == 0:
+                return _exhaustive_draw(state)
+            drawn = state.draw(seat)
+
+            if state.waits[seat] >> normal_code(drawn) & 1:
+                hora = _hora(state, seat, drawn, True)
+                if hora is not None and policies[seat].win(state, seat, drawn, True):
+                    return _win(state, hora, seat, -1)
+        else:
+            drawn = None
+
+        declare = False
+        if state.riichi[seat] and drawn is not None:
+            # 立直后摸切
+            code = drawn
+        else:
+            analysis = shanten(state.tiles(seat), state.furo[seat], calc_advance_num=True, best_shanten_only=True,
+                               patterns=PatternsOption.none)
+            code = policies[seat].discard(state, seat, analysis)
+            if state.hands[seat][code] == 0:
+                raise ValueError(f"seat {seat} cannot discard {tile_pool[code]}")
+
+            state.hands[seat][code] -= 1
+            state.waits[seat] = _waits(state, seat)
+            state.hands[seat][code] += 1
+
+            declare = state.waits[seat] != 0 and not state.riichi[seat] and state.menzen(seat) \
+                and state.scores[seat] >= 1000 and state.remaining >= 4 and policies[seat].riichi(state, seat)
+
+        result, caller = _discard(state, seat, code, policies, allow_calls)
+        if result is not None:
+            # 宣言牌被荣和时立直不成立
+            return result
+
+        if declare:
+            state.riichi[seat] = 1
+            state.ippatsu[seat] = 1 if caller is None else 0
+            state.scores[seat] -= 1000
+            state.kyotaku += 1
+
+        if caller is not None:
+            seat, need_draw = caller, False
+        else:
+            seat, need_draw = (seat + 1) % 4, True
+
+
+def play_table(seed: int, policies: Sequence[Policy], *, rounds: int = 1, start_score: int = 25000,
+               red: bool = True, allow_calls: bool = True, max_hands: int = 64) -> TableResult:
+    """
+    进行一场（rounds为1时为东风战，为2时为半庄战），有人被飞或打完最后一局时结束
+
+    :param seed: 随机种子（决定每一局的牌山）
+    :param policies: 四家的打牌策略
+    :param rounds: 场数
+    :param start_score: 起始点数
+    :param red: 是否使用赤宝牌
+    :param allow_calls: 是否允许副露
+    :param max_hands: 局数上限
+    """
+    rng = random.Random(seed)
+    scores = array("i", [start_score] * 4)
+    hands: List[HandResult] = []
+
+    round_wind, dealer, honba, kyotaku = 0, 0, 0, 0
+    while round_wind < rounds and len(hands) < max_hands:
+        state = TableState(make_wall(rng, red), dealer, round_wind, honba, kyotaku, scores)
+        result = play_hand(state, policies, allow_calls)
+        hands.append(result)
+
+        for seat in range(4):
+            scores[seat] += result.deltas[seat]
+
+        if result.kind == "draw":
+            kyotaku = state.kyotaku
+            renchan = state.waits[dealer] != 0
+            honba += 1
+        else:
+            kyotaku = 0
+            renchan = result.winner == dealer
+            honba = honba + 1 if renchan else 0
+
+        if min(scores) < 0:
+            break
+        if not renchan:
+            dealer = (dealer + 1) % 4
+            if dealer == 0:
+                round_wind += 1
+
+    return TableResult(seed, tuple(scores), hands)
+
+
+__all__ = ("HandResult", "TableResult", "play_hand", "play_table",)
@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import tile_pool
+from mahjong_utils.shanten import shanten, ShantenResult, PatternsOption
+from mahjong_utils.sim.state import TableState
+
+
+class Policy:
+    """
+    打牌策略，各方法在轮到第seat家决策时被调用
+
+    默认实现：按向听数最小、进张数最大打牌，听牌即立直，能和即和，不副露。
+    """
+
+    def discard(self, state: TableState, seat: int, analysis: ShantenResult) -> int:
+        """
+        选择打出的牌
+
+        :param state: 局面
+        :param seat: 决策的一家
+        :param analysis: 当前手牌（已摸牌状态）的向听分析结果（只含最优向听数的打法）
+        :return: 打出的牌的code
+        """
+        discard_to_advance = analysis.discard_to_advance
+        best = min(discard_to_advance,
+                   key=lambda t: (discard_to_advance[t].shanten, -(discard_to_advance[t].advance_num or 0), -t.code))
+        return best.code
+
+    def riichi(self, state: TableState, seat: int) -> bool:
+        """
+        打牌后听牌时，是否立直
+        """
+        return True
+
+    def call(self, state: TableState, seat: int, code: int, options: List[Furo]) -> Optional[Furo]:
+        """
+        其他家打出code时，选择副露（options中的一种）或不副露（None）
+        """
+        return None
+
+    def win(self, state: TableState, seat: int, code: int, tsumo: bool) -> bool:
+        """
+        能够和牌时，是否和牌
+        """
+        return True
+
+
+class CallingPolicy(Policy):
+    """
+    在Policy的基础上，副露后向听数减少时副露
+    """
+
+    def call(self, state: TableState, seat: int, code: int, options: List[Furo]) -> Optional[Furo]:
+        if state.riichi[seat]:
+            return None
+
+        hand = state.tiles(seat)
+        current = shanten(hand, state.furo[seat], calc_advance_num=False, best_shanten_only=True,
+                          patterns=PatternsOption.none).shanten
+        for fr in options:
+            tiles = list(hand)
+            for c in state.codes_for_call(seat, code, fr):
+                tiles.remove(tile_pool[c])
+            result = shanten(tiles, [*state.furo[seat], fr], calc_advance_num=False, best_shanten_only=True,
+                             patterns=PatternsOption.none)
+            if result.shanten < current:
+                return fr
+        return None
+
+
+__all__ = ("Policy", "CallingPolicy",)
@@ -0,0 +1,68 @@
+from typing import Callable, Iterator, List, Sequence
+
+from mahjong_utils.prefork import worker_pool
+from mahjong_utils.sim.engine import TableResult, play_table
+from mahjong_utils.sim.policy import Policy
+
+
+def _play_chunk(seeds: Sequence[int], policy_factory: Callable[[], Policy], options: dict) -> List[TableResult]:
+    return [play_table(seed, [policy_factory() for _ in range(4)], **options) for seed in seeds]
+
+
+def iter_tables(
+        n: int,
+        policy_factory: Callable[[], Policy] = Policy,
+        *, seed: int = 0,
+        workers: int = 1,
+        chunk_size: int = 4,
+        **options,
+) -> Iterator[TableResult]:
+    """
+    并行进行n场，按完成的顺序逐块产出结果
+
+    :param n: 场数
+    :param policy_factory: 生成打牌策略的函数（每场每家调用一次；workers大于1时必须可以被pickle）
+    :param seed: 第i场的随机种子为seed + i
+    :param workers: 工作进程数（为1时在当前进程内进行）
+    :param chunk_size: 每次分派给工作进程的场数
+    :param options: 传给play_table的其他参数
+    """
+    chunks = [range(i, min(i + chunk_size, seed + n)) for i in range(seed, seed + n, chunk_size)]
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _play_chunk(chunk, policy_factory, options)
+        return
+
+    # 子进程各自加载分析库，不复制父进程中的原生运行时状态（见prefork.worker_pool）
+    with worker_pool(workers) as pool:
+        for results in pool.imap_unordered(_ChunkRunner(policy_factory, options), chunks):
+            yield from results
+
+
+class _ChunkRunner:
+    def __init__(self, policy_factory: Callable[[], Policy], options: dict) -> None:
+        self.policy_factory = policy_factory
+        self.options = options
+
+    def __call__(self, seeds: Sequence[int]) -> List[TableResult]:
+        return _play_chunk(seeds, self.policy_factory, self.options)
+
+
+def run_tables(
+        n: int,
+        policy_factory: Callable[[], Policy] = Policy,
+        *, seed: int = 0,
+        workers: int = 1,
+        chunk_size: int = 4,
+        **options,
+) -> List[TableResult]:
+    """
+    并行进行n场，返回按随机种子排序的结果（参数同iter_tables）
+    """
+    results = list(iter_tables(n, policy_factory, seed=seed, workers=workers, chunk_size=chunk_size, **options))
+    results.sort(key=lambda x: x.seed)
+    return results
+
+
+__all__ = ("iter_tables", "run_tables",)
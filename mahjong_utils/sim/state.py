@@ -0,0 +1,195 @@
+"""
+一局的状态
+
+牌以Tile.code表示（赤宝牌的code为0、10、20），手牌以各code的张数（长度为38的bytearray）表示。
+"""
+import random
+from array import array
+from typing import List, Optional
+
+from mahjong_utils.models.furo import Furo, Chi, Pon
+from mahjong_utils.models.tile import Tile, tile_pool
+
+# 王牌的张数，牌山的前14张为王牌（第4张为宝牌指示牌，第5张为里宝牌指示牌）
+DEAD_WALL_SIZE = 14
+
+_dora_indicator_pos = 4
+_ura_dora_indicator_pos = 5
+
+
+def normal_code(code: int) -> int:
+    """
+    赤宝牌的code转换为对应的普通5的code，其余不变
+    """
+    return code + 5 if code < 30 and code % 10 == 0 else code
+
+
+def dora_code(indicator: int) -> int:
+    """
+    宝牌指示牌所指示的宝牌
+    """
+    indicator = normal_code(indicator)
+    if indicator < 30:
+        return indicator - indicator % 10 + indicator % 10 % 9 + 1
+    elif indicator <= 34:
+        return 31 + (indicator - 30) % 4
+    else:
+        return 35 + (indicator - 34) % 3
+
+
+def make_wall(rng: random.Random, red: bool = True) -> bytearray:
+    """
+    生成洗好的136张牌山
+
+    :param rng: 随机数生成器
+    :param red: 是否使用赤宝牌（每种数牌各一张赤5）
+    """
+    wall = bytearray()
+    for base in (0, 10, 20):
+        for n in range(1, 10):
+            wall += bytes((base + n,)) * 4
+        if red:
+            wall[wall.index(base + 5)] = base
+    for n in range(31, 38):
+        wall += bytes((n,)) * 4
+    rng.shuffle(wall)
+    return wall
+
+
+class TableState:
+    """
+    一局的状态
+
+    hands[i]为第i家门前的牌（各code的张数），rivers[i]为第i家的牌河（按打出顺序的code），
+    waits[i]为第i家听牌时的待牌（第code位为1表示待该牌，不区分赤宝牌），不听牌时为0。
+    副露以不含赤宝牌的Furo表示，furo_red[i]为第i家副露中的赤宝牌数。
+    """
+
+    __slots__ = ("wall", "dealer", "round_wind", "honba", "kyotaku", "scores",
+                 "hands", "rivers", "furo", "furo_red", "riichi", "ippatsu", "waits", "missed", "turn", "draws")
+
+    def __init__(self, wall: bytearray, dealer: int, round_wind: int, honba: int, kyotaku: int,
+                 scores: array) -> None:
+        self.wall = wall
+        self.dealer = dealer
+        self.round_wind = round_wind
+        self.honba = honba
+        self.kyotaku = kyotaku
+        self.scores = scores
+
+        self.hands: List[bytearray] = [bytearray(38) for _ in range(4)]
+        self.rivers: List[bytearray] = [bytearray() for _ in range(4)]
+        self.furo: List[List[Furo]] = [[] for _ in range(4)]
+        self.furo_red = bytearray(4)
+        self.riichi = bytearray(4)
+        self.ippatsu = bytearray(4)
+        self.waits = [0] * 4
+        # 同巡内或立直后见逃的荣和（振听）
+        self.missed = bytearray(4)
+        self.turn = dealer
+        self.draws = 0
+
+        for _ in range(13):
+            for seat in range(4):
+                self.hands[(dealer + seat) % 4][self.wall.pop()] += 1
+
+    @property
+    def remaining(self) -> int:
+        """
+        剩余可摸的牌数
+        """
+        return len(self.wall) - DEAD_WALL_SIZE
+
+    def draw(self, seat: int) -> int:
+        code = self.wall.pop()
+        self.hands[seat][code] += 1
+        self.draws += 1
+        return code
+
+    def seat_wind(self, seat: int) -> int:
+        return (seat - self.dealer) % 4
+
+    def tiles(self, seat: int, extra: Optional[int] = None) -> List[Tile]:
+        """
+        第seat家门前的牌（extra不为None时追加该牌）
+        """
+        hand = self.hands[seat]
+        ans = [tile_pool[code] for code in range(38) for _ in range(hand[code])]
+        if extra is not None:
+            ans.append(tile_pool[extra])
+        return ans
+
+    def menzen(self, seat: int) -> bool:
+        return len(self.furo[seat]) == 0
+
+    def codes_for_call(self, seat: int, code: int, fr: Furo) -> List[int]:
+        """
+        第seat家以打出的code副露fr时，从门前取出的牌（优先取出非赤宝牌）
+        """
+        needed = [normal_code(t.code) for t in fr.tiles]
+        needed.remove(normal_code(code))
+
+        hand = self.hands[seat]
+        used = bytearray(38)
+        ans = []
+        for c in needed:
+            red = c - 5 if c < 30 and c % 10 == 5 else None
+            if hand[c] - used[c] > 0:
+                used[c] += 1
+                ans.append(c)
+            elif red is not None and hand[red] - used[red] > 0:
+                used[red] += 1
+                ans.append(red)
+            else:
+                raise ValueError(f"cannot call {fr} with {tile_pool[code]}")
+        return ans
+
+    def call_options(self, seat: int, code: int, allow_chi: bool) -> List[Furo]:
+        """
+        第seat家能够对打出的code进行的副露（不含杠）
+        """
+        hand = self.hands[seat]
+        n = normal_code(code)
+
+        def count(c: int) -> int:
+            return hand[c] + (hand[c - 5] if c < 30 and c % 10 == 5 else 0)
+
+        ans: List[Furo] = []
+        if count(n) >= 2:
+            ans.append(Pon(tile_pool[n]))
+        if allow_chi and n < 30:
+            num = n % 10
+            for first in range(max(num - 2, 1), min(num, 7) + 1):
+                base = n - num + first
+                if all(count(base + i) > 0 for i in range(3) if base + i != n):
+                    ans.append(Chi(tile_pool[base]))
+        return ans
+
+    def furiten(self, seat: int) -> bool:
+        if self.missed[seat]:
+            return True
+        waits = self.waits[seat]
+        return any(waits >> normal_code(code) & 1 for code in self.rivers[seat])
+
+    def dora(self, seat: int, tiles: List[Tile], ura: bool = False) -> int:
+        """
+        宝牌数（含赤宝牌；ura为True时含里宝牌）
+        """
+        indicators = [self.wall[_dora_indicator_pos]]
+        if ura:
+            indicators.append(self.wall[_ura_dora_indicator_pos])
+        doras = [dora_code(x) for x in indicators]
+
+        ans = self.furo_red[seat]
+        for t in tiles:
+            code = t.code
+            if code < 30 and code % 10 == 0:
+                ans += 1
+            ans += doras.count(normal_code(code))
+        for fr in self.furo[seat]:
+            for t in fr.tiles:
+                ans += doras.count(normal_code(t.code))
+        return ans
+
+
+__all__ = ("DEAD_WALL_SIZE", "TableState", "make_wall", "normal_code", "dora_code",)
@@ -0,0 +1,269 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Sequence, Set, Iterable, Mapping, Any, Tuple, Union, List
+
+from mahjong_utils import codec, __version__
+from mahjong_utils.canonical import canonicalize_hand
+from mahjong_utils.hora import Hora, _hora_params
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import Tile
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.shanten import ShantenResult, _shanten_params
+from mahjong_utils.yaku import Yaku
+
+_schema = """
+CREATE TABLE IF NOT EXISTS shanten (key BLOB PRIMARY KEY, version TEXT NOT NULL, data BLOB NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hora (key BLOB PRIMARY KEY, version TEXT NOT NULL, data BLOB NOT NULL) WITHOUT ROWID;
+"""
+
+_tables = ("shanten", "hora")
+
+
+def _hora_key_params(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]], agari: Tile, tsumo: bool,
+                     dora: int, self_wind: Optional[Wind], round_wind: Optional[Wind],
+                     extra_yaku: Optional[Set[Yaku]]) -> dict:
+    params = _hora_params(tiles, furo, agari, tsumo, dora, self_wind, round_wind, extra_yaku)
+    # 额外役排序后作为键的一部分，与传入的顺序无关
+    params["extraYaku"].sort()
+    return params
+
+
+class ResultStore:
+    """
+    持久化的分析结果存储（SQLite）
+
+    向听分析结果以规范化后的手牌（见canonical模块）、副露与参数为键，等价的手牌共享同一条记录；
+    和牌分析结果以完整的参数为键。结果以codec模块的二进制格式保存。
+
+    每条记录都标记了写入时的库版本，版本不同的记录视为不存在，可通过compact清除。
+    数据库使用WAL模式，多个进程可以同时读写同一个文件；每个线程（以及fork出的子进程）使用各自的连接。
+    """
+
+    def __init__(self, path: Union[str, Path], *, version: str = __version__, timeout: float = 30.0) -> None:
+        """
+        :param path: 数据库文件路径
+        :param version: 记录的版本标记（默认为库版本）
+        :param timeout: 等待其他进程释放写锁的秒数
+        """
+        self.path = str(path)
+        self.version = f"{version}/{codec.FORMAT_VERSION}"
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._connections: List[sqlite3.Connection] = []
+        # 保护连接列表与命中统计
+        self._lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_schema)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # 不能继续使用父进程的连接
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._connections = []
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _get(self, table: str, key: bytes) -> Optional[Any]:
+        row = self._connection().execute(
+            f"SELECT data FROM {table} WHERE key = ? AND version = ?", (key, self.version)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return codec.loads(row[0]) if row is not None else None
+
+    def _put_many(self, table: str, items: Iterable[Tuple[bytes, Any]]):
+        conn = self._connection()
+        rows = [(key, self.version, codec.dumps(data)) for (key, data) in items]
+        if len(rows) == 0:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(f"INSERT OR REPLACE INTO {table} (key, version, data) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _contains(self, table: str, key: bytes) -> bool:
+        row = self._connection().execute(
+            f"SELECT 1 FROM {table} WHERE key = ? AND version = ?", (key, self.version)).fetchone()
+        return row is not None
+
+    def shanten(
+            self,
+            tiles: Sequence[Tile],
+            furo: Optional[Sequence[Furo]] = None,
+            calc_advance_num: bool = True,
+            best_shanten_only: bool = False,
+            allow_ankan: bool = True,
+    ) -> ShantenResult:
+        """
+        向听分析（参数与shanten相同），优先使用存储的结果，未命中时进行分析并写入存储
+        """
+        canonical, transform = canonicalize_hand(tiles, furo)
+        params = _shanten_params(canonical.tiles, canonical.furo, calc_advance_num, best_shanten_only, allow_ankan)
+        key = codec.dumps(params)
+
+        data = self._get("shanten", key)
+        if data is None:
+            data = libmahjongutils.call("shanten", params)
+            self._put_many("shanten", ((key, data),))
+
+        return transform.restore_shanten_result(ShantenResult.__decode__(data), tiles, furo)
+
+    def build_hora(
+            self,
+            tiles: List[Tile], furo: Optional[List[Furo]], agari: Tile,
+            tsumo: bool,
+            *, dora: int = 0,
+            self_wind: Optional[Wind] = None, round_wind: Optional[Wind] = None,
+            extra_yaku: Optional[Set[Yaku]] = None
+    ) -> Hora:
+        """
+        和牌分析（参数与build_hora相同），优先使用存储的结果，未命中时进行分析并写入存储
+        """
+        params = _hora_key_params(tiles, furo, agari, tsumo, dora, self_wind, round_wind, extra_yaku)
+        key = codec.dumps(params)
+
+        data = self._get("hora", key)
+        if data is None:
+            data = libmahjongutils.call("hora", params)
+            self._put_many("hora", ((key, data),))
+
+        return Hora.decode(data)
+
+    def prepopulate_shanten(
+            self,
+            hands: Iterable[Union[Sequence[Tile], Tuple[Sequence[Tile], Optional[Sequence[Furo]]]]],
+            *, calc_advance_num: bool = True,
+            best_shanten_only: bool = False,
+            allow_ankan: bool = True,
+            batch_size: int = 1000,
+    ) -> int:
+        """
+        批量进行向听分析并写入存储，已存在（或与已存在的手牌等价）的手牌会被跳过
+
+        :param hands: 手牌（门前的牌，或(门前的牌, 副露)）
+        :param batch_size: 每个事务写入的记录数
+        :return: 新写入的记录数
+        """
+        written = 0
+        pending = {}
+
+        for hand in hands:
+            if isinstance(hand, tuple) and len(hand) == 2 and not isinstance(hand[0], Tile):
+                tiles, furo = hand
+            else:
+                tiles, furo = hand, None
+
+            canonical, _ = canonicalize_hand(tiles, furo)
+            params = _shanten_params(canonical.tiles, canonical.furo,
+                                     calc_advance_num, best_shanten_only, allow_ankan)
+            key = codec.dumps(params)
+            if key in pending or self._contains("shanten", key):
+                continue
+
+            pending[key] = libmahjongutils.call("shanten", params)
+            if len(pending) >= batch_size:
+                self._put_many("shanten", pending.items())
+                written += len(pending)
+                pending.clear()
+
+        self._put_many("shanten", pending.items())
+        written += len(pending)
+        return written
+
+    def prepopulate_hora(self, hands: Iterable[Mapping[str, Any]], *, batch_size: int = 1000) -> int:
+        """
+        批量进行和牌分析并写入存储，已存在的跳过
+
+        :param hands: 和牌分析的参数（build_hora的关键字参数）
+        :param batch_size: 每个事务写入的记录数
+        :return: 新写入的记录数
+        """
+        written = 0
+        pending = {}
+
+        for hand in hands:
+            params = _hora_key_params(hand["tiles"], hand.get("furo"), hand["agari"], hand["tsumo"],
+                                      hand.get("dora", 0), hand.get("self_wind"), hand.get("round_wind"),
+                                      hand.get("extra_yaku"))
+            key = codec.dumps(params)
+            if key in pending or self._contains("hora", key):
+                continue
+
+            pending[key] = libmahjongutils.call("hora", params)
+            if len(pending) >= batch_size:
+                self._put_many("hora", pending.items())
+                written += len(pending)
+                pending.clear()
+
+        self._put_many("hora", pending.items())
+        written += len(pending)
+        return written
+
+    def count(self) -> int:
+        """
+        当前版本的记录数
+        """
+        conn = self._connection()
+        return sum(conn.execute(f"SELECT COUNT(*) FROM {table} WHERE version = ?", (self.version,)).fetchone()[0]
+                   for table in _tables)
+
+    def compact(self) -> int:
+        """
+        删除其他版本的记录并整理数据库文件
+
+        :return: 删除的记录数
+        """
+        conn = self._connection()
+        deleted = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in _tables:
+                deleted += conn.execute(f"DELETE FROM {table} WHERE version != ?", (self.version,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+__all__ = ("ResultStore",)
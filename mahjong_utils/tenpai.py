@@ -0,0 +1,229 @@
+"""
+和了与听牌的快速判断
+
+只判断手牌是否为和了形、听牌时的待牌，不计算向听数、进张与手牌分解，不调用分析库。
+手牌按花色（万子、筒子、索子、字牌）分组，每组是否能分解为面子（或面子加雀头）只取决于该组各数字的张数，结果会被缓存。
+已加载清一色索引时（见mahjong_utils.chinitsu.get_chinitsu_index），单一花色的门前手牌直接查询索引。
+"""
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from mahjong_utils.chinitsu import FLAG_REGULAR, chinitsu_counts, loaded_chinitsu_index
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import Tile, tile_pool, all_yaochu
+
+# 各组的起始code（数牌为1~9，字牌为1~7）
+_group_bases = (0, 10, 20, 30)
+
+_yaochu_codes = tuple(sorted(t.code for t in all_yaochu))
+
+# 分组状态
+_NG = -1
+_MENTSU = 0  # 可以分解为面子
+_WITH_JYANTOU = 1  # 可以分解为面子与一个雀头
+
+
+def _counts(tiles: Sequence[Tile]) -> List[int]:
+    # 赤宝牌计入对应的5
+    counts = [0] * len(tile_pool)
+    for t in tiles:
+        code = t.code
+        if code < 30 and code % 10 == 0:
+            code += 5
+        counts[code] += 1
+    return counts
+
+
+def _decompose(c: List[int], honor: bool) -> bool:
+    # 张数最小的数字上的牌只能组成刻子，或以其开始的顺子；三个相同的顺子等价于三个刻子，因此顺子的个数取张数模3即可
+    for n in range(len(c)):
+        r = c[n] % 3
+        if r == 0:
+            continue
+        if honor or n + 2 >= len(c) or c[n + 1] < r or c[n + 2] < r:
+            return False
+        c[n + 1] -= r
+        c[n + 2] -= r
+    return True
+
+
+@lru_cache(maxsize=65536)
+def _group_state(counts: Tuple[int, ...], honor: bool) -> int:
+    s = sum(counts)
+    if s % 3 == 0:
+        return _MENTSU if _decompose(list(counts), honor) else _NG
+    elif s % 3 == 2:
+        for n in range(len(counts)):
+            if counts[n] >= 2:
+                c = list(counts)
+                c[n] -= 2
+                if _decompose(c, honor):
+                    return _WITH_JYANTOU
+    return _NG
+
+
+def _group(counts: List[int], g: int) -> Tuple[int, ...]:
+    base = _group_bases[g]
+    return tuple(counts[base + 1:base + (8 if g == 3 else 10)])
+
+
+def _group_states(counts: List[int]) -> List[int]:
+    return [_group_state(_group(counts, g), g == 3) for g in range(4)]
+
+
+def _is_regular(counts: List[int]) -> bool:
+    states = _group_states(counts)
+    return _NG not in states and sum(states) == 1
+
+
+def _is_chitoi(counts: List[int]) -> bool:
+    return sum(1 for c in counts if c == 2) == 7
+
+
+def _is_kokushi(counts: List[int]) -> bool:
+    return all(counts[code] > 0 for code in _yaochu_codes) \
+           and sum(counts[code] for code in _yaochu_codes) == 14
+
+
+def is_agari(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None) -> bool:
+    """
+    判断手牌是否为和了形（标准形、七对子或国士无双，不判断有无役）
+
+    :param tiles: 门前的牌（包括和牌）
+    :param furo: 副露
+    :return: 是否为和了形
+    """
+    if len(tiles) % 3 != 2:
+        raise ValueError("invalid length of tiles")
+
+    index = loaded_chinitsu_index()
+    if index is not None:
+        cc = chinitsu_counts(tiles)
+        if cc is not None:
+            flags = index.agari_flags(cc[1])
+            # 单一花色不可能是国士无双；七对子只在门前14张时成立
+            return flags != 0 if not furo and len(tiles) == 14 else flags & FLAG_REGULAR != 0
+
+    counts = _counts(tiles)
+    if _is_regular(counts):
+        return True
+    if not furo and len(tiles) == 14:
+        return _is_chitoi(counts) or _is_kokushi(counts)
+    return False
+
+
+def tenpai_waits(tiles: Sequence[Tile], furo: Optional[Sequence[Furo]] = None) -> FrozenSet[Tile]:
+    """
+    听牌时的待牌（不含赤宝牌，不含门前与副露中已有4张的牌），不是听牌时返回空集
+
+    :param tiles: 门前的牌
+    :param furo: 副露
+    :return: 待牌
+    """
+    if len(tiles) % 3 != 1:
+        raise ValueError("invalid length of tiles")
+
+    counts = _counts(tiles)
+    used = list(counts)
+    if furo:
+        for fr in furo:
+            for t in fr.tiles:
+                used[t.code + 5 if t.code < 30 and t.code % 10 == 0 else t.code] += 1
+
+    index = loaded_chinitsu_index()
+    if index is not None:
+        cc = chinitsu_counts(tiles)
+        if cc is not None:
+            # 索引中的待牌包括七对子的待牌，单一花色的手牌只有门前13张时才可能是七对子
+            tile_type, tile_counts = cc
+            mask = index.waits(tile_counts)
+            waits = (Tile.by_type_and_num(tile_type, n) for n in range(1, 10) if mask & (1 << (n - 1)))
+            return frozenset(t for t in waits if used[t.code] < 4)
+
+    waits = set()
+
+    # 标准形：加入的牌只改变所在的组的状态
+    states = _group_states(counts)
+    for g in range(4):
+        others = states[:g] + states[g + 1:]
+        if _NG in others or sum(others) > 1:
+            continue
+        target = 1 - sum(others)
+        honor = g == 3
+        base = _group_bases[g]
+        for n in range(1, 8 if honor else 10):
+            code = base + n
+            # 只有与组内已有的牌相邻（字牌为相同）的牌可能成为待牌
+            if honor:
+                if counts[code] == 0:
+                    continue
+            elif not any(counts[m] for m in range(max(base + 1, code - 2), min(base + 9, code + 2) + 1)):
+                continue
+            if used[code] >= 4:
+                continue
+            counts[code] += 1
+            ok = _group_state(_group(counts, g), honor) == target
+            counts[code] -= 1
+            if ok:
+                waits.add(tile_pool[code])
+
+    if not furo and len(tiles) == 13:
+        # 七对子
+        if sum(1 for c in counts if c == 2) == 6 and sum(1 for c in counts if c == 1) == 1:
+            code = counts.index(1)
+            if used[code] < 4:
+                waits.add(tile_pool[code])
+        # 国士无双
+        if sum(counts[code] for code in _yaochu_codes) == 13:
+            missing = [code for code in _yaochu_codes if counts[code] == 0]
+            if len(missing) == 0:
+                waits.update(tile_pool[code] for code in _yaochu_codes)
+            elif len(missing) == 1:
+                waits.add(tile_pool[missing[0]])
+
+    return frozenset(waits)
+
+
+def is_furiten(waits: Iterable[Tile], discards: Iterable[Tile]) -> bool:
+    """
+    判断是否振听（舍牌中有待牌，赤宝牌与对应的5视为相同）
+
+    :param waits: 待牌（tenpai_waits的结果）
+    :param discards: 舍牌
+    :return: 是否振听
+    """
+    waits = {t.real_num + t.code // 10 * 10 for t in waits}
+    return any(t.real_num + t.code // 10 * 10 in waits for t in discards)
+
+
+def is_agari_batch(
+        hands: Iterable[Sequence[Tile]],
+        furo: Optional[Iterable[Optional[Sequence[Furo]]]] = None,
+) -> List[bool]:
+    """
+    批量判断手牌是否为和了形
+
+    :param hands: 各手牌的门前的牌
+    :param furo: 各手牌的副露（与hands一一对应）
+    """
+    if furo is None:
+        return [is_agari(tiles) for tiles in hands]
+    return [is_agari(tiles, fr) for (tiles, fr) in zip(hands, furo)]
+
+
+def tenpai_waits_batch(
+        hands: Iterable[Sequence[Tile]],
+        furo: Optional[Iterable[Optional[Sequence[Furo]]]] = None,
+) -> List[FrozenSet[Tile]]:
+    """
+    批量获取听牌时的待牌
+
+    :param hands: 各手牌的门前的牌
+    :param furo: 各手牌的副露（与hands一一对应）
+    """
+    if furo is None:
+        return [tenpai_waits(tiles) for tiles in hands]
+    return [tenpai_waits(tiles, fr) for (tiles, fr) in zip(hands, furo)]
+
+
+__all__ = ("is_agari", "tenpai_waits", "is_furiten", "is_agari_batch", "tenpai_waits_batch",)
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from .common import all_common_yaku
 from .extra import all_extra_yaku
 from .yaku import Yaku
@@ -5,7 +7,7 @@ from .yakuman import all_yakuman
 
 all_yaku = all_common_yaku | all_extra_yaku | all_yakuman
 
-_all_yaku_mapping = dict(map(lambda x: (x.name, x), all_yaku))
+_all_yaku_mapping = MappingProxyType(dict(map(lambda x: (x.name, x), all_yaku)))
 
 
 def get_yaku(name: str) -> Yaku:
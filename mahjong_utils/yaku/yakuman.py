@@ -1,4 +1,4 @@
-from typing import Set
+from typing import FrozenSet
 
 from .extra import tenhou, chihou
 from .yaku import Yaku
@@ -17,11 +17,11 @@ churen_nine_waiting = Yaku("churen_nine_waiting", 26, 26, True)
 suanko_tanki = Yaku("suanko_tanki", 26, 26, True)
 kokushi_thirteen_waiting = Yaku("kokushi_thirteen_waiting", 26, 26, True)
 
-all_yakuman: Set[Yaku] = {
+all_yakuman: FrozenSet[Yaku] = frozenset({
     tenhou, chihou,
     kokushi, suanko, daisangen, tsuiso, shousushi, lyuiso, chinroto, sukantsu, churen,
     daisushi, churen_nine_waiting, suanko_tanki, kokushi_thirteen_waiting
-}
+})
 
 __all__ = (
     "all_yakuman",
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import sys
 from distutils import log
@@ -11,7 +12,7 @@ from setuptools import Command, setup
 from setuptools.command.build_py import build_py as origin_build_py
 
 
-def run_gradle_task(root, task):
+def run_gradle_task(root, task, args=()):
     if sys.platform == 'win32':
         gradlew = "gradlew.bat"
     else:
@@ -22,6 +23,9 @@ def run_gradle_task(root, task):
     else:
         cmd = f"./{gradlew} {task}"
 
+    for arg in args:
+        cmd += f" {arg}"
+
     log.info(f"running {cmd} (in {root})")
     call_return = subprocess.call(cmd, shell=True, cwd=root)
     if call_return != 0:
@@ -39,16 +43,21 @@ class build_kt(Command):
         ('build-lib=', 'd', "directory to \"build\" (copy) to"),
         ('kt-libraries=', None, ''),
         ('shared-location=', None, ""),
+        ('binary-options=', None, "Kotlin/Native binary options, e.g. \"gc=cms,gcSchedulerType=adaptive\" "
+                                  "(defaults to $MAHJONG_UTILS_KT_BINARY_OPTIONS)"),
     ]
 
     def initialize_options(self) -> None:
         self.build_lib = None
         self.shared_location = None
         self.kt_libraries = None
+        self.binary_options = None
 
     def finalize_options(self) -> None:
         self.set_undefined_options('build_py',
                                    ('build_lib', 'build_lib'))
+        if self.binary_options is None:
+            self.binary_options = os.environ.get("MAHJONG_UTILS_KT_BINARY_OPTIONS", "")
 
     def get_kt_build_dir(self, lib_name, build_info):
         build_dir = Path(build_info.get("root"))
@@ -73,7 +82,13 @@ class build_kt(Command):
                 task += f":{subproject}:"
             task += "linkReleaseSharedNative"
 
-            run_gradle_task(root, task)
+            # GC and other runtime settings of Kotlin/Native are fixed at link time
+            args = []
+            for option in filter(None, self.binary_options.split(",")):
+                key, value = option.split("=", 1)
+                args.append(f"-Pkotlin.native.binary.{key.strip()}={value.strip()}")
+
+            run_gradle_task(root, task, args)
 
             build_dir = self.get_kt_build_dir(lib_name, build_info)
 
@@ -134,13 +149,22 @@ setup(
         "cffi>=1.15.1",
         "stringcase>=1.2.0"
     ],
+    extras_require={
+        "numpy": ["numpy>=1.21"],
+        "arrow": ["pyarrow>=8.0.0"],
+    },
     packages=[
         "mahjong_utils",
         "mahjong_utils.lib",
         "mahjong_utils.models",
+        "mahjong_utils.server",
+        "mahjong_utils.sim",
         "mahjong_utils.yaku"
     ],
     package_data={"": ["*_api.i"]},
+    entry_points={
+        "console_scripts": ["mahjong-utils=mahjong_utils.cli:main"],
+    },
     zip_safe=False,
     options={
         "build_kt": {
@@ -0,0 +1,51 @@
+import pytest
+
+from mahjong_utils.models.tile import parse_tiles, Tile, mask_to_tiles
+from mahjong_utils.shanten import shanten
+
+pa = pytest.importorskip("pyarrow")
+
+from mahjong_utils.arrow import export_shanten, export_hora  # noqa: E402
+
+
+def test_export_shanten(tmp_path):
+    hands = [parse_tiles("34568m235p68s"), parse_tiles("112233p44556s127z")] * 3
+    assert export_shanten(iter(hands), str(tmp_path / "shanten.arrow"), batch_size=4) == 6
+
+    table = pa.ipc.open_file(str(tmp_path / "shanten.arrow")).read_all()
+    assert table.num_rows == 6
+
+    rows = table.slice(0, 2).to_pylist()
+    expected = shanten(hands[0])
+    assert rows[0]["with_got"] is False
+    assert rows[0]["shanten"] == expected.shanten
+    assert set(mask_to_tiles(rows[0]["advance"])) == expected.advance
+    assert rows[0]["advance_num"] == expected.advance_num
+
+    expected = shanten(hands[1])
+    assert rows[1]["with_got"] is True
+    assert rows[1]["shanten"] == expected.shanten
+    assert len(rows[1]["discard_to_advance"]) == len(expected.discard_to_advance)
+
+
+def test_export_hora(tmp_path):
+    hands = [dict(tiles=parse_tiles("11123456778899p"), agari=Tile.by_text("4p"), tsumo=True, dora=4)]
+    assert export_hora(hands, str(tmp_path / "hora.parquet"), format="parquet") == 1
+
+    row = pa.parquet.read_table(str(tmp_path / "hora.parquet")).to_pylist()[0]
+    assert row["han"] == 15
+    assert row["hu"] == 20
+    assert row["parent_ron"] == 48000
+    assert "chinitsu" in row["yaku"]
+
+
+def test_export_shanten_corpus(tmp_path):
+    from mahjong_utils.corpus import Corpus, write_corpus
+
+    hands = [parse_tiles("34568m235p68s"), parse_tiles("112233p44556s127z")]
+    write_corpus(tmp_path / "hands.mjc", hands)
+    assert export_shanten(Corpus(tmp_path / "hands.mjc").records, str(tmp_path / "shanten.arrow")) == 2
+
+    rows = pa.ipc.open_file(str(tmp_path / "shanten.arrow")).read_all().to_pylist()
+    assert [row["shanten"] for row in rows] == [shanten(tiles).shanten for tiles in hands]
+    assert rows[1]["tiles"] == "112233p44556s127z"
@@ -0,0 +1,51 @@
+from mahjong_utils.canonical import canonicalize_hand
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten
+
+
+def test_canonicalize_hand():
+    a, _ = canonicalize_hand(parse_tiles("123m456p11z"))
+    b, _ = canonicalize_hand(parse_tiles("789s406m22z"))
+    assert a == b
+
+    a, _ = canonicalize_hand(parse_tiles("1122p"), [Furo.parse("123s"), Furo.parse("0770z")])
+    b, _ = canonicalize_hand(parse_tiles("8899m"), [Furo.parse("789p"), Furo.parse("0660z")])
+    c, _ = canonicalize_hand(parse_tiles("1122p"), [Furo.parse("123s"), Furo.parse("7777z")])
+    assert a == b
+    assert a != c
+
+    # 风牌与三元牌不能互换
+    a, _ = canonicalize_hand(parse_tiles("123456789m1122z"))
+    b, _ = canonicalize_hand(parse_tiles("123456789m1155z"))
+    assert a != b
+
+
+def test_hand_transform():
+    _, transform = canonicalize_hand(parse_tiles("789s406m225z"))
+    for t in parse_tiles("123456789m123456789p123456789s1234567z"):
+        assert transform.restore(transform.apply(t)) == t
+    assert transform.apply(Tile.by_text("0m")) == transform.apply(Tile.by_text("5m"))
+
+
+def test_restore_shanten_result():
+    for text in ("34568m235p68s", "112233p44556s12z", "3344z6699p11345s", "114514p1919810s", "19m19p19266s1235z"):
+        tiles = parse_tiles(text)
+        canonical, transform = canonicalize_hand(tiles)
+        restored = transform.restore_shanten_result(shanten(list(canonical.tiles)), tiles)
+        expected = shanten(tiles)
+
+        assert restored.shanten == expected.shanten
+        assert restored.advance == expected.advance
+        assert restored.advance_num == expected.advance_num
+        assert restored.good_shape_advance_num == expected.good_shape_advance_num
+
+    tiles = parse_tiles("12345m6789p11345s")
+    canonical, transform = canonicalize_hand(tiles)
+    restored = transform.restore_shanten_result(shanten(list(canonical.tiles)), tiles)
+    expected = shanten(tiles)
+    assert restored.shanten == expected.shanten
+    assert restored.discard_to_advance.keys() == expected.discard_to_advance.keys()
+    for t in expected.discard_to_advance:
+        assert restored.discard_to_advance[t].advance == expected.discard_to_advance[t].advance
+        assert restored.discard_to_advance[t].advance_num == expected.discard_to_advance[t].advance_num
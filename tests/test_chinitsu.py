@@ -0,0 +1,78 @@
+import pytest
+
+from mahjong_utils import chinitsu
+from mahjong_utils.chinitsu import ChinitsuIndex, build_index, chinitsu_waits, chinitsu_patterns, \
+    chinitsu_agari_tatsu, FLAG_CHITOI, get_chinitsu_index, loaded_chinitsu_index
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.mentsu import Mentsu
+from mahjong_utils.models.tatsu import Tatsu
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten
+from mahjong_utils.tenpai import is_agari, tenpai_waits
+
+
+def test_chinitsu_waits():
+    for text in ("1112345678999p", "1122334455667s", "2223334445556m", "1112223334445p", "1234567889999s"):
+        tiles = parse_tiles(text)
+        result = shanten(tiles)
+        if result.shanten == 0:
+            assert chinitsu_waits(tiles) == result.advance
+        else:
+            assert chinitsu_waits(tiles) == set()
+
+    assert chinitsu_waits(parse_tiles("123456789m1234z")) is None
+
+
+def test_chinitsu_patterns():
+    patterns = chinitsu_patterns(parse_tiles("11123456778899p"))
+    assert len(patterns) == 1
+    assert patterns[0].jyantou == Tile.by_text("1p")
+    assert sorted(patterns[0].menzen_mentsu, key=repr) == [Mentsu.parse("123p"), Mentsu.parse("456p"),
+                                                            Mentsu.parse("789p"), Mentsu.parse("789p")]
+    assert chinitsu_agari_tatsu(patterns[0], Tile.by_text("4p")) == [Tatsu.parse("56p")]
+
+    patterns = chinitsu_patterns(parse_tiles("22233344455566s"))
+    assert len(patterns) == 4
+
+    assert chinitsu_patterns(parse_tiles("11224455778899m")) == []
+    assert chinitsu_patterns(parse_tiles("11123456789999p5z")) is None
+
+
+def test_chinitsu_index(tmp_path):
+    path = tmp_path / "chinitsu.idx"
+    path.write_bytes(build_index())
+    index = ChinitsuIndex.open(path)
+
+    assert index.agari_flags([2, 2, 0, 2, 2, 0, 2, 2, 2]) == FLAG_CHITOI
+    assert index.waits([4, 0, 0, 0, 0, 0, 0, 0, 0]) == 0
+    assert index.decompositions([3, 1, 1, 1, 1, 1, 1, 1, 3]) == []
+
+
+def test_build_hora_not_agari():
+    with pytest.raises(ValueError):
+        build_hora(parse_tiles("11122233344459p"), None, Tile.by_text("4p"), True)
+
+
+def test_build_hora_does_not_build_index(tmp_path, monkeypatch):
+    path = tmp_path / "chinitsu.idx"
+    monkeypatch.setenv("MAHJONG_UTILS_CHINITSU_INDEX", str(path))
+    monkeypatch.setattr(chinitsu, "_index", None)
+
+    with pytest.raises(ValueError):
+        build_hora(parse_tiles("11122233344459p"), None, Tile.by_text("4p"), True)
+    assert loaded_chinitsu_index() is None
+    assert not path.exists()
+
+    index = get_chinitsu_index()
+    assert path.exists()
+    assert loaded_chinitsu_index() is index
+
+
+def test_tenpai_uses_index(monkeypatch):
+    hands = [parse_tiles(x) for x in ("1112345678999p", "1122334455667s", "2223334445556m", "1234567889999s",
+                                      "11122233344459p", "11223344556677m", "11123456778899p", "2340m")]
+    monkeypatch.setattr(chinitsu, "_index", None)
+    expected = [is_agari(x) if len(x) % 3 == 2 else tenpai_waits(x) for x in hands]
+
+    monkeypatch.setattr(chinitsu, "_index", ChinitsuIndex(build_index()))
+    assert [is_agari(x) if len(x) % 3 == 2 else tenpai_waits(x) for x in hands] == expected
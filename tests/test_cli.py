@@ -0,0 +1,37 @@
+import json
+from io import StringIO
+
+import pytest
+
+from mahjong_utils.cli import run
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.shanten import shanten
+
+
+def test_run_shanten():
+    lines = ["34568m235p68s\n", "\n", "112233p44556s127z\n", "invalid\n"]
+    output = StringIO()
+
+    assert run("shanten", lines, output) == 3
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["line"] for r in records] == [0, 2, 3]
+    assert records[0]["result"]["shanten_info"]["shanten_num"] == shanten(parse_tiles("34568m235p68s")).shanten
+    assert records[1]["result"]["shanten_info"]["type"] == "ShantenWithGot"
+    assert "discard_to_advance" in records[1]["result"]["shanten_info"]
+    assert "error" in records[2]
+
+
+def test_run_skip_and_points():
+    lines = ["3 40\n", '{"han": 4, "hu": 40}\n']
+    output = StringIO()
+
+    assert run("points", lines, output, skip=1) == 1
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records == [dict(line=1, result=dict(parent_point=[12000, 4000], child_point=[8000, 4000, 2000]))]
+
+
+def test_run_skip_requires_ordered():
+    with pytest.raises(ValueError):
+        run("points", ["3 40\n"], StringIO(), skip=1, ordered=False)
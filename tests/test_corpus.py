@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from mahjong_utils.corpus import Corpus, CorpusWriter, write_corpus, shanten_numbers, record_tiles_text, \
+    record_furo_texts
+from mahjong_utils.models.furo import Chi, Pon, Kan
+from mahjong_utils.models.tile import parse_tiles, Tile, tiles_text
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.shanten import shanten
+
+
+def test_corpus(tmp_path):
+    hands = [parse_tiles("34568m2305p68s"), parse_tiles("112233p44556s127z")]
+    assert write_corpus(tmp_path / "hands.mjc", hands) == 2
+
+    corpus = Corpus(tmp_path / "hands.mjc")
+    assert len(corpus) == 2
+    assert corpus.counts.shape == (2, 34)
+    assert np.shares_memory(corpus[1:], corpus.records)
+
+    for (i, tiles) in enumerate(hands):
+        assert corpus.hand(i)["tiles"] == sorted(tiles)
+        assert record_tiles_text(corpus[i]) == tiles_text(sorted(tiles))
+
+    assert list(shanten_numbers(corpus[:])) == [shanten(tiles).shanten for tiles in hands]
+
+
+def test_corpus_furo(tmp_path):
+    furo = [Chi(Tile.by_text("3s")), Kan(Tile.by_text("1z"), ankan=True)]
+    with CorpusWriter(tmp_path / "hands.mjc") as writer:
+        writer.write(parse_tiles("1150p"), furo, agari=Tile.by_text("0p"), tsumo=True,
+                     self_wind=Wind.east, round_wind=Wind.south, dora=2)
+
+    corpus = Corpus(tmp_path / "hands.mjc")
+    hand = corpus.hand(0)
+    assert hand["furo"] == furo
+    assert hand["agari"] == Tile.by_text("0p")
+    assert hand["tsumo"] is True
+    assert hand["self_wind"] == Wind.east
+    assert hand["round_wind"] == Wind.south
+    assert hand["dora"] == 2
+    assert record_furo_texts(corpus[0]) == [repr(fr) for fr in furo]
+
+
+def test_corpus_furo_red(tmp_path):
+    furo = [Pon(Tile.by_text("0m")), Kan(Tile.by_text("0s"), ankan=False), Pon(Tile.by_text("5p"))]
+    with CorpusWriter(tmp_path / "hands.mjc") as writer:
+        writer.write(parse_tiles("1p"), furo)
+
+    corpus = Corpus(tmp_path / "hands.mjc")
+    assert corpus.hand(0)["furo"] == furo
+    assert record_furo_texts(corpus[0]) == [repr(fr) for fr in furo]
+
+
+def test_corpus_invalid(tmp_path):
+    (tmp_path / "hands.mjc").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        Corpus(tmp_path / "hands.mjc")
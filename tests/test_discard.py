@@ -0,0 +1,34 @@
+from mahjong_utils.discard import rank_discards, DiscardObjective
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten
+
+
+def test_rank_discards():
+    tiles = parse_tiles("34568m2355p368s11z")
+    result = shanten(tiles)
+    ranked = rank_discards(tiles)
+
+    assert len(ranked) == len(result.discard_to_advance)
+    for d in ranked:
+        expected = result.discard_to_advance[d.tile]
+        assert d.shanten == expected.shanten
+        assert set(d.advance) == expected.advance
+        assert d.advance_num == expected.advance_num
+
+    assert [(d.shanten, -d.advance_num) for d in ranked] == sorted((d.shanten, -d.advance_num) for d in ranked)
+    assert rank_discards(tiles, top_k=3) == ranked[:3]
+
+
+def test_rank_discards_tenpai():
+    tiles = parse_tiles("234567m234p4456s1z")
+    ranked = rank_discards(tiles, objective=DiscardObjective.points)
+
+    assert ranked[0].tile == Tile.by_text("1z")
+    assert ranked[0].shanten == 0
+    assert ranked[0].riichi_point > ranked[0].dama_point > 0
+    assert rank_discards(tiles, objective=DiscardObjective.points, top_k=1) == ranked[:1]
+
+    ranked = rank_discards(parse_tiles("234567m4456s1z"), [Furo.parse("234p")])
+    assert ranked[0].shanten == 0
+    assert ranked[0].riichi_point is None
@@ -0,0 +1,53 @@
+import numpy as np
+
+from mahjong_utils.columnar import shanten_with_got_columns
+from mahjong_utils.corpus import Corpus, CorpusWriter
+from mahjong_utils.features import FeatureBuffers, encode_hand, encode_records, encode_analysis, \
+    encode_shanten_result, FURO_PLANE_CHI, FURO_PLANE_ANKAN, DISCARD_VALID, DISCARD_SHANTEN, DISCARD_ADVANCE_NUM
+from mahjong_utils.models.furo import Chi, Kan
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten
+
+
+def test_encode_hand_and_records(tmp_path):
+    hands = [
+        (parse_tiles("1110p"), [Chi(Tile.by_text("3s")), Kan(Tile.by_text("1z"), ankan=True)]),
+        (parse_tiles("112233p44556s127z"), None),
+    ]
+    with CorpusWriter(tmp_path / "hands.mjc") as writer:
+        for (tiles, furo) in hands:
+            writer.write(tiles, furo)
+
+    by_hand = FeatureBuffers.allocate(2)
+    for (i, (tiles, furo)) in enumerate(hands):
+        encode_hand(tiles, furo, by_hand, i)
+
+    by_record = FeatureBuffers.allocate(3)
+    assert encode_records(Corpus(tmp_path / "hands.mjc").records, by_record, start=1) == 2
+
+    for name in ("tiles", "furo", "red"):
+        assert np.array_equal(getattr(by_hand, name), getattr(by_record, name)[1:])
+
+    # 1p有3张，5p（赤）有1张
+    assert list(by_hand.tiles[0, :, 9]) == [1, 1, 1, 0]
+    assert list(by_hand.tiles[0, :, 13]) == [1, 0, 0, 0]
+    assert list(by_hand.red[0]) == [0, 1, 0]
+    assert list(by_hand.furo[0, FURO_PLANE_CHI, 20:23]) == [1, 1, 1]
+    assert by_hand.furo[0, FURO_PLANE_ANKAN, 27] == 4
+
+
+def test_encode_analysis():
+    tiles = parse_tiles("112233p44556s127z")
+    out = FeatureBuffers.allocate(2)
+    encode_analysis(shanten_with_got_columns(tiles), out, 0)
+    encode_shanten_result(shanten(tiles), out, 1)
+
+    assert np.array_equal(out.discard[0], out.discard[1])
+    assert np.array_equal(out.advance[0], out.advance[1])
+
+    # 打1z：一向听，进张为3s、6s、2z、7z
+    assert out.discard[0, DISCARD_VALID, 27] == 1
+    assert out.discard[0, DISCARD_SHANTEN, 27] == 1
+    assert out.discard[0, DISCARD_ADVANCE_NUM, 27] == 13
+    assert list(np.flatnonzero(out.advance[0, 27])) == [20, 23, 28, 33]
+    assert out.discard[0, DISCARD_VALID, 0] == 0
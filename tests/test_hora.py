@@ -1,4 +1,7 @@
-from mahjong_utils.hora import build_hora, build_hora_from_shanten_result
+import pytest
+
+from mahjong_utils.hora import build_hora, build_hora_from_shanten_result, build_hora_matrix, hora_contexts, \
+    HoraContext
 from mahjong_utils.models.furo import Furo
 from mahjong_utils.models.tile import Tile, parse_tiles
 from mahjong_utils.models.wind import Wind
@@ -138,3 +141,34 @@ def test_build_hora_from_shanten_result():
     assert hora.han == 13
     assert hora.parent_point == (48000, 16000)
     assert hora.child_point == (32000, 16000, 8000)
+
+
+def test_build_hora_matrix():
+    tiles = parse_tiles("12233466m111z789p")
+    furo = None
+    agari = Tile.by_text("1z")
+    contexts = hora_contexts(dora=(0, 2), self_wind=(Wind.east, Wind.south), round_wind=(Wind.east,),
+                             extra_yaku=((), {richi}, {richi, ippatsu}))
+    matrix = build_hora_matrix(tiles, furo, agari, contexts)
+
+    assert matrix.contexts == tuple(contexts)
+    for (i, ctx) in enumerate(contexts):
+        hora = build_hora(tiles, furo, agari, ctx.tsumo, dora=ctx.dora, self_wind=ctx.self_wind,
+                          round_wind=ctx.round_wind, extra_yaku=set(ctx.extra_yaku))
+        assert matrix.han[i] == hora.han
+        assert matrix.hu[i] == hora.hu
+        assert matrix.yaku[i] == hora.yaku
+        assert matrix.parent_point[i] == hora.parent_point
+        assert matrix.child_point[i] == hora.child_point
+
+    i = contexts.index(HoraContext(True, 0, Wind.east, Wind.east))
+    assert matrix.point[i] == matrix.parent_point[i][1] * 3
+
+    with pytest.raises(ValueError):
+        build_hora_matrix(parse_tiles("12233466m112z789p"), None, agari, contexts)
+
+    # 直接构造的场况中extra_yaku可以是set
+    ctx = HoraContext(False, 0, Wind.south, Wind.east, {richi})
+    matrix = build_hora_matrix(tiles, furo, agari, [ctx, ctx])
+    assert matrix.contexts[0].extra_yaku == frozenset({richi})
+    assert matrix.han[0] == matrix.han[1]
@@ -7,3 +7,14 @@ def test_lib():
 
     assert result['shantenInfo']['type'] == 'ShantenWithoutGot'
     assert result['shantenInfo']['shantenNum'] == 0
+
+
+def test_lib_stats():
+    before = libmahjongutils.stats()
+    libmahjongutils.call("regularShanten", {"tiles": ["1m", "1m", "1m", "2m"]})
+    after = libmahjongutils.stats()
+
+    assert after.calls == before.calls + 1
+    assert after.call_seconds > before.call_seconds
+    assert after.max_call_seconds > 0
+    assert after.rss != 0
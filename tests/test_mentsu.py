@@ -0,0 +1,25 @@
+from mahjong_utils.models.furo import Furo, Kan, ankan_pool, chi_pool
+from mahjong_utils.models.mentsu import Mentsu, Shuntsu, shuntsu_pool, kotsu_pool
+from mahjong_utils.models.tatsu import Tatsu, Ryanmen, Toitsu, ryanmen_pool, toitsu_pool
+from mahjong_utils.models.tile import Tile, parse_tiles
+
+
+def test_interned_decode():
+    assert Mentsu.__decode__("123m") is shuntsu_pool[Tile.by_text("1m").code]
+    assert Mentsu.__decode__("555p") is kotsu_pool[Tile.by_text("5p").code]
+    assert Tatsu.__decode__("34s") is ryanmen_pool[Tile.by_text("3s").code]
+    assert Furo.__decode__(dict(type="Chi", tile="3s")) is chi_pool[Tile.by_text("3s").code]
+    assert Furo.__decode__(dict(type="Kan", tile="1z", ankan=True)) is ankan_pool[Tile.by_text("1z").code]
+
+    # 与直接构造的对象相等
+    assert Mentsu.parse("123m") == Shuntsu(Tile.by_text("1m"))
+    assert Furo.parse("0110z") == Kan(Tile.by_text("1z"), True)
+
+
+def test_precomputed_properties():
+    assert Shuntsu(Tile.by_text("1m")).tiles == tuple(parse_tiles("123m"))
+    assert Ryanmen(Tile.by_text("3s")).waiting == frozenset(parse_tiles("25s"))
+    # 对子的对象池包含赤宝牌，待牌同样预先计算
+    assert toitsu_pool[Tile.by_text("0m").code] is not None
+    assert Tatsu.__decode__("00m") is toitsu_pool[Tile.by_text("0m").code]
+    assert Toitsu(Tile.by_text("0m")).waiting == frozenset(parse_tiles("0m"))
@@ -0,0 +1,29 @@
+import pytest
+
+from mahjong_utils.models.names import wind_names, yaku_names
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.yaku import all_yaku
+from mahjong_utils.yaku.common import self_wind, round_wind
+from mahjong_utils.yaku.yakuman import kokushi_thirteen_waiting
+
+
+def test_wind_names():
+    assert wind_names.encode(Wind.east) == "East"
+    assert wind_names.decode("North") == Wind.north
+    assert wind_names.encode(None) is None
+    assert wind_names.decode(None) is None
+
+    with pytest.raises(ValueError):
+        wind_names.decode("east")
+
+
+def test_yaku_names():
+    assert yaku_names.encode(self_wind) == "SelfWind"
+    assert yaku_names.encode(round_wind) == "RoundWind"
+    assert yaku_names.decode("KokushiThirteenWaiting") == kokushi_thirteen_waiting
+
+    for yk in all_yaku:
+        assert yaku_names.decode(yaku_names.encode(yk)) == yk
+
+    with pytest.raises(ValueError):
+        yaku_names.decode("Dora")
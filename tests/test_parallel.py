@@ -0,0 +1,54 @@
+import numpy as np
+
+from mahjong_utils.corpus import Corpus, write_corpus, shanten_numbers
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.tile import parse_tiles, Tile, tiles_to_mask
+from mahjong_utils.parallel import SharedArena, attach, parallel_shanten, parallel_shanten_numbers, parallel_hora
+from mahjong_utils.shanten import shanten
+
+
+def test_shared_arena():
+    with SharedArena([("a", np.int8, (10,)), ("b", np.uint64, (3,))]) as arena:
+        with attach(arena.descriptor) as arrays:
+            arrays["b"][:] = 7
+        a = arena.arrays["a"]
+        b = arena.arrays["b"]
+    del arena
+
+    a[:] = 3
+    assert list(a) == [3] * 10
+    assert list(b) == [7] * 3
+
+
+def test_parallel_shanten():
+    hands = [parse_tiles("34568m235p68s"), parse_tiles("112233p44556s127z")] * 4
+    result = parallel_shanten(hands, workers=2, chunk_size=3)
+
+    expected = shanten(hands[0])
+    assert list(result.shanten[::2]) == [expected.shanten] * 4
+    assert result.discard[0] == 0xFF
+    assert result.advance[0] == tiles_to_mask(expected.advance)
+    assert result.advance_num[0] == expected.advance_num
+
+    expected = shanten(hands[1])
+    assert result.shanten[1] == expected.shanten
+    assert expected.discard_to_advance[Tile.by_code(int(result.discard[1]))].shanten == expected.shanten
+
+
+def test_parallel_shanten_numbers(tmp_path):
+    write_corpus(tmp_path / "hands.mjc", [parse_tiles("34568m235p68s"), parse_tiles("112233p44556s127z")] * 10)
+    corpus = Corpus(tmp_path / "hands.mjc")
+    assert list(parallel_shanten_numbers(corpus[:], workers=2, chunk_size=7)) == list(shanten_numbers(corpus[:]))
+
+
+def test_parallel_hora():
+    hands = [
+        dict(tiles=parse_tiles("11123456789999p"), furo=None, agari=Tile.by_text("9p"), tsumo=True),
+        dict(tiles=parse_tiles("112233p44556s127z"), furo=None, agari=Tile.by_text("7z"), tsumo=False),
+    ]
+    result = parallel_hora(hands, workers=2, chunk_size=1)
+
+    hora = build_hora(**hands[0])
+    assert (result.han[0], result.hu[0]) == (hora.han, hora.hu)
+    assert (result.parent_ron[0], result.parent_tsumo[0]) == hora.parent_point
+    assert result.han[1] == -1
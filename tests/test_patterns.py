@@ -0,0 +1,23 @@
+from mahjong_utils.chinitsu import chinitsu_patterns
+from mahjong_utils.models.hand_pattern import ChitoiHandPattern, KokushiHandPattern, RegularHandPattern
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.patterns import iter_patterns
+
+
+def test_iter_patterns_agari():
+    for text in ("11123456778899p", "1112345678999p1p", "2223344455667p7p"):
+        tiles = parse_tiles(text)
+        assert set(iter_patterns(tiles)) == set(chinitsu_patterns(tiles))
+
+
+def test_iter_patterns():
+    patterns = list(iter_patterns(parse_tiles("112233p44556s12z")))
+    assert any(isinstance(p, RegularHandPattern) for p in patterns)
+    assert any(isinstance(p, ChitoiHandPattern) for p in patterns)
+
+    patterns = list(iter_patterns(parse_tiles("119m19p19266s135z")))
+    assert all(isinstance(p, KokushiHandPattern) for p in patterns)
+
+    # 生成器按需枚举
+    it = iter_patterns(parse_tiles("2223344455667p"))
+    assert isinstance(next(it), RegularHandPattern)
@@ -0,0 +1,49 @@
+import pickle
+
+from mahjong_utils.codec import dumps_model, loads_model
+from mahjong_utils.hora import build_hora
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.shanten import shanten, furo_chance_shanten, regular_shanten
+from mahjong_utils.yaku.extra import richi
+
+
+def roundtrip_tester(obj):
+    data = pickle.dumps(obj)
+    restored = pickle.loads(data)
+    assert type(restored) is type(obj)
+    assert restored == obj
+    assert loads_model(dumps_model(obj)) == obj
+
+
+def test_pickle_shanten_result():
+    for text in ("34568m235p68s", "3344z6699p11345s", "112233p44556s12z", "119m19p19266s135z",
+                 "34568m235p68s3p", "1112345678999p5p", "19m19p19s1234567z1m"):
+        result = shanten(parse_tiles(text))
+        roundtrip_tester(result)
+        roundtrip_tester(result.shanten_info)
+        roundtrip_tester(result.hand)
+        for pattern in result.hand.patterns:
+            roundtrip_tester(pattern)
+
+    roundtrip_tester(regular_shanten(parse_tiles("1345556m11z"), [Furo.parse("789m")]))
+    roundtrip_tester(furo_chance_shanten(parse_tiles("3456778m123457p"), Tile.by_text("7m")))
+
+
+def test_pickle_hora():
+    hora = build_hora(parse_tiles("11123456778899p"), None, Tile.by_text("4p"), True, dora=4, extra_yaku={richi})
+    roundtrip_tester(hora)
+    roundtrip_tester(hora.pattern)
+
+    hora = build_hora(parse_tiles("1345556m111z2m"), [Furo.parse("789m")], Tile.by_text("2m"), True,
+                      self_wind=Wind.east, round_wind=Wind.south)
+    roundtrip_tester(hora)
+
+    hora = build_hora(parse_tiles("19m19p19s1234567z1m"), None, Tile.by_text("1m"), False)
+    roundtrip_tester(hora)
+
+
+def test_pickle_tile():
+    for t in parse_tiles("0123456789m0123456789p0123456789s1234567z"):
+        assert pickle.loads(pickle.dumps(t)) is t
@@ -0,0 +1,35 @@
+import gc
+
+from mahjong_utils import prefork
+from mahjong_utils.point_by_han_hu import get_parent_point_by_han_hu, point_table, load_point_table
+from mahjong_utils.prefork import worker_pool, warm_up
+
+
+def _parent_point(han_hu):
+    return get_parent_point_by_han_hu(*han_hu)
+
+
+def test_point_table():
+    table = point_table(max_han=2, hu=(30, 40))
+    assert table["parent"][(1, 30)] == get_parent_point_by_han_hu(1, 30)
+    load_point_table(table)
+    assert get_parent_point_by_han_hu(2, 40) == table["parent"][(2, 40)]
+
+
+def test_worker_pool():
+    with worker_pool(2) as pool:
+        assert pool.map(_parent_point, [(3, 40), (4, 30)]) == [get_parent_point_by_han_hu(3, 40),
+                                                                 get_parent_point_by_han_hu(4, 30)]
+
+
+def test_warm_up_freeze_opt_in(monkeypatch):
+    calls = []
+    monkeypatch.setattr(gc, "freeze", lambda: calls.append(1))
+    monkeypatch.setattr(prefork, "_frozen", False)
+
+    warm_up(points=False, chinitsu=False)
+    assert calls == []
+
+    warm_up(points=False, chinitsu=False, freeze=True)
+    warm_up(points=False, chinitsu=False, freeze=True)
+    assert calls == [1]
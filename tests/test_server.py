@@ -0,0 +1,73 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from mahjong_utils import point_by_han_hu
+from mahjong_utils.models.tile import parse_tiles
+from mahjong_utils.server import AnalysisServer, BULK
+from mahjong_utils.server.client import AnalysisClient
+from mahjong_utils.shanten import shanten
+
+
+@pytest.fixture(autouse=True)
+def clear_point_cache(monkeypatch):
+    # 服务端的统计不受之前的测试填入的点数缓存影响
+    monkeypatch.setattr(point_by_han_hu, "_parent_points", {})
+    monkeypatch.setattr(point_by_han_hu, "_child_points", {})
+
+
+def test_server():
+    loop = asyncio.new_event_loop()
+    server = AnalysisServer()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start("127.0.0.1", 0))
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+
+    address = server._servers[0].sockets[0].getsockname()[:2]
+    try:
+        with AnalysisClient(address) as client, AnalysisClient(address, priority=BULK) as bulk_client:
+            tiles = parse_tiles("34568m235p68s")
+            assert client.shanten(tiles) == shanten(tiles)
+            assert bulk_client.get_parent_point_by_han_hu(3, 40) == (7700, 2600)
+
+            with client.activate():
+                assert shanten(tiles).advance_num == 40
+
+            stats = client.stats()
+            assert stats["queue_depth"] == {"interactive": 0, "bulk": 0}
+            assert stats["latency"]["interactive"]["count"] == 2
+            assert stats["latency"]["bulk"]["count"] == 1
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+
+def test_client_connection_closed():
+    listener = socket.create_server(("127.0.0.1", 0))
+    address = listener.getsockname()[:2]
+
+    def accept_and_close():
+        conn, _ = listener.accept()
+        conn.close()
+
+    thread = threading.Thread(target=accept_and_close, daemon=True)
+    thread.start()
+
+    with AnalysisClient(address) as client:
+        thread.join()
+        # 连接断开后等待中与之后的请求都失败，而不是一直等待
+        with pytest.raises(OSError):
+            client.call("getParentPointByHanHu", {"han": 3, "hu": 40})
+
+    listener.close()
@@ -1,5 +1,10 @@
-from mahjong_utils.models.tile import parse_tiles, all_yaochu, Tile
-from mahjong_utils.shanten import shanten, kokushi_shanten, regular_shanten, furo_chance_shanten
+import pytest
+
+from mahjong_utils.hashcons import hash_consing
+from mahjong_utils.metrics import metrics
+from mahjong_utils.models.tile import parse_tiles, all_yaochu, Tile, mask_to_tiles
+from mahjong_utils.shanten import shanten, kokushi_shanten, regular_shanten, furo_chance_shanten, furo_chance_table, \
+    PatternsOption
 
 
 def shanten_tester(tiles, expected_shanten,
@@ -199,3 +204,86 @@ def test_shanten_with_got_tile():
 def test_furo_chance_shanten():
     result = furo_chance_shanten(parse_tiles("3456778m123457p"), Tile.by_text("7m"))
     print(result)
+
+
+def test_furo_chance_table():
+    tiles = parse_tiles("3456778m123457p")
+    table = furo_chance_table(tiles)
+    assert set(table) == set(parse_tiles("234567890m1234560p"))
+    for (t, result) in table.items():
+        assert result == furo_chance_shanten(tiles, t)
+
+    table = furo_chance_table(parse_tiles("3456778m123457p"), allow_chi=False)
+    assert set(table) == {Tile.by_text("7m")}
+
+
+def test_shanten_with_got_columns():
+    pytest.importorskip("numpy")
+    from mahjong_utils.columnar import shanten_with_got_columns
+
+    tiles = parse_tiles("34568m235p368s")
+    result = shanten(tiles)
+    columns = shanten_with_got_columns(tiles)
+
+    assert columns.shanten == result.shanten
+    assert len(columns.discard_to_advance.tile) == len(result.discard_to_advance)
+    assert len(columns.ankan_to_advance.tile) == 0
+
+    for i, t in enumerate(columns.discard_to_advance.tiles()):
+        expected = result.discard_to_advance[t]
+        assert columns.discard_to_advance.shanten[i] == expected.shanten
+        assert set(mask_to_tiles(int(columns.discard_to_advance.advance[i]))) == expected.advance
+        assert columns.discard_to_advance.advance_num[i] == expected.advance_num
+
+    best = result.discard_to_advance[columns.discard_to_advance.tiles()[columns.discard_to_advance.order()[0]]]
+    assert best.shanten == result.shanten
+    assert best.advance_num == max(v.advance_num for v in result.discard_to_advance.values()
+                                   if v.shanten == result.shanten)
+
+
+def test_shanten_time_budget():
+    tiles = parse_tiles("34568m235p368s11z")
+
+    result = shanten(tiles, time_budget=60)
+    assert not result.partial
+    assert result == shanten(tiles)
+
+    overrun = metrics.get("deadline.overrun.shanten")
+    # 没有阶段在截止时间前完成时，返回最快的阶段的结果而不是抛出TimeoutError
+    result = shanten(tiles, time_budget=0)
+    assert result.shanten == shanten(tiles).shanten
+    assert metrics.get("deadline.overrun.shanten") == overrun + 1
+
+
+def test_shanten_patterns_option():
+    tiles = parse_tiles("2223344455667p")
+    full = shanten(tiles)
+    assert len(full.hand.patterns) > 1
+
+    assert len(shanten(tiles, patterns=PatternsOption.none).hand.patterns) == 0
+    assert shanten(tiles, patterns=2).hand.patterns == full.hand.patterns[:2]
+
+    best = shanten(tiles, patterns="best")
+    assert len(best.hand.patterns) == 1
+    assert best.hand.patterns[0] in full.hand.patterns
+    assert best.shanten_info == full.shanten_info
+
+
+def test_shanten_shares_sub_results():
+    tiles = parse_tiles("34568m235p68s3p")
+    with hash_consing() as table:
+        a = shanten(tiles)
+        misses = table.misses
+        b = shanten(tiles)
+    # 第二个结果的子结果全部来自去重表
+    assert table.misses == misses
+    assert table.hits > 0
+    assert a == b
+    assert a.hand.patterns is b.hand.patterns
+    assert a.shanten_info.discard_to_advance is b.shanten_info.discard_to_advance
+
+    # 不在hash_consing的上下文内时不共享
+    c = shanten(tiles)
+    assert c == a
+    assert c.hand.patterns is not a.hand.patterns
+    assert c.shanten_info.discard_to_advance is not a.shanten_info.discard_to_advance
@@ -0,0 +1,54 @@
+import random
+
+from mahjong_utils.sim import play_table, run_tables, Policy, CallingPolicy, TableState, make_wall
+from mahjong_utils.models.furo import Pon
+from mahjong_utils.models.tile import Tile
+from mahjong_utils.sim.state import dora_code
+
+
+def test_make_wall():
+    wall = make_wall(random.Random(0))
+    assert len(wall) == 136
+    assert wall.count(5) == 3 and wall.count(0) == 1
+    assert wall.count(37) == 4
+
+    state = TableState(wall, 0, 0, 0, 0, [25000] * 4)
+    assert [sum(hand) for hand in state.hands] == [13] * 4
+    assert state.remaining == 136 - 14 - 52
+
+    assert dora_code(9) == 1
+    assert dora_code(0) == 6
+    assert dora_code(34) == 31
+    assert dora_code(37) == 35
+
+
+def test_dora_furo_red():
+    wall = make_wall(random.Random(0))
+    state = TableState(wall, 0, 0, 0, 0, [25000] * 4)
+    # 以赤5副露时，副露中的赤宝牌计入宝牌数
+    state.furo[0].append(Pon(Tile.by_text("5m")))
+    state.furo_red[0] = 1
+    assert state.dora(0, []) == 1 + 3 * (dora_code(wall[4]) == 5)
+
+
+def test_play_table():
+    result = play_table(0, [Policy() for _ in range(4)])
+    assert result == play_table(0, [Policy() for _ in range(4)])
+    assert len(result.hands) > 0
+    # 点数只在各家之间转移（流局时未被取走的立直棒除外）
+    assert sum(result.scores) <= 100000
+    assert sum(result.scores) % 1000 == 0
+
+    for hand in result.hands:
+        assert hand.kind in ("tsumo", "ron", "draw")
+        if hand.kind != "draw":
+            assert hand.han > 0
+
+    result = play_table(1, [CallingPolicy() for _ in range(4)], rounds=2)
+    assert sum(result.scores) <= 100000
+
+
+def test_run_tables():
+    results = run_tables(4, seed=10, workers=2, chunk_size=1)
+    assert [r.seed for r in results] == [10, 11, 12, 13]
+    assert results == run_tables(4, seed=10)
@@ -0,0 +1,61 @@
+from mahjong_utils import codec
+from mahjong_utils.hora import build_hora
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.models.wind import Wind
+from mahjong_utils.shanten import shanten
+from mahjong_utils.store import ResultStore
+
+
+def test_codec():
+    for x in (None, True, False, 0, 1, -1, 300, -70000, 2 ** 40, 1.5, "", "中文", "5m", "0m", "123m", "45p",
+              "Regular", [1, "7z", None], {"a": {"b": []}}):
+        assert codec.loads(codec.dumps(x)) == x
+
+    data = libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in parse_tiles("34568m235p68s")],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    })
+    assert codec.loads(codec.dumps(data)) == data
+
+
+def test_result_store(tmp_path):
+    path = tmp_path / "results.db"
+
+    with ResultStore(path) as store:
+        result = store.shanten(parse_tiles("123m456p11z4p"))
+        equivalent = store.shanten(parse_tiles("789s456m22z6m"))
+        assert store.misses == 1
+        assert store.hits == 1
+
+        expected = shanten(parse_tiles("789s456m22z6m"))
+        assert result.shanten == equivalent.shanten == expected.shanten
+        assert equivalent.advance == expected.advance
+        assert equivalent.advance_num == expected.advance_num
+
+        hora = store.build_hora(parse_tiles("11123456778899p"), None, Tile.by_text("4p"), True, dora=4)
+        expected_hora = build_hora(parse_tiles("11123456778899p"), None, Tile.by_text("4p"), True, dora=4)
+        assert hora.han == expected_hora.han
+        assert hora.yaku == expected_hora.yaku
+
+        written = store.prepopulate_shanten([parse_tiles("34568m235p68s"), parse_tiles("34568s235m68p"),
+                                             parse_tiles("123m456p11z4p")])
+        assert written == 1
+
+        written = store.prepopulate_hora([
+            dict(tiles=parse_tiles("11123456778899p"), agari=Tile.by_text("4p"), tsumo=True, dora=4),
+            dict(tiles=parse_tiles("12233445566778s"), agari=Tile.by_text("8s"), tsumo=False,
+                 self_wind=Wind.east, round_wind=Wind.east),
+        ])
+        assert written == 1
+        assert store.count() == 4
+
+    # 其他版本写入的记录视为不存在
+    with ResultStore(path, version="0.0.0") as store:
+        assert store.count() == 0
+        assert store.compact() == 4
+        store.shanten(parse_tiles("34568m235p68s"))
+        assert store.misses == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from mahjong_utils.models.furo import Furo
+from mahjong_utils.models.tile import parse_tiles, Tile
+from mahjong_utils.shanten import shanten, PatternsOption
+from mahjong_utils.tenpai import is_agari, tenpai_waits, is_furiten, is_agari_batch, tenpai_waits_batch
+
+
+def test_is_agari():
+    assert is_agari(parse_tiles("11123456778899p"))
+    assert is_agari(parse_tiles("11223344556677z"))
+    assert is_agari(parse_tiles("19m19p19s1234567z1m"))
+    assert is_agari(parse_tiles("340m11z"), [Furo.parse("789p"), Furo.parse("111s"), Furo.parse("555z")])
+    assert not is_agari(parse_tiles("112233p44556s127z"))
+    assert is_agari(parse_tiles("11112222333344m"))
+    assert not is_agari(parse_tiles("12345678m1234z11p"))
+
+    with pytest.raises(ValueError):
+        is_agari(parse_tiles("1112345678999p"))
+
+
+def test_tenpai_waits():
+    for text in ("1112345678999p", "34568m235p68s", "1122334455667s", "1234567889999s", "19m19p19s1234567z",
+                 "119m19p19s123456z", "2223334445556m", "34068m23p6678s11z"):
+        tiles = parse_tiles(text)
+        result = shanten(tiles, calc_advance_num=False, patterns=PatternsOption.none)
+        if result.shanten == 0:
+            assert tenpai_waits(tiles) == result.advance
+        else:
+            assert tenpai_waits(tiles) == frozenset()
+
+    # 门前与副露中已有4张的牌不是待牌
+    assert tenpai_waits(parse_tiles("1m"), [Furo.parse("111m"), Furo.parse("234p"), Furo.parse("555z"),
+                                            Furo.parse("789s")]) == frozenset()
+
+
+def test_is_furiten():
+    waits = tenpai_waits(parse_tiles("2340m"))
+    assert waits == {Tile.by_text("2m"), Tile.by_text("5m")}
+    assert is_furiten(waits, parse_tiles("0m"))
+    assert not is_furiten(waits, parse_tiles("3m1z"))
+
+
+def test_batch():
+    hands = [parse_tiles("11123456778899p"), parse_tiles("112233p44556s127z"), parse_tiles("340m11z")]
+    furo = [None, None, [Furo.parse("789p"), Furo.parse("111s"), Furo.parse("555z")]]
+    assert is_agari_batch(hands, furo) == [True, False, True]
+    assert tenpai_waits_batch([parse_tiles("1112345678999p"), parse_tiles("34568m235p68s")]) == \
+           [frozenset(parse_tiles("123456789p")), frozenset()]
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mahjong_utils.lib import libmahjongutils
+from mahjong_utils.models.tile import parse_tiles, tile_pool, tile_by_text
+from mahjong_utils.shanten import shanten, ShantenResult
+
+
+def test_shared_tables_readonly():
+    with pytest.raises(TypeError):
+        tile_pool[1] = None
+    with pytest.raises(TypeError):
+        tile_by_text["1m"] = None
+
+
+def test_concurrent_shanten():
+    hands = [parse_tiles("34568m235p68s"), parse_tiles("112233p44556s12z"), parse_tiles("1112345678999p")]
+    expected = [shanten(tiles) for tiles in hands]
+
+    def work(i: int) -> ShantenResult:
+        return shanten(hands[i % len(hands)])
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(work, range(48)))
+
+    for (i, result) in enumerate(results):
+        assert result == expected[i % len(hands)]
+        for t in result.hand.tiles:
+            assert t is tile_pool[t.code]
+
+
+def test_concurrent_decode():
+    data = libmahjongutils.call("shanten", {
+        "tiles": [str(t) for t in parse_tiles("112233p44556s12z")],
+        "furo": [],
+        "calcAdvanceNum": True,
+        "bestShantenOnly": False,
+        "allowAnkan": True,
+    })
+    expected = ShantenResult.__decode__(data)
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: ShantenResult.__decode__(data), range(64)))
+    assert all(result == expected for result in results)